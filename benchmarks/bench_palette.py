@@ -0,0 +1,61 @@
+"""Compare the vectorized block-state decoder with a plain Python loop.
+
+Run from the repository root after ``pip install -e .``:
+
+    python benchmarks/bench_palette.py
+
+Every width is reported and gated on its own: the exit status is 1 when any width
+is less than ``--min-speedup`` times faster than the loop, so the 4/8/16-bit fast
+paths cannot hide a slow general path.
+"""
+from __future__ import annotations
+
+import argparse
+import timeit
+
+import numpy as np
+
+from mcworldmgr.world.palette import SECTION_VOLUME, pack_indices, unpack_indices
+
+
+def reference_unpack(longs: list[int], bits: int, count: int = SECTION_VOLUME) -> list[int]:
+    per_long = 64 // bits
+    mask = (1 << bits) - 1
+    result = []
+    for i in range(count):
+        value = longs[i // per_long] & 0xFFFFFFFFFFFFFFFF
+        result.append((value >> ((i % per_long) * bits)) & mask)
+    return result
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sections", type=int, default=200, help="Sections decoded per timing run")
+    parser.add_argument("--min-speedup", type=float, default=50.0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    speedups: dict[int, float] = {}
+    print(f"{'bits':>4} {'loop ms/section':>16} {'numpy ms/section':>17} {'speedup':>8}")
+    for bits in (4, 5, 6, 7, 8, 12, 16):
+        packed = pack_indices(rng.integers(0, 1 << bits, size=SECTION_VOLUME, dtype=np.uint16), bits)
+        as_list = packed.tolist()
+        assert unpack_indices(packed, bits).tolist() == reference_unpack(as_list, bits)
+
+        loop = min(timeit.repeat(lambda: reference_unpack(as_list, bits), number=args.sections, repeat=3))
+        vectorized = min(timeit.repeat(lambda: unpack_indices(packed, bits), number=args.sections, repeat=3))
+        speedups[bits] = loop / vectorized
+        print(
+            f"{bits:>4} {loop / args.sections * 1000:>16.3f} "
+            f"{vectorized / args.sections * 1000:>17.4f} {speedups[bits]:>7.1f}x"
+        )
+    slow = [bits for bits, speedup in speedups.items() if speedup < args.min_speedup]
+    worst = min(speedups, key=speedups.__getitem__)
+    print(f"slowest width: {worst}-bit at {speedups[worst]:.1f}x (required {args.min_speedup:.0f}x for every width)")
+    if slow:
+        print("below the target: " + ", ".join(f"{bits}-bit" for bits in slow))
+    return 1 if slow else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -2,12 +2,33 @@ from __future__ import annotations
 
 import argparse
 
-from mcworldmgr.commands import backup_cmd, edit_entity, edit_player, edit_world, inspect_cmd, regions_cmd, worlds_cmd
+from mcworldmgr.commands import (
+    backup_cmd,
+    blocks_cmd,
+    edit_entity,
+    edit_player,
+    edit_world,
+    inspect_cmd,
+    regions_cmd,
+    worlds_cmd,
+)
+from mcworldmgr.safety.backup import BACKUP_ROOT_ENV, configure_backups
 
 
 def build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(prog="mcworldmgr", description="Minecraft Java world manager")
     parser.add_argument("--saves-dir", help="Override Minecraft saves directory")
+    parser.add_argument(
+        "--backup-root",
+        help=f"Keep backups in this folder instead of inside each world (or set {BACKUP_ROOT_ENV})",
+    )
+    parser.add_argument(
+        "--backup-exclude",
+        action="append",
+        default=[],
+        metavar="PATTERN",
+        help="Extra file/folder name pattern to leave out of backups; repeatable",
+    )
 
     subparsers = parser.add_subparsers(dest="command", required=True)
     worlds_cmd.register(subparsers)
@@ -17,6 +38,7 @@ def build_parser() -> argparse.ArgumentParser:
     edit_player.register(subparsers)
     edit_entity.register(subparsers)
     regions_cmd.register(subparsers)
+    blocks_cmd.register(subparsers)
 
     return parser
 
@@ -24,6 +46,7 @@ def build_parser() -> argparse.ArgumentParser:
 def run(argv: list[str] | None = None) -> int:
     parser = build_parser()
     args = parser.parse_args(argv)
+    configure_backups(args.backup_root, args.backup_exclude)
     handler = getattr(args, "handler", None)
     if handler is None:
         parser.print_help()
@@ -1,7 +1,10 @@
+import multiprocessing
+
 from mcworldmgr.app import run
 
 
 def main() -> int:
+    multiprocessing.freeze_support()
     return run()
 
 
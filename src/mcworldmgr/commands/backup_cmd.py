@@ -2,11 +2,22 @@ from __future__ import annotations
 
 import argparse
 
+from mcworldmgr.commands.regions_cmd import parse_chunk
+from mcworldmgr.safety.archive import ARCHIVE_CODECS, DEFAULT_ARCHIVE_CODEC
+from mcworldmgr.safety.backup import prompt_backup_decision
+from mcworldmgr.safety.retention import parse_size
 from mcworldmgr.services.operations import (
     create_backup_for_world,
     list_backups_for_world,
+    list_undo_entries,
+    prune_backups_for_world,
     restore_backup_for_world,
+    restore_chunks_from_backup,
+    restore_file_from_backup,
+    undo_operation,
+    verify_backup_for_world,
 )
+from mcworldmgr.world.discovery import OVERWORLD
 
 
 def register(subparsers: argparse._SubParsersAction[argparse.ArgumentParser]) -> None:
@@ -15,6 +26,14 @@ def register(subparsers: argparse._SubParsersAction[argparse.ArgumentParser]) ->
 
     create_parser = backup_sub.add_parser("create", help="Create backup")
     create_parser.add_argument("--world", required=True)
+    create_parser.add_argument(
+        "--archive",
+        nargs="?",
+        const=DEFAULT_ARCHIVE_CODEC,
+        choices=sorted(ARCHIVE_CODECS),
+        help=f"Write one self-contained .tar instead of a snapshot; members compressed with "
+        f"the given codec (default {DEFAULT_ARCHIVE_CODEC}), region files stored as is",
+    )
     create_parser.set_defaults(handler=handle_create)
 
     list_parser = backup_sub.add_parser("list", help="List backups")
@@ -23,12 +42,71 @@ def register(subparsers: argparse._SubParsersAction[argparse.ArgumentParser]) ->
 
     restore_parser = backup_sub.add_parser("restore", help="Restore backup")
     restore_parser.add_argument("--world", required=True)
-    restore_parser.add_argument("--name", required=True, help="Backup folder name")
+    restore_parser.add_argument("--name", required=True, help="Backup name")
+    restore_parser.add_argument(
+        "--swap",
+        action="store_true",
+        help="Build the restored world next to it and swap it in with a rename instead of updating in place",
+    )
     restore_parser.set_defaults(handler=handle_restore)
 
+    chunks_parser = backup_sub.add_parser(
+        "restore-chunks", help="Restore a rectangle of chunks from a backup, leaving the rest of the world as is"
+    )
+    chunks_parser.add_argument("--world", required=True)
+    chunks_parser.add_argument("--name", required=True, help="Backup name")
+    chunks_parser.add_argument("--from", dest="from_chunk", type=parse_chunk, required=True, help="Chunk X,Z")
+    chunks_parser.add_argument("--to", dest="to_chunk", type=parse_chunk, required=True, help="Chunk X,Z")
+    chunks_parser.add_argument("--dimension", default=OVERWORLD, help=f"Default: {OVERWORLD}")
+    chunks_parser.set_defaults(handler=handle_restore_chunks)
+
+    file_parser = backup_sub.add_parser("restore-file", help="Restore level.dat or one player file from a backup")
+    file_parser.add_argument("--world", required=True)
+    file_parser.add_argument("--name", required=True, help="Backup name")
+    target = file_parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--file", help="Path inside the world, example: level.dat")
+    target.add_argument("--player", help="Player UUID; restores playerdata/<uuid>.dat")
+    file_parser.set_defaults(handler=handle_restore_file)
+
+    verify_parser = backup_sub.add_parser("verify", help="Re-hash a backup and report damaged or missing files")
+    verify_parser.add_argument("--world", required=True)
+    verify_parser.add_argument("--name", required=True, help="Backup name")
+    verify_parser.add_argument(
+        "--deep", action="store_true", help="Also decompress and parse every region chunk in the backup"
+    )
+    verify_parser.add_argument("--workers", type=int, help="Threads to use (default: CPU count + 4, max 32)")
+    verify_parser.set_defaults(handler=handle_verify)
+
+    prune_parser = backup_sub.add_parser(
+        "prune", help="Delete old backups by retention rules and a size budget; the newest is always kept"
+    )
+    prune_parser.add_argument("--world", required=True)
+    prune_parser.add_argument(
+        "--hourly", type=int, default=0, help="Keep the newest backup of each of the last N hours"
+    )
+    prune_parser.add_argument(
+        "--daily", type=int, default=0, help="Keep the newest backup of each of the last N days"
+    )
+    prune_parser.add_argument(
+        "--weekly", type=int, default=0, help="Keep the newest backup of each of the last N weeks"
+    )
+    prune_parser.add_argument(
+        "--max-size",
+        type=parse_size,
+        help="Then drop the oldest backups until shared data counted once fits, example: 20G",
+    )
+    prune_parser.add_argument("--dry-run", action="store_true", help="Only report what would be removed")
+    prune_parser.set_defaults(handler=handle_prune)
+
+    undo_parser = backup_sub.add_parser("undo", help="Revert the files saved before the latest write operation")
+    undo_parser.add_argument("--world", required=True)
+    undo_parser.add_argument("--name", help="Undo entry to revert instead of the latest")
+    undo_parser.add_argument("--list", action="store_true", help="List undo entries, newest first")
+    undo_parser.set_defaults(handler=handle_undo)
+
 
 def handle_create(args: argparse.Namespace) -> int:
-    backup_path = create_backup_for_world(args.world, args.saves_dir)
+    backup_path = create_backup_for_world(args.world, args.saves_dir, archive_codec=args.archive)
     print(f"Backup created: {backup_path}")
     return 0
 
@@ -44,6 +122,88 @@ def handle_list(args: argparse.Namespace) -> int:
 
 
 def handle_restore(args: argparse.Namespace) -> int:
-    restore_backup_for_world(args.world, args.name, args.saves_dir)
-    print(f"Backup restored: {args.name}")
+    result = restore_backup_for_world(args.world, args.name, args.saves_dir, swap=args.swap)
+    print(
+        f"Backup restored: {args.name} ({result['written']} file(s) written, "
+        f"{result['unchanged']} unchanged, {result['deleted']} deleted)"
+    )
+    return 0
+
+
+def handle_restore_chunks(args: argparse.Namespace) -> int:
+    result = restore_chunks_from_backup(
+        args.world,
+        args.name,
+        args.from_chunk,
+        args.to_chunk,
+        args.saves_dir,
+        dimension=args.dimension,
+        backup_before_write=prompt_backup_decision(),
+    )
+    print(
+        f"Restored {result['chunks']} chunk record(s) and cleared {result['cleared']} "
+        f"from backup {args.name}."
+    )
+    if result["unreadable"]:
+        print(f"Skipped {result['unreadable']} unreadable source chunk(s); the target keeps its own copy.")
+    return 0
+
+
+def handle_restore_file(args: argparse.Namespace) -> int:
+    relative = args.file if args.file else f"playerdata/{args.player}.dat"
+    path = restore_file_from_backup(
+        args.world,
+        args.name,
+        relative,
+        args.saves_dir,
+        backup_before_write=prompt_backup_decision(),
+    )
+    print(f"Restored {path} from backup {args.name}.")
+    return 0
+
+
+def handle_verify(args: argparse.Namespace) -> int:
+    report = verify_backup_for_world(args.world, args.name, args.saves_dir, deep=args.deep, workers=args.workers)
+    for issue in report.issues:
+        print(f"- {issue.path}: {issue.problem}")
+    if not report.checksummed:
+        print("This backup has no recorded checksums; only region contents could be checked.")
+    if not report.ok:
+        print(f"Backup {args.name}: {len(report.issues)} problem(s) in {report.files} file(s).")
+        return 1
+    print(f"Backup {args.name}: {report.files} file(s) OK.")
+    return 0
+
+
+def handle_prune(args: argparse.Namespace) -> int:
+    result = prune_backups_for_world(
+        args.world,
+        args.saves_dir,
+        hourly=args.hourly,
+        daily=args.daily,
+        weekly=args.weekly,
+        max_bytes=args.max_size,
+        dry_run=args.dry_run,
+    )
+    for name in result.removed:
+        print(f"- {name}")
+    verb = "Would remove" if args.dry_run else "Removed"
+    print(
+        f"{verb} {len(result.removed)} backup(s) and {result.objects_removed} unreferenced object(s), "
+        f"kept {len(result.kept)}: {result.bytes_before} -> {result.bytes_after} bytes."
+    )
+    return 0
+
+
+def handle_undo(args: argparse.Namespace) -> int:
+    if args.list:
+        entries = list_undo_entries(args.world, args.saves_dir)
+        if not entries:
+            print("Nothing to undo.")
+            return 0
+        for entry in entries:
+            print(f"- {entry.name}: {entry.operation}, {len(entry.files) + len(entry.absent)} file(s)")
+        return 0
+    entry = undo_operation(args.world, args.saves_dir, name=args.name)
+    print(f"Undone: {entry.operation} ({entry.name}), {len(entry.files) + len(entry.absent)} file(s) reverted.")
     return 0
@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+import argparse
+import heapq
+import json
+from collections import Counter
+from dataclasses import asdict
+
+from mcworldmgr.safety.backup import prompt_backup_decision
+from mcworldmgr.services.block_index import find_blocks
+from mcworldmgr.services.lag import ChunkBlockActivity, clear_scheduled_ticks, scan_block_activity
+
+
+def register(subparsers: argparse._SubParsersAction[argparse.ArgumentParser]) -> None:
+    parser = subparsers.add_parser("blocks", help="Block search and analysis")
+    blocks_sub = parser.add_subparsers(dest="blocks_command", required=True)
+
+    find_parser = blocks_sub.add_parser("find", help="Find blocks by id using the incremental block index")
+    find_parser.add_argument("--world", required=True)
+    find_parser.add_argument(
+        "--id", dest="block_ids", action="append", required=True, help="Example: minecraft:spawner (repeatable)"
+    )
+    find_parser.add_argument("--limit", type=int, default=1000, help="Maximum positions to print (0 = all)")
+    find_parser.add_argument("--workers", type=int, help="Worker processes (default: CPU count)")
+    find_parser.set_defaults(handler=handle_find)
+
+    hotspots_parser = blocks_sub.add_parser(
+        "hotspots", help="Rank chunks by block entities and scheduled block/fluid ticks"
+    )
+    hotspots_parser.add_argument("--world", required=True)
+    hotspots_parser.add_argument("--top", type=int, default=20, help="Chunks per ranking (default: 20)")
+    hotspots_parser.add_argument(
+        "--type", dest="block_entity_type", help="Rank by one block entity type, example: minecraft:hopper"
+    )
+    hotspots_parser.add_argument(
+        "--jsonl", action="store_true", help="Stream every active chunk as one JSON object per line"
+    )
+    hotspots_parser.add_argument("--workers", type=int, help="Worker processes (default: CPU count)")
+    hotspots_parser.set_defaults(handler=handle_hotspots)
+
+    ticks_parser = blocks_sub.add_parser(
+        "clear-ticks", help="Clear block_ticks/fluid_ticks lists longer than a threshold in every dimension"
+    )
+    ticks_parser.add_argument("--world", required=True)
+    ticks_parser.add_argument("--max-ticks", type=int, required=True, help="Lists longer than this are cleared")
+    ticks_parser.add_argument(
+        "--truncate", action="store_true", help="Keep the --max-ticks soonest ticks instead of clearing the list"
+    )
+    ticks_parser.add_argument("--dry-run", action="store_true", help="Only report what would be removed")
+    ticks_parser.add_argument("--workers", type=int, help="Worker processes (default: CPU count)")
+    ticks_parser.set_defaults(handler=handle_clear_ticks)
+
+
+def handle_find(args: argparse.Namespace) -> int:
+    hits = find_blocks(args.world, args.block_ids, args.saves_dir, workers=args.workers)
+    if not hits:
+        print("No matching blocks found.")
+        return 0
+    shown = hits if args.limit <= 0 else hits[: args.limit]
+    for hit in shown:
+        print(f"{hit.dimension} {hit.block_id} {hit.x} {hit.y} {hit.z}")
+    if len(shown) < len(hits):
+        print(f"... {len(hits) - len(shown)} more not shown")
+    print(f"Found {len(hits)} block(s).")
+    return 0
+
+
+def _format_activity(item: ChunkBlockActivity) -> str:
+    top_types = ", ".join(f"{name}={count}" for name, count in list(item.block_entities.items())[:3])
+    return (
+        f"{item.dimension} chunk {item.chunk_x},{item.chunk_z} "
+        f"(block {item.chunk_x * 16},{item.chunk_z * 16}): "
+        f"block_entities={item.block_entity_count} block_ticks={item.block_ticks} "
+        f"fluid_ticks={item.fluid_ticks} [{top_types}]"
+    )
+
+
+def _push_top(
+    heap: list[tuple[int, int, ChunkBlockActivity]], limit: int, score: int, order: int, item: ChunkBlockActivity
+) -> None:
+    if score <= 0:
+        return
+    entry = (score, -order, item)
+    if len(heap) < limit:
+        heapq.heappush(heap, entry)
+    elif entry[:2] > heap[0][:2]:
+        heapq.heapreplace(heap, entry)
+
+
+def _print_ranking(heap: list[tuple[int, int, ChunkBlockActivity]]) -> None:
+    # Heap entries compare on (score, -order) only; the activity record itself is never compared.
+    for rank, (_, _, item) in enumerate(sorted(heap, key=lambda entry: entry[:2], reverse=True), start=1):
+        print(f"{rank:>3}. {_format_activity(item)}")
+
+
+def handle_hotspots(args: argparse.Namespace) -> int:
+    activity = scan_block_activity(args.world, args.saves_dir, workers=args.workers)
+    if args.jsonl:
+        for item in activity:
+            print(json.dumps(asdict(item)), flush=True)
+        return 0
+
+    # Bounded heaps keep memory flat however many active chunks the world has.
+    by_entities: list[tuple[int, int, ChunkBlockActivity]] = []
+    by_ticks: list[tuple[int, int, ChunkBlockActivity]] = []
+    totals: Counter[str] = Counter()
+    chunks = 0
+    for order, item in enumerate(activity):
+        chunks += 1
+        totals.update(item.block_entities)
+        if args.block_entity_type:
+            entity_score = item.block_entities.get(args.block_entity_type, 0)
+        else:
+            entity_score = item.block_entity_count
+        _push_top(by_entities, args.top, entity_score, order, item)
+        _push_top(by_ticks, args.top, item.scheduled_ticks, order, item)
+
+    if not chunks:
+        print("No block entities or scheduled ticks found.")
+        return 0
+    label = args.block_entity_type or "block entities"
+    print(f"Top chunks by {label}:")
+    _print_ranking(by_entities)
+    print("Top chunks by scheduled ticks:")
+    _print_ranking(by_ticks)
+    print("Block entities by type:")
+    for name, count in totals.most_common():
+        print(f"- {name}: {count}")
+    return 0
+
+
+def handle_clear_ticks(args: argparse.Namespace) -> int:
+    result = clear_scheduled_ticks(
+        args.world,
+        args.max_ticks,
+        args.saves_dir,
+        truncate=args.truncate,
+        dry_run=args.dry_run,
+        workers=args.workers,
+        backup_before_write=False if args.dry_run else prompt_backup_decision(),
+    )
+    verb = "Would remove" if args.dry_run else "Removed"
+    print(
+        f"{verb} {result['ticks']} scheduled tick(s) from {result['chunks']} chunk(s) "
+        f"in {result['regions']} region file(s)."
+    )
+    return 0
@@ -1,8 +1,11 @@
 from __future__ import annotations
 
 import argparse
+import json
+from dataclasses import asdict
 
 from mcworldmgr.safety.backup import prompt_backup_decision
+from mcworldmgr.services.entities import entity_hotspots, purge_entities
 from mcworldmgr.services.operations import (
     delete_all_entity_regions,
     delete_entity_region,
@@ -29,6 +32,27 @@ def register(subparsers: argparse._SubParsersAction[argparse.ArgumentParser]) ->
     delete_all.add_argument("--world", required=True)
     delete_all.set_defaults(handler=handle_delete_all_regions)
 
+    purge_parser = entity_sub.add_parser(
+        "purge", help="Remove entities by type and/or bounding box directly from entity region files"
+    )
+    purge_parser.add_argument("--world", required=True)
+    purge_parser.add_argument(
+        "--type", dest="types", action="append", help="Example: minecraft:item (repeatable)"
+    )
+    purge_parser.add_argument(
+        "--bbox", type=float, nargs=6, metavar=("X1", "Y1", "Z1", "X2", "Y2", "Z2"), help="Block coordinates"
+    )
+    purge_parser.add_argument("--dry-run", action="store_true", help="Only report what would be removed")
+    purge_parser.add_argument("--workers", type=int, help="Worker processes (default: CPU count)")
+    purge_parser.set_defaults(handler=handle_purge)
+
+    hotspots_parser = entity_sub.add_parser("hotspots", help="Rank chunks by entity count")
+    hotspots_parser.add_argument("--world", required=True)
+    hotspots_parser.add_argument("--top", type=int, default=50, help="Number of chunks to list (0 = all)")
+    hotspots_parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    hotspots_parser.add_argument("--workers", type=int, help="Worker processes (default: CPU count)")
+    hotspots_parser.set_defaults(handler=handle_hotspots)
+
     summon_parser = entity_sub.add_parser(
         "queue-summon", help="Queue summon command in world command file"
     )
@@ -79,6 +103,45 @@ def handle_delete_all_regions(args: argparse.Namespace) -> int:
     return 0
 
 
+def handle_purge(args: argparse.Namespace) -> int:
+    result = purge_entities(
+        args.world,
+        args.saves_dir,
+        types=args.types,
+        bbox=args.bbox,
+        dry_run=args.dry_run,
+        workers=args.workers,
+        backup_before_write=False if args.dry_run else prompt_backup_decision(),
+    )
+    verb = "Would remove" if args.dry_run else "Removed"
+    print(
+        f"{verb} {result['entities']} entit{'y' if result['entities'] == 1 else 'ies'} "
+        f"from {result['chunks']} chunk(s) in {result['regions']} entity region file(s)."
+    )
+    return 0
+
+
+def handle_hotspots(args: argparse.Namespace) -> int:
+    report = entity_hotspots(args.world, args.saves_dir, top=args.top, workers=args.workers)
+    if args.json:
+        print(json.dumps(asdict(report), indent=2))
+        return 0
+    if not report.total:
+        print("No entities found.")
+        return 0
+    print(f"Entities: {report.total} in {report.chunks_with_entities} chunk(s)")
+    for rank, item in enumerate(report.chunks, start=1):
+        top_types = ", ".join(f"{name}={count}" for name, count in list(item.types.items())[:3])
+        print(
+            f"{rank:>3}. chunk {item.chunk_x},{item.chunk_z} "
+            f"(block {item.chunk_x * 16},{item.chunk_z * 16}): {item.total} [{top_types}]"
+        )
+    print("By type:")
+    for name, count in report.types.items():
+        print(f"- {name}: {count}")
+    return 0
+
+
 def handle_queue_summon(args: argparse.Namespace) -> int:
     path = queue_summon_entity(
         args.world,
@@ -24,4 +24,5 @@ def handle_inspect(args: argparse.Namespace) -> int:
     print(f"Players: {info['players_count']}")
     print(f"Regions: {info['regions_count']}")
     print(f"Entity regions: {info['entity_regions_count']}")
+    print(f"Chunks: {info['chunks_count']}")
     return 0
@@ -1,9 +1,24 @@
 from __future__ import annotations
 
 import argparse
+from collections import Counter
+from datetime import datetime
 
 from mcworldmgr.safety.backup import prompt_backup_decision
-from mcworldmgr.services.operations import delete_region, list_region_files, reset_chunk
+from mcworldmgr.services.operations import (
+    compact_regions,
+    copy_chunks,
+    delete_region,
+    get_region_details,
+    list_region_files,
+    prune_chunks,
+    recompress_regions,
+    reset_chunk,
+    trim_world,
+)
+from mcworldmgr.services.scan import scan_world
+from mcworldmgr.world.discovery import OVERWORLD
+from mcworldmgr.world.region import COMPRESSION_NAMES
 
 
 def register(subparsers: argparse._SubParsersAction[argparse.ArgumentParser]) -> None:
@@ -12,6 +27,11 @@ def register(subparsers: argparse._SubParsersAction[argparse.ArgumentParser]) ->
 
     list_parser = regions_sub.add_parser("list", help="List region files")
     list_parser.add_argument("--world", required=True)
+    list_parser.add_argument(
+        "--details",
+        action="store_true",
+        help="Show chunk count, sector usage and last write time from region headers",
+    )
     list_parser.set_defaults(handler=handle_list)
 
     delete_parser = regions_sub.add_parser("delete", help="Delete one region file")
@@ -20,13 +40,91 @@ def register(subparsers: argparse._SubParsersAction[argparse.ArgumentParser]) ->
     delete_parser.set_defaults(handler=handle_delete)
 
     reset_chunk_parser = regions_sub.add_parser(
-        "reset-chunk", help="Reset a chunk by deleting its parent region file"
+        "reset-chunk", help="Reset one chunk in its region, entity and POI files"
     )
     reset_chunk_parser.add_argument("--world", required=True)
     reset_chunk_parser.add_argument("--chunk-x", type=int, required=True)
     reset_chunk_parser.add_argument("--chunk-z", type=int, required=True)
     reset_chunk_parser.set_defaults(handler=handle_reset_chunk)
 
+    scan_parser = regions_sub.add_parser("scan", help="Decode every chunk and summarize status and size")
+    scan_parser.add_argument("--world", required=True)
+    scan_parser.add_argument("--workers", type=int, help="Worker processes (default: CPU count)")
+    scan_parser.set_defaults(handler=handle_scan)
+
+    prune_parser = regions_sub.add_parser(
+        "prune", help="Delete chunks whose InhabitedTime is at or below a threshold"
+    )
+    prune_parser.add_argument("--world", required=True)
+    prune_parser.add_argument("--max-inhabited-ticks", type=int, required=True)
+    prune_parser.add_argument("--dry-run", action="store_true", help="Only report what would be deleted")
+    prune_parser.add_argument("--workers", type=int, help="Worker processes (default: CPU count)")
+    prune_parser.set_defaults(handler=handle_prune)
+
+    compact_parser = regions_sub.add_parser(
+        "compact", help="Rewrite region, entity and POI files without unused sectors"
+    )
+    compact_parser.add_argument("--world", required=True)
+    compact_parser.add_argument("--dry-run", action="store_true", help="Only report how much space would be freed")
+    compact_parser.add_argument("--workers", type=int, help="Worker processes (default: CPU count)")
+    compact_parser.set_defaults(handler=handle_compact)
+
+    recompress_parser = regions_sub.add_parser(
+        "recompress", help="Recompress every chunk with another codec or level and compact the files"
+    )
+    recompress_parser.add_argument("--world", required=True)
+    recompress_parser.add_argument("--codec", choices=sorted(COMPRESSION_NAMES), required=True)
+    recompress_parser.add_argument(
+        "--level",
+        type=int,
+        choices=range(-1, 13),
+        metavar="LEVEL",
+        help="zlib level -1-9 or gzip level 0-9 (default 6), or LZ4 HC level 1-12 (default: fast LZ4)",
+    )
+    recompress_parser.add_argument("--workers", type=int, help="Worker processes (default: CPU count)")
+    recompress_parser.set_defaults(handler=handle_recompress)
+
+    trim_parser = regions_sub.add_parser(
+        "trim", help="Delete every chunk outside a circle or polygon, in all dimensions"
+    )
+    trim_parser.add_argument("--world", required=True)
+    trim_parser.add_argument("--center", type=_parse_point, help="Block coordinates, example: 0,0")
+    trim_parser.add_argument("--radius", type=float, help="Radius in blocks around --center")
+    trim_parser.add_argument("--polygon", help="Text file with one x,z block coordinate per line")
+    trim_parser.add_argument("--dry-run", action="store_true", help="Only report what would be deleted")
+    trim_parser.add_argument("--workers", type=int, help="Worker processes (default: CPU count)")
+    trim_parser.set_defaults(handler=handle_trim)
+
+    copy_parser = regions_sub.add_parser(
+        "copy-chunks", help="Copy a rectangle of chunks from another world or backup without decompressing them"
+    )
+    copy_parser.add_argument("--world", required=True, help="Target world")
+    copy_parser.add_argument("--source", required=True, help="Source world name or folder (for example a backup)")
+    copy_parser.add_argument("--from", dest="from_chunk", type=parse_chunk, required=True, help="Chunk X,Z")
+    copy_parser.add_argument("--to", dest="to_chunk", type=parse_chunk, required=True, help="Chunk X,Z")
+    copy_parser.add_argument("--dimension", default=OVERWORLD, help=f"Default: {OVERWORLD}")
+    copy_parser.set_defaults(handler=handle_copy_chunks)
+
+
+def _parse_point(value: str) -> tuple[float, float]:
+    parts = value.split(",")
+    if len(parts) != 2:
+        raise argparse.ArgumentTypeError(f"expected X,Z but got {value!r}")
+    try:
+        return float(parts[0]), float(parts[1])
+    except ValueError as exc:
+        raise argparse.ArgumentTypeError(f"expected X,Z but got {value!r}") from exc
+
+
+def parse_chunk(value: str) -> tuple[int, int]:
+    parts = value.split(",")
+    if len(parts) != 2:
+        raise argparse.ArgumentTypeError(f"expected chunk X,Z but got {value!r}")
+    try:
+        return int(parts[0]), int(parts[1])
+    except ValueError as exc:
+        raise argparse.ArgumentTypeError(f"expected chunk X,Z but got {value!r}") from exc
+
 
 def _region_name_for_chunk(chunk_x: int, chunk_z: int) -> str:
     rx = chunk_x // 32
@@ -34,7 +132,15 @@ def _region_name_for_chunk(chunk_x: int, chunk_z: int) -> str:
     return f"r.{rx}.{rz}.mca"
 
 
+def _format_timestamp(timestamp: int) -> str:
+    if timestamp == 0:
+        return "-"
+    return datetime.fromtimestamp(timestamp).strftime("%Y-%m-%d %H:%M:%S")
+
+
 def handle_list(args: argparse.Namespace) -> int:
+    if args.details:
+        return _handle_list_details(args)
     files = list_region_files(args.world, args.saves_dir)
     if not files:
         print("No region files found.")
@@ -44,6 +150,20 @@ def handle_list(args: argparse.Namespace) -> int:
     return 0
 
 
+def _handle_list_details(args: argparse.Namespace) -> int:
+    details = get_region_details(args.world, args.saves_dir)
+    if not details:
+        print("No region files found.")
+        return 0
+    for item in details:
+        print(
+            f"{item['name']}: chunks={item['chunk_count']} "
+            f"sectors={item['used_sectors']}/{item['file_sectors']} "
+            f"size={item['size_bytes']} last_write={_format_timestamp(item['last_modified'])}"
+        )
+    return 0
+
+
 def handle_delete(args: argparse.Namespace) -> int:
     delete_region(
         args.world,
@@ -63,8 +183,126 @@ def handle_reset_chunk(args: argparse.Namespace) -> int:
         args.saves_dir,
         backup_before_write=prompt_backup_decision(),
     )
+    print(f"Chunk {args.chunk_x},{args.chunk_z} reset in {region_name}.")
+    return 0
+
+
+def handle_scan(args: argparse.Namespace) -> int:
+    statuses: Counter[str] = Counter()
+    total_bytes = 0
+    max_inhabited = 0
+    for summary in scan_world(args.world, args.saves_dir, workers=args.workers):
+        statuses[summary.status] += 1
+        total_bytes += summary.byte_size
+        max_inhabited = max(max_inhabited, summary.inhabited_time)
+    if not statuses:
+        print("No chunks found.")
+        return 0
+    print(f"Chunks: {sum(statuses.values())}")
+    print(f"Compressed bytes: {total_bytes}")
+    print(f"Max InhabitedTime: {max_inhabited}")
+    for status, count in statuses.most_common():
+        print(f"- {status or '<none>'}: {count}")
+    return 0
+
+
+def handle_prune(args: argparse.Namespace) -> int:
+    result = prune_chunks(
+        args.world,
+        args.max_inhabited_ticks,
+        args.saves_dir,
+        dry_run=args.dry_run,
+        workers=args.workers,
+        backup_before_write=False if args.dry_run else prompt_backup_decision(),
+    )
+    if args.dry_run:
+        print(
+            f"Would delete {result['chunks']} chunk(s) in {result['regions']} region file(s), "
+            f"removing {result['files_deleted']} empty file(s) to release {result['bytes']} bytes and freeing "
+            f"{result['bytes_unused']} bytes inside region files (run regions compact to release them)."
+        )
+        return 0
+    print(
+        f"Deleted {result['chunks']} chunk(s) in {result['regions']} region file(s); "
+        f"{result['files_deleted']} empty file(s) removed, {result['bytes']} bytes released, "
+        f"{result['bytes_unused']} bytes freed inside region files (run regions compact to release them)."
+    )
+    return 0
+
+
+def handle_compact(args: argparse.Namespace) -> int:
+    result = compact_regions(
+        args.world,
+        args.saves_dir,
+        dry_run=args.dry_run,
+        workers=args.workers,
+        backup_before_write=False if args.dry_run else prompt_backup_decision(),
+    )
+    saved = result["bytes_before"] - result["bytes_after"]
+    verb = "Would compact" if args.dry_run else "Compacted"
+    print(
+        f"{verb} {result['compacted']} of {result['files']} file(s): "
+        f"{result['bytes_before']} -> {result['bytes_after']} bytes ({saved} bytes freed)."
+    )
+    return 0
+
+
+def handle_recompress(args: argparse.Namespace) -> int:
+    result = recompress_regions(
+        args.world,
+        args.codec,
+        args.saves_dir,
+        level=args.level,
+        workers=args.workers,
+        backup_before_write=prompt_backup_decision(),
+    )
+    print(
+        f"Recompressed {result['chunks']} chunk(s) in {result['files']} file(s) with {args.codec}: "
+        f"{result['bytes_before']} -> {result['bytes_after']} bytes."
+    )
+    return 0
+
+
+def handle_trim(args: argparse.Namespace) -> int:
+    result = trim_world(
+        args.world,
+        args.saves_dir,
+        center=args.center,
+        radius=args.radius,
+        polygon_file=args.polygon,
+        dry_run=args.dry_run,
+        workers=args.workers,
+        backup_before_write=False if args.dry_run else prompt_backup_decision(),
+    )
+    if args.dry_run:
+        print(
+            f"Would delete {result['chunks']} chunk(s): {result['files_deleted']} whole file(s), releasing "
+            f"{result['bytes']} bytes, and {result['files_trimmed']} partially trimmed file(s), freeing "
+            f"{result['bytes_unused']} bytes inside them (run regions compact to release them)."
+        )
+        return 0
+    print(
+        f"Deleted {result['chunks']} chunk(s): {result['files_deleted']} file(s) removed, "
+        f"{result['bytes']} bytes released; {result['files_trimmed']} file(s) trimmed, "
+        f"{result['bytes_unused']} bytes freed inside them (run regions compact to release them)."
+    )
+    return 0
+
+
+def handle_copy_chunks(args: argparse.Namespace) -> int:
+    result = copy_chunks(
+        args.source,
+        args.world,
+        args.from_chunk,
+        args.to_chunk,
+        args.saves_dir,
+        dimension=args.dimension,
+        backup_before_write=prompt_backup_decision(),
+    )
     print(
-        "Reset chunk operation completed by deleting parent region file "
-        f"{region_name}."
+        f"Copied {result['chunks']} chunk record(s) and cleared {result['cleared']} "
+        f"across {result['files']} region, entity and POI file(s)."
     )
+    if result["unreadable"]:
+        print(f"Skipped {result['unreadable']} unreadable source chunk(s); the target keeps its own copy.")
     return 0
@@ -6,6 +6,8 @@ import tkinter as tk
 from tkinter import messagebox, ttk
 from typing import Callable
 
+from mcworldmgr.safety.backup import configure_backups
+from mcworldmgr.safety.progress import TransferFn, TransferProgress, format_progress
 from mcworldmgr.services import operations
 
 
@@ -26,12 +28,16 @@ class App:
         self.world_var = tk.StringVar(value="")
         self.world_path_var = tk.StringVar(value="")
         self.status_var = tk.StringVar(value="Ready")
+        self.backup_root_var = tk.StringVar(value="")
+        self.backup_exclude_var = tk.StringVar(value="")
 
         self.backup_progress_var = tk.DoubleVar(value=0)
-        self.backup_progress_total = 1
         self.backup_progress_text = tk.StringVar(value="0/0")
 
         self._build_header()
+        self._apply_backup_settings()
+        for variable in (self.backup_root_var, self.backup_exclude_var):
+            variable.trace_add("write", lambda *_: self._apply_backup_settings())
         self._build_tabs()
         self._build_footer()
         self.refresh_worlds()
@@ -58,6 +64,16 @@ class App:
             row=2, column=1, sticky="ew", padx=6, pady=6
         )
 
+        ttk.Label(frame, text="Backup root override:").grid(row=3, column=0, sticky="w", padx=6, pady=6)
+        ttk.Entry(frame, textvariable=self.backup_root_var, width=70).grid(
+            row=3, column=1, sticky="ew", padx=6, pady=6
+        )
+
+        ttk.Label(frame, text="Backup exclude patterns:").grid(row=4, column=0, sticky="w", padx=6, pady=6)
+        ttk.Entry(frame, textvariable=self.backup_exclude_var, width=70).grid(
+            row=4, column=1, sticky="ew", padx=6, pady=6
+        )
+
         frame.columnconfigure(1, weight=1)
 
     def _build_tabs(self) -> None:
@@ -106,6 +122,11 @@ class App:
         value = self.saves_dir_var.get().strip()
         return value or None
 
+    def _apply_backup_settings(self) -> None:
+        # Same settings as the CLI's --backup-root and --backup-exclude; empty keeps the defaults.
+        patterns = [item.strip() for item in self.backup_exclude_var.get().split(",") if item.strip()]
+        configure_backups(self.backup_root_var.get().strip() or None, patterns)
+
     def _confirm(self, message: str) -> bool:
         return bool(messagebox.askyesno("Confirm", message))
 
@@ -113,7 +134,7 @@ class App:
         return bool(messagebox.askyesno("Confirm Write", "This will modify world data. Continue?"))
 
     def _ask_backup(self) -> bool:
-        return bool(messagebox.askyesno("Backup", "Create backup before this write action?"))
+        return bool(messagebox.askyesno("Backup", "Save undo copies of the affected files before this write action?"))
 
     def _handle_error(self, error: Exception) -> None:
         self.status_var.set(f"Error: {error}")
@@ -130,9 +151,10 @@ class App:
         except Exception as exc:
             self._handle_error(exc)
 
-    def _run_background(self, work: Callable[[Callable[[int, int, str], None]], object], done_event: str) -> None:
-        def progress(current: int, total: int, label: str) -> None:
-            self.event_queue.put(("progress", (current, total, label)))
+    def _run_background(self, work: Callable[[TransferFn], object], done_event: str) -> None:
+        # The meter already limits updates to a few per second, so each one is queued as is.
+        def progress(update: TransferProgress) -> None:
+            self.event_queue.put(("progress", update))
 
         def runner() -> None:
             try:
@@ -144,15 +166,18 @@ class App:
         threading.Thread(target=runner, daemon=True).start()
 
     def _poll_events(self) -> None:
+        # Only the newest progress update of each poll is drawn.
+        latest: TransferProgress | None = None
         try:
             while True:
                 event, payload = self.event_queue.get_nowait()
                 if event == "progress":
-                    current, total, label = payload  # type: ignore[misc]
-                    self.backup_progress_total = max(total, 1)
-                    self.backup_progress_var.set((current / self.backup_progress_total) * 100)
-                    self.backup_progress_text.set(f"{current}/{total} {label}")
-                elif event == "backup_created":
+                    latest = payload  # type: ignore[assignment]
+                    continue
+                if latest is not None:
+                    self._show_progress(latest)
+                    latest = None
+                if event == "backup_created":
                     self.status_var.set(f"Backup created: {payload}")
                     messagebox.showinfo("Success", f"Backup created:\n{payload}")
                     self.refresh_backups()
@@ -163,8 +188,14 @@ class App:
                     self._handle_error(payload)  # type: ignore[arg-type]
         except queue.Empty:
             pass
+        if latest is not None:
+            self._show_progress(latest)
         self.root.after(100, self._poll_events)
 
+    def _show_progress(self, update: TransferProgress) -> None:
+        self.backup_progress_var.set(update.fraction * 100)
+        self.backup_progress_text.set(format_progress(update))
+
     def _build_inspect_tab(self) -> None:
         ttk.Button(self.inspect_tab, text="Inspect World", command=self.on_inspect).pack(anchor="w", padx=8, pady=8)
         self.inspect_text = tk.Text(self.inspect_tab, height=24)
@@ -185,6 +216,7 @@ class App:
                 f"Players: {info['players_count']}",
                 f"Regions: {info['regions_count']}",
                 f"Entity regions: {info['entity_regions_count']}",
+                f"Chunks: {info['chunks_count']}",
             ]
             self.inspect_text.delete("1.0", tk.END)
             self.inspect_text.insert("1.0", "\n".join(lines))
@@ -230,7 +262,7 @@ class App:
             self.backup_progress_var.set(0)
             self.backup_progress_text.set("0/0")
 
-            def work(progress: Callable[[int, int, str], None]) -> str:
+            def work(progress: TransferFn) -> str:
                 result = operations.create_backup_for_world(
                     world_arg,
                     self._saves_dir(),
@@ -257,7 +289,7 @@ class App:
             self.backup_progress_var.set(0)
             self.backup_progress_text.set("0/0")
 
-            def work(progress: Callable[[int, int, str], None]) -> str:
+            def work(progress: TransferFn) -> str:
                 operations.restore_backup_for_world(
                     world_arg,
                     backup_name,
@@ -687,7 +719,7 @@ class App:
         self.region_list = tk.Listbox(frame, height=14)
         self.region_list.pack(fill=tk.BOTH, expand=True, pady=8)
 
-        reset = ttk.LabelFrame(frame, text="Reset Chunk (deletes parent region file)")
+        reset = ttk.LabelFrame(frame, text="Reset Chunk (clears it from region, entity and POI files)")
         reset.pack(fill=tk.X, pady=6)
         self.chunk_x_var = tk.StringVar()
         self.chunk_z_var = tk.StringVar()
@@ -729,7 +761,7 @@ class App:
 
     def on_reset_chunk(self) -> None:
         try:
-            if not self._confirm("Reset chunk by deleting parent region file?"):
+            if not self._confirm("Reset chunk? It will be regenerated the next time it loads."):
                 return
             chunk_x = self._require_int(self.chunk_x_var.get(), "Chunk X")
             chunk_z = self._require_int(self.chunk_z_var.get(), "Chunk Z")
@@ -742,8 +774,8 @@ class App:
                 backup_before_write=self._ask_backup(),
             )
             self.refresh_regions()
-            self.status_var.set(f"Chunk reset via deleted region: {region_name}")
-            messagebox.showinfo("Success", f"Deleted region: {region_name}")
+            self.status_var.set(f"Chunk {chunk_x},{chunk_z} reset in {region_name}")
+            messagebox.showinfo("Success", f"Chunk {chunk_x},{chunk_z} reset in {region_name}")
         except Exception as exc:
             self._handle_error(exc)
 
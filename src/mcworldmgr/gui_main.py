@@ -1,7 +1,10 @@
+import multiprocessing
+
 from mcworldmgr.gui.app import launch_gui
 
 
 def main() -> int:
+    multiprocessing.freeze_support()
     launch_gui()
     return 0
 
@@ -0,0 +1,232 @@
+from __future__ import annotations
+
+import gzip
+import hashlib
+import io
+import json
+import lzma
+import os
+import tarfile
+import tempfile
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Sequence
+
+from mcworldmgr.safety.fastcopy import default_workers
+from mcworldmgr.safety.progress import ByteFn, ProgressMeter, TransferFn
+from mcworldmgr.world.region import REGION_NAME_RE
+
+ARCHIVE_SUFFIX = ".tar"
+INDEX_NAME = ".mcworldmgr-index.json"
+INDEX_VERSION = 1
+CODEC_NONE = "none"
+# Member suffix of each codec. Compressed members are runs of independently compressed
+# blocks; concatenated gzip members and xz streams are still valid .gz/.xz files.
+ARCHIVE_CODECS = {"gzip": ".gz", "xz": ".xz"}
+DEFAULT_ARCHIVE_CODEC = "gzip"
+_BLOCK_SIZE = 1 << 20
+_GZIP_MAGIC = b"\x1f\x8b"
+
+
+@dataclass(frozen=True)
+class ArchiveEntry:
+    path: str
+    size: int
+    mtime_ns: int
+    offset: int
+    stored_size: int
+    codec: str
+    digest: str = ""
+
+
+def is_archive(path: Path) -> bool:
+    return path.is_file() and path.name.endswith(ARCHIVE_SUFFIX)
+
+
+def _stored_raw(path: Path, head: bytes) -> bool:
+    # Region files hold compressed chunks and level.dat/playerdata are gzipped NBT;
+    # compressing them again costs CPU for almost no space.
+    return bool(REGION_NAME_RE.match(path.name)) or path.suffix == ".mcc" or head.startswith(_GZIP_MAGIC)
+
+
+def _compress_block(codec: str, level: int, block: bytes) -> bytes:
+    if codec == "xz":
+        return lzma.compress(block, preset=level)
+    return gzip.compress(block, compresslevel=level, mtime=0)
+
+
+def _decompress(codec: str, data: bytes) -> bytes:
+    if codec == "xz":
+        return lzma.decompress(data)
+    if codec == "gzip":
+        return gzip.decompress(data)
+    return data
+
+
+class _CountingReader:
+    # tarfile copies a member with read() calls on its file object; each one is hashed
+    # and reported, so raw members are read only once.
+    def __init__(self, handle: io.BufferedReader, on_bytes: ByteFn) -> None:
+        self._handle = handle
+        self._on_bytes = on_bytes
+        self.digest = hashlib.sha256()
+
+    def read(self, size: int = -1) -> bytes:
+        block = self._handle.read(size)
+        self.digest.update(block)
+        self._on_bytes(len(block))
+        return block
+
+
+@dataclass
+class _Pending:
+    path: Path
+    relative: str
+    mtime_ns: int
+    size: int
+    codec: str
+    blocks: list[Future[bytes]]
+    digest: str = ""
+
+
+def write_archive(
+    target: Path,
+    files: Sequence[tuple[Path, str, int]],
+    *,
+    codec: str = DEFAULT_ARCHIVE_CODEC,
+    level: int = 6,
+    workers: int | None = None,
+    progress: TransferFn | None = None,
+) -> list[ArchiveEntry]:
+    # Streams (path, relative, mtime_ns) files into one uncompressed tar. Members that are
+    # worth compressing are cut into 1 MiB blocks compressed on a thread pool (zlib and
+    # lzma drop the GIL) while earlier members are being written. At most pool_size * 2
+    # blocks wait for compression and at most that many compressed blocks wait to be
+    # written, except for a single member larger than that, whose compressed output has to
+    # be complete before its tar header. SHA-256 is computed as each file is read.
+    # The index goes in as the last member.
+    if codec not in ARCHIVE_CODECS:
+        raise ValueError(f"Unknown archive codec: {codec}")
+    pool_size = max(1, workers or default_workers())
+    limit = pool_size * 2
+    target.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(prefix=f".{target.name}.", suffix=".partial", dir=str(target.parent))
+    os.close(fd)
+    tmp_path = Path(tmp_name)
+    entries: list[ArchiveEntry] = []
+    total = len(files)
+    meter = ProgressMeter(progress, total, sum(os.stat(path).st_size for path, _, _ in files))
+    try:
+        with ThreadPoolExecutor(max_workers=pool_size) as pool, tarfile.open(
+            tmp_path, "w", format=tarfile.PAX_FORMAT
+        ) as tar:
+            window: deque[_Pending] = deque()
+            running: deque[Future[bytes]] = deque()
+            window_blocks = 0
+
+            def flush_one() -> None:
+                nonlocal window_blocks
+                item = window.popleft()
+                window_blocks -= len(item.blocks)
+                info = tarfile.TarInfo(item.relative + ARCHIVE_CODECS.get(item.codec, ""))
+                info.mtime = item.mtime_ns / 1e9
+                if item.codec == CODEC_NONE:
+                    info.size = item.size
+                    with item.path.open("rb") as handle:
+                        reader = _CountingReader(handle, meter.advance)
+                        tar.addfile(info, reader)  # type: ignore[arg-type]
+                    item.digest = reader.digest.hexdigest()
+                else:
+                    payload = b"".join(future.result() for future in item.blocks)
+                    info.size = len(payload)
+                    tar.addfile(info, io.BytesIO(payload))
+                    meter.advance(item.size)
+                # tar.offset now sits after the member's data, padded to the 512-byte record.
+                offset = tar.offset - (-(-info.size // tarfile.BLOCKSIZE) * tarfile.BLOCKSIZE)
+                entries.append(
+                    ArchiveEntry(item.relative, item.size, item.mtime_ns, offset, info.size, item.codec, item.digest)
+                )
+                meter.file_done(len(entries), total, item.relative)
+
+            for path, relative, mtime_ns in files:
+                with path.open("rb") as handle:
+                    first = handle.read(_BLOCK_SIZE)
+                    if _stored_raw(path, first[:2]):
+                        size = os.fstat(handle.fileno()).st_size
+                        pending = _Pending(path, relative, mtime_ns, size, CODEC_NONE, [])
+                    else:
+                        pending = _Pending(path, relative, mtime_ns, 0, codec, [])
+                        digest = hashlib.sha256()
+                        block = first
+                        while block:
+                            pending.size += len(block)
+                            digest.update(block)
+                            while len(running) >= limit:
+                                running.popleft().result()
+                            future = pool.submit(_compress_block, codec, level, block)
+                            running.append(future)
+                            pending.blocks.append(future)
+                            block = handle.read(_BLOCK_SIZE)
+                        pending.digest = digest.hexdigest()
+                window.append(pending)
+                window_blocks += len(pending.blocks)
+                while window and (len(window) > limit or window_blocks > limit):
+                    flush_one()
+            while window:
+                flush_one()
+
+            index = json.dumps(
+                {"version": INDEX_VERSION, "files": [asdict(entry) for entry in entries]}, separators=(",", ":")
+            ).encode("utf-8")
+            info = tarfile.TarInfo(INDEX_NAME)
+            info.size = len(index)
+            tar.addfile(info, io.BytesIO(index))
+        os.replace(tmp_path, target)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+    return entries
+
+
+def read_archive_index(archive: Path) -> dict[str, ArchiveEntry]:
+    # Walks the tar headers only (tarfile seeks over member data) to reach the index member.
+    with tarfile.open(archive, "r:") as tar:
+        member = tar.getmember(INDEX_NAME)
+        handle = tar.extractfile(member)
+        if handle is None:
+            raise ValueError(f"Archive index missing in {archive.name}")
+        index = json.loads(handle.read())
+    if index.get("version") != INDEX_VERSION:
+        raise ValueError(f"Unsupported archive index version in {archive.name}")
+    return {item["path"]: ArchiveEntry(**item) for item in index["files"]}
+
+
+def read_archive_entry(archive: Path, entry: ArchiveEntry) -> bytes:
+    with archive.open("rb") as handle:
+        handle.seek(entry.offset)
+        return _decompress(entry.codec, handle.read(entry.stored_size))
+
+
+def extract_archive_entry(
+    archive: Path, entry: ArchiveEntry, target: Path, on_bytes: ByteFn | None = None
+) -> None:
+    # Reads just this member's bytes at its recorded offset. The parent folder must exist.
+    with archive.open("rb") as handle:
+        handle.seek(entry.offset)
+        if entry.codec == CODEC_NONE:
+            with target.open("wb") as out:
+                remaining = entry.stored_size
+                while remaining:
+                    block = handle.read(min(_BLOCK_SIZE, remaining))
+                    if not block:
+                        raise ValueError(f"{entry.path} is truncated in {archive.name}")
+                    out.write(block)
+                    remaining -= len(block)
+                    if on_bytes:
+                        on_bytes(len(block))
+        else:
+            target.write_bytes(_decompress(entry.codec, handle.read(entry.stored_size)))
+            if on_bytes:
+                on_bytes(entry.size)
+    os.utime(target, ns=(entry.mtime_ns, entry.mtime_ns))
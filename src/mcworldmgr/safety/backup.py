@@ -1,75 +1,469 @@
 from __future__ import annotations
 
+import fnmatch
+import hashlib
+import os
 import shutil
+import tempfile
+from dataclasses import dataclass
 from datetime import datetime
+from functools import partial
 from pathlib import Path
-from typing import Callable
+from typing import Callable, Iterable, Sequence
+
+from mcworldmgr.safety.archive import (
+    ARCHIVE_SUFFIX,
+    DEFAULT_ARCHIVE_CODEC,
+    extract_archive_entry,
+    is_archive,
+    read_archive_index,
+    write_archive,
+)
+from mcworldmgr.safety.fastcopy import copy_file, make_dirs, run_parallel
+from mcworldmgr.safety.progress import ByteFn, ProgressMeter, TransferFn
+from mcworldmgr.safety.store import (
+    KIND_FILE,
+    KIND_REGION,
+    OBJECTS_DIR,
+    FileEntry,
+    content_digest,
+    is_snapshot,
+    read_manifest,
+    restore_object,
+    store_file,
+    store_region,
+    touch_object,
+    write_manifest,
+)
+from mcworldmgr.world.region import REGION_NAME_RE
 
 ConfirmFn = Callable[[str], bool]
-ProgressFn = Callable[[int, int, str], None]
+
+
+BACKUPS_DIR_NAME = ".mcworldmgr_backups"
+BACKUP_ROOT_ENV = "MCWORLDMGR_BACKUP_ROOT"
+# Matched against file and folder names, or against the world-relative path when the
+# pattern contains a "/". Excluded folders are never entered.
+DEFAULT_EXCLUDES = (
+    BACKUPS_DIR_NAME,
+    ".mcworldmgr_index",
+    "session.lock",
+    "*.tmp",
+    ".restore.*",
+)
+
+_backup_root: Path | None = None
+_extra_excludes: tuple[str, ...] = ()
+
+
+@dataclass(frozen=True)
+class WorldFile:
+    path: Path
+    relative: str
+    size: int
+    mtime_ns: int
+
+
+def configure_backups(root: str | Path | None = None, exclude: Iterable[str] = ()) -> None:
+    # Process-wide settings from the CLI/GUI: a folder outside the worlds to keep backups in,
+    # and exclude patterns added to DEFAULT_EXCLUDES.
+    global _backup_root, _extra_excludes
+    _backup_root = Path(root).expanduser().resolve() if root else None
+    _extra_excludes = tuple(exclude)
+
+
+def backup_excludes() -> tuple[str, ...]:
+    return DEFAULT_EXCLUDES + _extra_excludes
 
 
 def backups_dir(world_path: Path) -> Path:
-    return world_path / ".mcworldmgr_backups"
+    root = _backup_root
+    if root is None and os.environ.get(BACKUP_ROOT_ENV):
+        root = Path(os.environ[BACKUP_ROOT_ENV]).expanduser()
+    if root is None:
+        return world_path / BACKUPS_DIR_NAME
+    # One folder per world, named after it; the suffix keeps same-named worlds from
+    # different saves folders apart.
+    resolved = str(world_path.resolve())
+    return root / f"{world_path.name}-{hashlib.sha1(resolved.encode('utf-8')).hexdigest()[:8]}"
 
 
-def _iter_files(root: Path) -> list[Path]:
-    files: list[Path] = []
-    for item in root.rglob("*"):
-        if not item.is_file():
-            continue
-        if ".mcworldmgr_backups" in item.parts:
-            continue
-        files.append(item)
-    return files
+def world_file(world_path: Path, path: Path) -> WorldFile | None:
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    return WorldFile(path, path.relative_to(world_path).as_posix(), stat.st_size, stat.st_mtime_ns)
 
 
-def _copy_tree_with_progress(source: Path, target: Path, progress: ProgressFn | None = None) -> None:
-    files = _iter_files(source)
-    total = len(files)
-    copied = 0
-    target.mkdir(parents=True, exist_ok=True)
+def _excluded(name: str, relative: str, patterns: tuple[str, ...]) -> bool:
+    return any(fnmatch.fnmatch(relative if "/" in pattern else name, pattern) for pattern in patterns)
 
-    for file_path in files:
-        relative = file_path.relative_to(source)
-        destination = target / relative
-        destination.parent.mkdir(parents=True, exist_ok=True)
-        shutil.copy2(file_path, destination)
-        copied += 1
-        if progress:
-            progress(copied, total, str(relative))
 
+def _walk_world(root: Path, patterns: tuple[str, ...]) -> tuple[list[WorldFile], list[str]]:
+    # Iterative os.scandir walk: excluded folders are pruned before they are entered and the
+    # size/mtime come from the directory entries, so no file is stat'ed twice. Also returns
+    # the relative paths of the excluded files and folders it skipped.
+    files: list[WorldFile] = []
+    skipped: list[str] = []
+    pending = [(root, "")]
+    while pending:
+        folder, prefix = pending.pop()
+        with os.scandir(folder) as entries:
+            for entry in entries:
+                relative = prefix + entry.name
+                if _excluded(entry.name, relative, patterns):
+                    skipped.append(relative)
+                    continue
+                if entry.is_dir(follow_symlinks=False):
+                    pending.append((Path(entry.path), relative + "/"))
+                elif entry.is_file():
+                    stat = entry.stat()
+                    files.append(WorldFile(Path(entry.path), relative, stat.st_size, stat.st_mtime_ns))
+    files.sort(key=lambda item: item.relative)
+    return files, sorted(skipped)
 
-def create_backup(world_path: Path, progress: ProgressFn | None = None) -> Path:
-    target_root = backups_dir(world_path)
-    target_root.mkdir(parents=True, exist_ok=True)
+
+def iter_world_files(root: Path, exclude: Iterable[str] | None = None) -> list[WorldFile]:
+    return _walk_world(root, tuple(backup_excludes() if exclude is None else exclude))[0]
+
+
+def _new_backup_name(root: Path, extension: str = "") -> Path:
+    # Snapshot folders and archives share one name space, so a name is taken by either.
     stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
-    target = target_root / f"backup-{stamp}"
-    _copy_tree_with_progress(world_path, target, progress)
+    name = f"backup-{stamp}"
+    suffix = 2
+    while (root / name).exists() or (root / f"{name}{ARCHIVE_SUFFIX}").exists():
+        name = f"backup-{stamp}-{suffix}"
+        suffix += 1
+    return root / f"{name}{extension}"
+
+
+def _latest_manifest(world_path: Path) -> dict[str, FileEntry]:
+    for snapshot in list_backups(world_path):
+        if is_snapshot(snapshot):
+            return read_manifest(snapshot)
+    return {}
+
+
+def _store_entry(
+    root: Path, item: WorldFile, cached: FileEntry | None, on_bytes: ByteFn | None = None
+) -> FileEntry:
+    if (
+        cached is not None
+        and cached.size == item.size
+        and cached.mtime_ns == item.mtime_ns
+        and touch_object(root, cached.digest)
+    ):
+        return FileEntry(item.relative, item.size, item.mtime_ns, cached.digest, cached.kind)
+    digest = store_region(root, item.path, on_bytes) if REGION_NAME_RE.match(item.path.name) else None
+    if digest is not None:
+        return FileEntry(item.relative, item.size, item.mtime_ns, digest, KIND_REGION)
+    return FileEntry(item.relative, item.size, item.mtime_ns, store_file(root, item.path, on_bytes), KIND_FILE)
+
+
+def store_world_files(
+    world_path: Path, files: Sequence[WorldFile], progress: TransferFn | None = None
+) -> list[FileEntry]:
+    # Puts the files into the object store, reusing digests from the latest snapshot.
+    # Progress is counted in bytes of world data, block by block within large files.
+    root = backups_dir(world_path)
+    (root / OBJECTS_DIR).mkdir(parents=True, exist_ok=True)
+    previous = _latest_manifest(world_path)
+    meter = ProgressMeter(progress, len(files), sum(item.size for item in files))
+    jobs = [
+        (item.relative, meter.track(item.size, partial(_store_entry, root, item, previous.get(item.relative))))
+        for item in files
+    ]
+    return run_parallel(jobs, progress=meter.file_done)
+
+
+def create_backup(
+    world_path: Path, progress: TransferFn | None = None, *, exclude: Iterable[str] | None = None
+) -> Path:
+    # Snapshots are manifests over a shared content-addressed object store. Files whose
+    # size and mtime match the previous snapshot reuse its hash without being read, so
+    # a backup only reads and stores what changed since the last one. Region files are
+    # stored chunk by chunk, so one changed chunk only adds that chunk's payload.
+    target_root = backups_dir(world_path)
+    entries = store_world_files(world_path, iter_world_files(world_path, exclude), progress)
+    target = _new_backup_name(target_root)
+    write_manifest(target, entries)
+    return target
+
+
+def create_archive_backup(
+    world_path: Path,
+    progress: TransferFn | None = None,
+    *,
+    exclude: Iterable[str] | None = None,
+    codec: str = DEFAULT_ARCHIVE_CODEC,
+    level: int = 6,
+) -> Path:
+    # A self-contained backup-*.tar for off-box transfer and cold storage; it shares
+    # nothing with the object store.
+    target_root = backups_dir(world_path)
+    target = _new_backup_name(target_root, ARCHIVE_SUFFIX)
+    files = [(item.path, item.relative, item.mtime_ns) for item in iter_world_files(world_path, exclude)]
+    write_archive(target, files, codec=codec, level=level, progress=progress)
     return target
 
 
 def list_backups(world_path: Path) -> list[Path]:
+    # Dot-prefixed entries (the object store and other internals) are not backups.
     root = backups_dir(world_path)
     if not root.exists():
         return []
-    return sorted([p for p in root.iterdir() if p.is_dir()], key=lambda p: p.name, reverse=True)
+    return sorted(
+        [p for p in root.iterdir() if (p.is_dir() or is_archive(p)) and not p.name.startswith(".")],
+        key=lambda p: p.name.removesuffix(ARCHIVE_SUFFIX),
+        reverse=True,
+    )
 
 
-def restore_backup(world_path: Path, backup_name: str, progress: ProgressFn | None = None) -> None:
+def backup_path(world_path: Path, backup_name: str) -> Path:
     source = backups_dir(world_path) / backup_name
-    if not source.exists() or not source.is_dir():
+    valid = source.is_dir() or is_archive(source)
+    if Path(backup_name).name != backup_name or backup_name.startswith(".") or not valid:
         raise FileNotFoundError(f"Backup not found: {backup_name}")
+    return source
+
+
+@dataclass(frozen=True)
+class _RestoreItem:
+    path: str
+    size: int
+    mtime_ns: int
+    digest: str | None
+    kind: str
+    # Called as write(target, on_bytes=...).
+    write: Callable[..., None]
+
+
+def _restore_plan(world_path: Path, source: Path) -> list[_RestoreItem]:
+    # One list for all three formats: each item knows how to write its file to a target path.
+    if is_archive(source):
+        return [
+            _RestoreItem(
+                entry.path, entry.size, entry.mtime_ns, None, KIND_FILE, partial(extract_archive_entry, source, entry)
+            )
+            for entry in read_archive_index(source).values()
+        ]
+    if is_snapshot(source):
+        root = backups_dir(world_path)
+        return [
+            _RestoreItem(
+                entry.path, entry.size, entry.mtime_ns, entry.digest, entry.kind, partial(restore_object, root, entry)
+            )
+            for entry in read_manifest(source).values()
+        ]
+    # Full-copy folders written by earlier versions.
+    return [
+        _RestoreItem(item.relative, item.size, item.mtime_ns, None, KIND_FILE, partial(copy_file, item.path))
+        for item in iter_world_files(source, exclude=(BACKUPS_DIR_NAME,))
+    ]
+
+
+def _unchanged(item: _RestoreItem, current: WorldFile | None) -> bool:
+    # Size and mtime first; snapshots can then fall back to comparing content hashes, which
+    # also catches region files whose sectors were only laid out differently.
+    if current is None:
+        return False
+    if current.size == item.size and current.mtime_ns == item.mtime_ns:
+        return True
+    if item.digest is None:
+        return False
+    try:
+        same = content_digest(current.path, item.kind) == item.digest
+    except (OSError, ValueError):
+        return False
+    if same:
+        os.utime(current.path, ns=(item.mtime_ns, item.mtime_ns))
+    return same
+
+
+def _sync_item(
+    world_path: Path, item: _RestoreItem, current: WorldFile | None, on_bytes: ByteFn | None = None
+) -> bool:
+    if _unchanged(item, current):
+        return False
+    item.write(world_path / item.path, on_bytes=on_bytes)
+    return True
+
+
+def _stage_item(
+    staging: Path, item: _RestoreItem, current: WorldFile | None, on_bytes: ByteFn | None = None
+) -> bool:
+    target = staging / item.path
+    if _unchanged(item, current) and current is not None:
+        # The live tree is discarded after the swap, so unchanged files can simply be linked.
+        try:
+            os.link(current.path, target)
+        except OSError:
+            copy_file(current.path, target)
+        return False
+    item.write(target, on_bytes=on_bytes)
+    return True
+
+
+def _prune_empty_dirs(world_path: Path, folders: Iterable[Path], keep: set[Path]) -> None:
+    candidates: set[Path] = set()
+    for folder in folders:
+        while folder != world_path and world_path in folder.parents:
+            candidates.add(folder)
+            folder = folder.parent
+    for folder in sorted(candidates, key=lambda item: len(item.parts), reverse=True):
+        if folder in keep:
+            continue
+        try:
+            folder.rmdir()
+        except OSError:
+            pass
+
 
-    for child in world_path.iterdir():
-        if child.name == ".mcworldmgr_backups":
+def _carry_excluded(world_path: Path, staging: Path, excluded: Iterable[str]) -> list[str]:
+    # Excluded files and folders (session.lock, the block index, temp files, user patterns)
+    # are not part of the backup, so they move from the live tree into the staged one.
+    # Where the backup itself has the path, its version wins. The active backups folder
+    # moves in _swap_in; one left inside the world while backups go to another root is
+    # carried like any other excluded path.
+    active = backups_dir(world_path) == world_path / BACKUPS_DIR_NAME
+    kept: list[str] = []
+    for relative in excluded:
+        if (active and relative == BACKUPS_DIR_NAME) or os.path.lexists(staging / relative):
             continue
-        if child.is_dir():
-            shutil.rmtree(child)
+        (staging / relative).parent.mkdir(parents=True, exist_ok=True)
+        os.replace(world_path / relative, staging / relative)
+        kept.append(relative)
+    return kept
+
+
+def _swap_in(world_path: Path, staging: Path) -> None:
+    # Backups kept inside the world move into the new tree first; then the old tree is renamed
+    # aside and the staged one renamed into place. If the process dies between the two
+    # renames, both complete trees are still next to each other on disk.
+    inner = world_path / BACKUPS_DIR_NAME
+    moved = inner.is_dir() and backups_dir(world_path) == inner
+    if moved:
+        os.replace(inner, staging / BACKUPS_DIR_NAME)
+    old = Path(tempfile.mkdtemp(prefix=f".{world_path.name}.old-", dir=str(world_path.parent)))
+    try:
+        os.replace(world_path, old / world_path.name)
+    except OSError:
+        if moved:
+            os.replace(staging / BACKUPS_DIR_NAME, inner)
+        old.rmdir()
+        raise
+    try:
+        os.replace(staging, world_path)
+    except OSError:
+        os.replace(old / world_path.name, world_path)
+        if moved:
+            os.replace(staging / BACKUPS_DIR_NAME, inner)
+        old.rmdir()
+        raise
+    shutil.rmtree(old, ignore_errors=True)
+
+
+def restore_backup(
+    world_path: Path, backup_name: str, progress: TransferFn | None = None, *, swap: bool = False
+) -> dict[str, int]:
+    # Brings the world to the backup's state by writing only files that differ and deleting
+    # files the backup does not have; excluded files such as session.lock are left alone.
+    # With swap, the restored tree is assembled next to the world and renamed into place,
+    # so the world is never seen half-restored.
+    source = backup_path(world_path, backup_name)
+    plan = _restore_plan(world_path, source)
+    live_files, excluded = _walk_world(world_path, backup_excludes())
+    live = {item.relative: item for item in live_files}
+    wanted = {item.path for item in plan}
+    stale = [item for relative, item in live.items() if relative not in wanted]
+    parents = {(world_path / item.path).parent for item in plan}
+    meter = ProgressMeter(progress, len(plan), sum(item.size for item in plan))
+
+    if swap:
+        staging = Path(tempfile.mkdtemp(prefix=f".{world_path.name}.restore-", dir=str(world_path.parent)))
+        try:
+            make_dirs((staging / item.path).parent for item in plan)
+            jobs = [
+                (item.path, meter.track(item.size, partial(_stage_item, staging, item, live.get(item.path))))
+                for item in plan
+            ]
+            written = sum(bool(changed) for changed in run_parallel(jobs, progress=meter.file_done))
+            kept = _carry_excluded(world_path, staging, excluded)
+            try:
+                _swap_in(world_path, staging)
+            except OSError:
+                for relative in reversed(kept):
+                    os.replace(staging / relative, world_path / relative)
+                raise
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+    else:
+        for item in stale:
+            item.path.unlink(missing_ok=True)
+        _prune_empty_dirs(world_path, (item.path.parent for item in stale), parents)
+        make_dirs(parents)
+        jobs = [
+            (item.path, meter.track(item.size, partial(_sync_item, world_path, item, live.get(item.path))))
+            for item in plan
+        ]
+        written = sum(bool(changed) for changed in run_parallel(jobs, progress=meter.file_done))
+    return {"written": written, "unchanged": len(plan) - written, "deleted": len(stale)}
+
+
+def check_relative_path(relative_path: str) -> Path:
+    relative = Path(relative_path)
+    if relative.is_absolute() or ".." in relative.parts or BACKUPS_DIR_NAME in relative.parts:
+        raise ValueError(f"Not a path inside the world: {relative_path}")
+    return relative
+
+
+def export_backup_files(
+    world_path: Path, backup_name: str, relative_paths: Iterable[str], target_root: Path
+) -> list[str]:
+    # Writes the snapshot's version of each file under target_root; files the snapshot
+    # does not contain are skipped and left out of the returned list.
+    source = backup_path(world_path, backup_name)
+    entries = read_manifest(source) if is_snapshot(source) else None
+    index = read_archive_index(source) if is_archive(source) else None
+    exported: list[str] = []
+    for relative_path in relative_paths:
+        relative = check_relative_path(relative_path)
+        target = target_root / relative
+        if index is not None:
+            archived = index.get(relative.as_posix())
+            if archived is None:
+                continue
+            target.parent.mkdir(parents=True, exist_ok=True)
+            extract_archive_entry(source, archived, target)
+        elif entries is not None:
+            entry = entries.get(relative.as_posix())
+            if entry is None:
+                continue
+            target.parent.mkdir(parents=True, exist_ok=True)
+            restore_object(backups_dir(world_path), entry, target)
         else:
-            child.unlink(missing_ok=True)
+            if not (source / relative).is_file():
+                continue
+            target.parent.mkdir(parents=True, exist_ok=True)
+            copy_file(source / relative, target)
+        exported.append(relative.as_posix())
+    return exported
 
-    _copy_tree_with_progress(source, world_path, progress)
+
+def restore_file(world_path: Path, backup_name: str, relative_path: str) -> Path:
+    relative = check_relative_path(relative_path)
+    target = world_path / relative
+    target.parent.mkdir(parents=True, exist_ok=True)
+    staging = Path(tempfile.mkdtemp(prefix=".restore.", dir=str(target.parent)))
+    try:
+        if not export_backup_files(world_path, backup_name, [relative.as_posix()], staging):
+            raise FileNotFoundError(f"{relative_path} is not in backup {backup_name}")
+        os.replace(staging / relative, target)
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+    return target
 
 
 def _default_confirm(message: str) -> bool:
@@ -79,15 +473,17 @@ def _default_confirm(message: str) -> bool:
 
 def prompt_backup_decision(confirm: ConfirmFn | None = None) -> bool:
     confirmer = confirm or _default_confirm
-    return confirmer("Create backup before write? [y/N]: ")
+    return confirmer("Save undo copies of the affected files before write? [y/N]: ")
 
 
 def maybe_prompt_backup(
     world_path: Path,
     confirm: ConfirmFn | None = None,
-    progress: ProgressFn | None = None,
+    progress: TransferFn | None = None,
 ) -> Path | None:
-    if prompt_backup_decision(confirm=confirm):
+    # A full snapshot, unlike the undo journal behind prompt_backup_decision, so it asks its own question.
+    confirmer = confirm or _default_confirm
+    if confirmer("Create a full backup before write? [y/N]: "):
         path = create_backup(world_path, progress=progress)
         print(f"Backup created: {path}")
         return path
@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+import errno
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import partial
+from pathlib import Path
+from typing import Callable, Iterable, Sequence, TypeVar
+
+from mcworldmgr.safety.progress import ByteFn, ProgressFn
+
+# Linux FICLONE ioctl: shares the source extents on btrfs, XFS and other reflink filesystems.
+_FICLONE = 0x40049409
+_CHUNK = 1 << 30
+# Kernel copies are cut this fine only when someone is watching the progress.
+_PROGRESS_CHUNK = 8 << 20
+_BLOCK_SIZE = 1 << 20
+# Without it Windows opens files in text mode and translates line endings.
+_O_BINARY = getattr(os, "O_BINARY", 0)
+
+T = TypeVar("T")
+
+
+def default_workers() -> int:
+    return min(32, (os.cpu_count() or 1) + 4)
+
+
+def _reflink(source_fd: int, target_fd: int) -> bool:
+    try:
+        import fcntl
+    except ImportError:
+        return False
+    try:
+        fcntl.ioctl(target_fd, _FICLONE, source_fd)
+    except OSError:
+        return False
+    return True
+
+
+def _data_segments(fd: int, size: int) -> list[tuple[int, int]]:
+    # (offset, length) of every data extent; holes are skipped so sparse files stay sparse.
+    seek_data = getattr(os, "SEEK_DATA", None)
+    seek_hole = getattr(os, "SEEK_HOLE", None)
+    if seek_data is None or seek_hole is None:
+        return [(0, size)]
+    segments: list[tuple[int, int]] = []
+    offset = 0
+    try:
+        while offset < size:
+            try:
+                start = os.lseek(fd, offset, seek_data)
+            except OSError as exc:
+                if exc.errno == errno.ENXIO:
+                    break
+                raise
+            end = min(os.lseek(fd, start, seek_hole), size)
+            segments.append((start, end - start))
+            offset = end
+    except OSError:
+        return [(0, size)]
+    return segments
+
+
+def _kernel_copy(source_fd: int, target_fd: int, offset: int, length: int, on_bytes: ByteFn | None = None) -> int:
+    # copy_file_range keeps the data in the kernel (and lets NFS/SMB copy server-side);
+    # sendfile is the older in-kernel path. Returns how many bytes were copied; a call that
+    # fails before copying anything (Windows has neither, macOS refuses sendfile to files)
+    # leaves the rest to the portable loop.
+    step = _PROGRESS_CHUNK if on_bytes else _CHUNK
+    end = offset + length
+    position = offset
+    for name in ("copy_file_range", "sendfile"):
+        call = getattr(os, name, None)
+        if call is None:
+            continue
+        try:
+            if name == "sendfile":
+                os.lseek(target_fd, position, os.SEEK_SET)
+            while position < end:
+                size = min(step, end - position)
+                if name == "sendfile":
+                    sent = call(target_fd, source_fd, position, size)
+                else:
+                    sent = call(source_fd, target_fd, size, position, position)
+                if sent == 0:
+                    break
+                position += sent
+                if on_bytes:
+                    on_bytes(sent)
+        except OSError:
+            if position == offset:
+                continue
+            raise
+        if position >= end:
+            break
+    return position - offset
+
+
+def _stream_copy(source_fd: int, target_fd: int, offset: int, length: int, on_bytes: ByteFn | None = None) -> None:
+    # Plain read/write loop; works on every platform.
+    os.lseek(source_fd, offset, os.SEEK_SET)
+    os.lseek(target_fd, offset, os.SEEK_SET)
+    remaining = length
+    while remaining:
+        block = os.read(source_fd, min(_BLOCK_SIZE, remaining))
+        if not block:
+            break
+        view = memoryview(block)
+        while view:
+            view = view[os.write(target_fd, view) :]
+        remaining -= len(block)
+        if on_bytes:
+            on_bytes(len(block))
+
+
+def copy_file(source: Path, target: Path, *, keep_times: bool = True, on_bytes: ByteFn | None = None) -> None:
+    # The target's parent folder must already exist; copy_files creates them up front.
+    # on_bytes is called with each block copied; reflinks and holes are not reported.
+    source_fd = os.open(source, os.O_RDONLY | _O_BINARY)
+    try:
+        stat = os.fstat(source_fd)
+        target_fd = os.open(target, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | _O_BINARY, 0o666)
+        try:
+            if not _reflink(source_fd, target_fd):
+                for offset, length in _data_segments(source_fd, stat.st_size):
+                    copied = _kernel_copy(source_fd, target_fd, offset, length, on_bytes)
+                    if copied < length:
+                        _stream_copy(source_fd, target_fd, offset + copied, length - copied, on_bytes)
+                os.ftruncate(target_fd, stat.st_size)
+        finally:
+            os.close(target_fd)
+    finally:
+        os.close(source_fd)
+    if keep_times:
+        os.utime(target, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+
+def make_dirs(paths: Iterable[Path]) -> None:
+    # Each folder is created once, parents before children.
+    for folder in sorted(set(paths), key=lambda item: len(item.parts)):
+        folder.mkdir(parents=True, exist_ok=True)
+
+
+def run_parallel(
+    jobs: Sequence[tuple[str, Callable[[], T]]],
+    *,
+    workers: int | None = None,
+    progress: ProgressFn | None = None,
+) -> list[T]:
+    # Runs (label, job) pairs on a bounded thread pool; results come back in job order and
+    # progress is reported from the calling thread as jobs finish.
+    total = len(jobs)
+    results: list[T] = [None] * total  # type: ignore[list-item]
+    with ThreadPoolExecutor(max_workers=max(1, workers or default_workers())) as pool:
+        futures = {pool.submit(job): (position, label) for position, (label, job) in enumerate(jobs)}
+        for done, future in enumerate(as_completed(futures), start=1):
+            position, label = futures[future]
+            results[position] = future.result()
+            if progress:
+                progress(done, total, label)
+    return results
+
+
+def copy_files(
+    pairs: Sequence[tuple[Path, Path]],
+    *,
+    workers: int | None = None,
+    progress: ProgressFn | None = None,
+    labels: Sequence[str] | None = None,
+) -> None:
+    make_dirs(target.parent for _, target in pairs)
+    names = labels if labels is not None else [str(source) for source, _ in pairs]
+    jobs = [(name, partial(copy_file, source, target)) for name, (source, target) in zip(names, pairs)]
+    run_parallel(jobs, workers=workers, progress=progress)
@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import json
+import os
+import shutil
+import tempfile
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Iterable
+
+from mcworldmgr.safety.backup import WorldFile, backups_dir, store_world_files, world_file
+from mcworldmgr.safety.fastcopy import make_dirs
+from mcworldmgr.safety.store import FileEntry, restore_object
+from mcworldmgr.world.region import REGION_NAME_RE, parse_region_name
+
+JOURNAL_DIR = ".journal"
+JOURNAL_NAME = "journal.json"
+JOURNAL_VERSION = 1
+JOURNAL_KEEP = 20
+
+
+@dataclass(frozen=True)
+class JournalEntry:
+    name: str
+    operation: str
+    created: str
+    files: tuple[FileEntry, ...]
+    absent: tuple[str, ...]
+
+
+def journal_dir(world_path: Path) -> Path:
+    return backups_dir(world_path) / JOURNAL_DIR
+
+
+def _expand_scope(world_path: Path, paths: Iterable[Path]) -> list[Path]:
+    # A region file's oversized chunks live in sibling c.<x>.<z>.mcc files; they are part
+    # of the region's state and go into the journal with it. Paths are resolved first, so
+    # ".." parts or symlinks cannot point the journal, and a later undo, outside the world.
+    root = world_path.resolve()
+    scope: dict[str, Path] = {}
+    for path in paths:
+        resolved = (path if path.is_absolute() else world_path / path).resolve()
+        if root not in resolved.parents:
+            raise ValueError(f"Not a path inside the world: {path}")
+        relative = resolved.relative_to(root)
+        path = world_path / relative
+        scope[relative.as_posix()] = path
+        if not REGION_NAME_RE.match(path.name) or not path.parent.is_dir():
+            continue
+        region_x, region_z = parse_region_name(path.name)
+        for external in path.parent.glob("c.*.*.mcc"):
+            parts = external.name.split(".")
+            try:
+                chunk_x, chunk_z = int(parts[1]), int(parts[2])
+            except (IndexError, ValueError):
+                continue
+            if chunk_x >> 5 == region_x and chunk_z >> 5 == region_z:
+                scope[external.relative_to(world_path).as_posix()] = external
+    return [scope[key] for key in sorted(scope)]
+
+
+def record_undo(world_path: Path, operation: str, paths: Iterable[Path]) -> Path:
+    # Saves the current state of just the files an operation is about to touch. Contents go
+    # into the shared object store (region files chunk by chunk), so files unchanged since
+    # the last snapshot cost nothing. Files that do not exist yet are recorded as absent and
+    # are deleted again on undo.
+    scope = _expand_scope(world_path, paths)
+    present: list[WorldFile] = []
+    absent: list[str] = []
+    for path in scope:
+        item = world_file(world_path, path)
+        if item is None:
+            absent.append(path.relative_to(world_path).as_posix())
+        else:
+            present.append(item)
+    entries = store_world_files(world_path, present)
+
+    root = journal_dir(world_path)
+    root.mkdir(parents=True, exist_ok=True)
+    created = datetime.now()
+    target = root / f"{created:%Y%m%d-%H%M%S-%f}-{operation}"
+    target.mkdir()
+    payload = {
+        "version": JOURNAL_VERSION,
+        "operation": operation,
+        "created": created.isoformat(timespec="seconds"),
+        "files": [asdict(entry) for entry in entries],
+        "absent": absent,
+    }
+    fd, tmp_name = tempfile.mkstemp(prefix=f".{JOURNAL_NAME}.", suffix=".tmp", dir=str(target))
+    tmp_path = Path(tmp_name)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as handle:
+            json.dump(payload, handle, separators=(",", ":"))
+        os.replace(tmp_path, target / JOURNAL_NAME)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+    for stale in list_journal(world_path)[JOURNAL_KEEP:]:
+        shutil.rmtree(journal_dir(world_path) / stale.name, ignore_errors=True)
+    return target
+
+
+def _read_journal(folder: Path) -> JournalEntry | None:
+    try:
+        with (folder / JOURNAL_NAME).open("r", encoding="utf-8") as handle:
+            payload = json.load(handle)
+    except (OSError, ValueError):
+        return None
+    if payload.get("version") != JOURNAL_VERSION:
+        return None
+    return JournalEntry(
+        folder.name,
+        payload["operation"],
+        payload["created"],
+        tuple(FileEntry(**item) for item in payload["files"]),
+        tuple(payload["absent"]),
+    )
+
+
+def list_journal(world_path: Path) -> list[JournalEntry]:
+    # Newest first; unfinished or unreadable entries are skipped.
+    root = journal_dir(world_path)
+    if not root.is_dir():
+        return []
+    entries = [_read_journal(folder) for folder in root.iterdir() if folder.is_dir()]
+    return sorted((entry for entry in entries if entry is not None), key=lambda entry: entry.name, reverse=True)
+
+
+def undo(world_path: Path, name: str | None = None) -> JournalEntry:
+    # Puts the journaled files back as they were before the operation, newest entry by
+    # default, and drops the entry so the next undo steps further back.
+    entries = list_journal(world_path)
+    if not entries:
+        raise FileNotFoundError("Nothing to undo")
+    if name is None:
+        entry = entries[0]
+    else:
+        matches = [item for item in entries if item.name == name]
+        if not matches:
+            raise FileNotFoundError(f"Undo entry not found: {name}")
+        entry = matches[0]
+
+    root = backups_dir(world_path)
+    make_dirs((world_path / item.path).parent for item in entry.files)
+    for item in entry.files:
+        restore_object(root, item, world_path / item.path)
+    for relative in entry.absent:
+        (world_path / relative).unlink(missing_ok=True)
+    shutil.rmtree(journal_dir(world_path) / entry.name, ignore_errors=True)
+    return entry
@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, TypeVar
+
+# At most this many seconds between two reports, so reporting never costs more than the work.
+PROGRESS_INTERVAL = 0.1
+_UNITS = ("B", "KiB", "MiB", "GiB", "TiB")
+
+T = TypeVar("T")
+# (files done, files total, label): the per-file protocol used by scans and region operations.
+ProgressFn = Callable[[int, int, str], None]
+ByteFn = Callable[[int], None]
+
+
+@dataclass(frozen=True)
+class TransferProgress:
+    files_done: int
+    files_total: int
+    bytes_done: int
+    bytes_total: int
+    elapsed: float
+    label: str
+
+    @property
+    def rate(self) -> float:
+        # Bytes per second since the start.
+        return self.bytes_done / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def eta(self) -> float | None:
+        if self.bytes_done >= self.bytes_total:
+            return 0.0
+        rate = self.rate
+        return (self.bytes_total - self.bytes_done) / rate if rate > 0 else None
+
+    @property
+    def fraction(self) -> float:
+        if self.bytes_total:
+            return min(1.0, self.bytes_done / self.bytes_total)
+        return self.files_done / self.files_total if self.files_total else 1.0
+
+
+TransferFn = Callable[[TransferProgress], None]
+
+
+def format_bytes(count: float) -> str:
+    for unit in _UNITS[:-1]:
+        if abs(count) < 1024:
+            return f"{count:.0f} {unit}" if unit == "B" else f"{count:.1f} {unit}"
+        count /= 1024
+    return f"{count:.1f} {_UNITS[-1]}"
+
+
+def format_progress(update: TransferProgress) -> str:
+    eta = update.eta
+    text = (
+        f"{update.files_done}/{update.files_total} files, "
+        f"{format_bytes(update.bytes_done)}/{format_bytes(update.bytes_total)}, "
+        f"{format_bytes(update.rate)}/s"
+    )
+    if eta is not None and update.files_done < update.files_total:
+        minutes, seconds = divmod(int(eta + 0.5), 60)
+        text += f", ETA {minutes}:{seconds:02d}"
+    return f"{text} {update.label}".rstrip()
+
+
+class ProgressMeter:
+    # Counts files and bytes for one operation. advance() may be called from any worker
+    # thread, as often as every block; the callback runs at most once per interval, plus
+    # once when the last file is done.
+    def __init__(
+        self,
+        callback: TransferFn | None,
+        files_total: int,
+        bytes_total: int,
+        *,
+        interval: float = PROGRESS_INTERVAL,
+    ) -> None:
+        self.callback = callback
+        self.files_total = files_total
+        self.bytes_total = bytes_total
+        self.interval = interval
+        self.files_done = 0
+        self.bytes_done = 0
+        self.label = ""
+        self._lock = threading.Lock()
+        self._started = time.monotonic()
+        self._last_report = float("-inf")
+
+    def _report(self, force: bool) -> None:
+        # Called with the lock held, which also keeps reports in order.
+        now = time.monotonic()
+        if self.callback is None or (not force and now - self._last_report < self.interval):
+            return
+        self._last_report = now
+        self.callback(
+            TransferProgress(
+                self.files_done, self.files_total, self.bytes_done, self.bytes_total, now - self._started, self.label
+            )
+        )
+
+    def advance(self, count: int) -> None:
+        if count <= 0:
+            return
+        with self._lock:
+            self.bytes_done += count
+            self._report(False)
+
+    def file_done(self, done: int, total: int, label: str) -> None:
+        # Same shape as ProgressFn, so it can be handed to run_parallel directly.
+        with self._lock:
+            self.files_done = done
+            self.label = label
+            self._report(done >= total)
+
+    def track(self, size: int, job: Callable[[ByteFn], T]) -> Callable[[], T]:
+        # Wraps a job that reports its own bytes; whatever it did not report (skipped
+        # unchanged files, holes, reflinked extents) is counted when it returns.
+        def run() -> T:
+            reported = 0
+
+            def on_bytes(count: int) -> None:
+                nonlocal reported
+                reported += count
+                self.advance(count)
+
+            result = job(on_bytes)
+            self.advance(size - reported)
+            return result
+
+        return run
@@ -0,0 +1,305 @@
+from __future__ import annotations
+
+import os
+import re
+import shutil
+import subprocess
+import sys
+import time
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Iterable
+
+from mcworldmgr.safety.archive import is_archive
+from mcworldmgr.safety.backup import backups_dir, list_backups
+from mcworldmgr.safety.journal import list_journal
+from mcworldmgr.safety.store import (
+    KIND_REGION,
+    OBJECTS_DIR,
+    FileEntry,
+    is_snapshot,
+    object_path,
+    read_chunk_map,
+    read_manifest,
+)
+
+TRASH_DIR = ".trash"
+# Objects written or reused this recently are never collected: every reuse path in the store
+# refreshes the object's mtime, so a backup running alongside a prune cannot lose content
+# its manifest is about to reference. Payloads of a recently used chunk map count as used.
+OBJECT_GRACE_SECONDS = 3600
+# Chunk maps are at most 1024 short rows; larger recent objects are not read as one.
+_CHUNK_MAP_LIMIT = 256 << 10
+_STAMP_RE = re.compile(r"^backup-(\d{8}-\d{6})(?:-\d+)?(?:\.tar)?$")
+_SIZE_RE = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*([kmgt]?)i?b?\s*$", re.IGNORECASE)
+_SIZE_UNITS = {"": 1, "k": 1 << 10, "m": 1 << 20, "g": 1 << 30, "t": 1 << 40}
+
+
+@dataclass(frozen=True)
+class PruneResult:
+    kept: tuple[str, ...]
+    removed: tuple[str, ...]
+    bytes_before: int
+    bytes_after: int
+    objects_removed: int
+
+
+def parse_size(text: str) -> int:
+    # "500M", "20G", "1.5TiB", or plain bytes.
+    match = _SIZE_RE.match(text)
+    if not match:
+        raise ValueError(f"Not a size: {text!r}")
+    return int(float(match.group(1)) * _SIZE_UNITS[match.group(2).lower()])
+
+
+def backup_time(path: Path) -> datetime:
+    match = _STAMP_RE.match(path.name)
+    if match:
+        return datetime.strptime(match.group(1), "%Y%m%d-%H%M%S")
+    return datetime.fromtimestamp(path.stat().st_mtime)
+
+
+def select_retained(
+    times: dict[str, datetime], *, hourly: int = 0, daily: int = 0, weekly: int = 0
+) -> set[str]:
+    # Grandfather-father-son: walking newest to oldest, the newest backup of each of the
+    # last `hourly` hours, `daily` days and `weekly` ISO weeks is kept. The newest backup
+    # is always kept; with no rules at all, everything is.
+    ordered = sorted(times, key=lambda name: times[name], reverse=True)
+    if not ordered:
+        return set()
+    if not (hourly or daily or weekly):
+        return set(ordered)
+    keep = {ordered[0]}
+    rules = (
+        (hourly, lambda moment: (moment.date(), moment.hour)),
+        (daily, lambda moment: moment.date()),
+        (weekly, lambda moment: moment.isocalendar()[:2]),
+    )
+    for count, bucket in rules:
+        seen: set[object] = set()
+        for name in ordered:
+            if len(seen) >= count:
+                break
+            key = bucket(times[name])
+            if key not in seen:
+                seen.add(key)
+                keep.add(name)
+    return keep
+
+
+def _recent_payloads(root: Path, recent: Iterable[Path]) -> set[str]:
+    digests: set[str] = set()
+    for item in recent:
+        try:
+            if item.stat().st_size <= _CHUNK_MAP_LIMIT:
+                digests.update(row[3] for row in read_chunk_map(root, item.name).values())
+        except (OSError, ValueError, TypeError, IndexError, KeyError):
+            continue
+    return digests
+
+
+def _entry_objects(root: Path, entries: Iterable[FileEntry]) -> set[str]:
+    digests: set[str] = set()
+    for entry in entries:
+        digests.add(entry.digest)
+        if entry.kind == KIND_REGION:
+            try:
+                digests.update(row[3] for row in read_chunk_map(root, entry.digest).values())
+            except (OSError, ValueError):
+                continue
+    return digests
+
+
+class _SizeIndex:
+    # Sizes are looked up once per object and once per inode, so content shared between
+    # snapshots (deduplicated objects) or hard-linked between copies is counted only once.
+    def __init__(self, root: Path) -> None:
+        self.root = root
+        self._objects: dict[str, int] = {}
+        self._backups: dict[str, tuple[set[str], dict[tuple[int, int], int]]] = {}
+
+    def object_size(self, digest: str) -> int:
+        if digest not in self._objects:
+            try:
+                self._objects[digest] = object_path(self.root, digest).stat().st_size
+            except FileNotFoundError:
+                self._objects[digest] = 0
+        return self._objects[digest]
+
+    def usage(self, backup: Path) -> tuple[set[str], dict[tuple[int, int], int]]:
+        if backup.name not in self._backups:
+            objects: set[str] = set()
+            inodes: dict[tuple[int, int], int] = {}
+            if is_archive(backup):
+                stat = backup.stat()
+                inodes[(stat.st_dev, stat.st_ino)] = stat.st_size
+            elif is_snapshot(backup):
+                objects = _entry_objects(self.root, read_manifest(backup).values())
+            else:
+                for folder, _, files in os.walk(backup):
+                    for name in files:
+                        stat = os.stat(os.path.join(folder, name))
+                        inodes[(stat.st_dev, stat.st_ino)] = stat.st_size
+            self._backups[backup.name] = (objects, inodes)
+        return self._backups[backup.name]
+
+    def total(self, backups: Iterable[Path], pinned: Iterable[str] = ()) -> int:
+        objects = set(pinned)
+        inodes: dict[tuple[int, int], int] = {}
+        for backup in backups:
+            backup_objects, backup_inodes = self.usage(backup)
+            objects |= backup_objects
+            inodes.update(backup_inodes)
+        return sum(self.object_size(digest) for digest in objects) + sum(inodes.values())
+
+
+class _Tally:
+    # Reference counts over the objects and inodes of a set of backups: dropping a backup
+    # only walks that backup's own entries, and content still used elsewhere stays counted.
+    def __init__(self, sizes: _SizeIndex, backups: Iterable[Path], pinned: Iterable[str]) -> None:
+        self._sizes = sizes
+        self._objects: Counter[str] = Counter(pinned)
+        self._inodes: Counter[tuple[int, int]] = Counter()
+        self.total = sum(sizes.object_size(digest) for digest in self._objects)
+        for backup in backups:
+            self.add(backup)
+
+    def add(self, backup: Path) -> None:
+        objects, inodes = self._sizes.usage(backup)
+        for digest in objects:
+            if not self._objects[digest]:
+                self.total += self._sizes.object_size(digest)
+            self._objects[digest] += 1
+        for key, size in inodes.items():
+            if not self._inodes[key]:
+                self.total += size
+            self._inodes[key] += 1
+
+    def remove(self, backup: Path) -> None:
+        objects, inodes = self._sizes.usage(backup)
+        for digest in objects:
+            self._objects[digest] -= 1
+            if not self._objects[digest]:
+                self.total -= self._sizes.object_size(digest)
+        for key, size in inodes.items():
+            self._inodes[key] -= 1
+            if not self._inodes[key]:
+                self.total -= size
+
+
+def trash_dir(world_path: Path) -> Path:
+    return backups_dir(world_path) / TRASH_DIR
+
+
+def empty_trash(world_path: Path) -> None:
+    trash = trash_dir(world_path)
+    if not trash.is_dir():
+        return
+    for item in trash.iterdir():
+        if item.is_dir():
+            shutil.rmtree(item, ignore_errors=True)
+        else:
+            item.unlink(missing_ok=True)
+
+
+# Run by a detached interpreter, so nothing but the standard library is imported.
+_EMPTY_TRASH_SCRIPT = (
+    "import pathlib, shutil, sys\n"
+    "for item in pathlib.Path(sys.argv[1]).iterdir():\n"
+    "    shutil.rmtree(item, ignore_errors=True) if item.is_dir() else item.unlink(missing_ok=True)\n"
+)
+
+
+def empty_trash_in_background(world_path: Path) -> subprocess.Popen[bytes] | None:
+    # The deletes run in a detached process, so the caller (and the CLI) exit at once. A
+    # frozen build has no interpreter to start; its trash is left for the next prune, and
+    # so is anything a killed cleaner left behind.
+    trash = trash_dir(world_path)
+    if getattr(sys, "frozen", False) or not trash.is_dir():
+        return None
+    return subprocess.Popen(
+        [sys.executable, "-c", _EMPTY_TRASH_SCRIPT, str(trash)],
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+        creationflags=getattr(subprocess, "DETACHED_PROCESS", 0) | getattr(subprocess, "CREATE_NEW_PROCESS_GROUP", 0),
+    )
+
+
+def _move_to_trash(batch: Path, item: Path) -> None:
+    batch.mkdir(parents=True, exist_ok=True)
+    os.replace(item, batch / item.name)
+
+
+def prune_backups(
+    world_path: Path,
+    *,
+    hourly: int = 0,
+    daily: int = 0,
+    weekly: int = 0,
+    max_bytes: int | None = None,
+    dry_run: bool = False,
+) -> PruneResult:
+    # Applies the retention rules, then drops the oldest remaining backups (never the newest)
+    # until the deduplicated total fits max_bytes. Removed backups and objects nothing
+    # references any more are renamed into .trash and deleted by a detached process.
+    if min(hourly, daily, weekly) < 0:
+        raise ValueError("Retention counts must be zero or positive")
+    root = backups_dir(world_path)
+    backups = list_backups(world_path)
+    by_name = {backup.name: backup for backup in backups}
+    times = {backup.name: backup_time(backup) for backup in backups}
+    keep = select_retained(times, hourly=hourly, daily=daily, weekly=weekly)
+
+    sizes = _SizeIndex(root)
+    pinned = _entry_objects(root, (item for entry in list_journal(world_path) for item in entry.files))
+    bytes_before = sizes.total(backups, pinned)
+    if max_bytes is not None:
+        oldest_first = sorted(keep, key=lambda name: times[name])
+        tally = _Tally(sizes, (by_name[name] for name in oldest_first), pinned)
+        while len(oldest_first) > 1 and tally.total > max_bytes:
+            tally.remove(by_name[oldest_first.pop(0)])
+        keep = set(oldest_first)
+
+    kept = [backup for backup in backups if backup.name in keep]
+    removed = [backup for backup in backups if backup.name not in keep]
+    bytes_after = sizes.total(kept, pinned)
+    referenced = pinned.union(*(sizes.usage(backup)[0] for backup in kept))
+    store = root / OBJECTS_DIR
+    cutoff = time.time() - OBJECT_GRACE_SECONDS
+    unreferenced = {
+        item: item.stat().st_mtime
+        for item in (store.glob("??/*") if store.is_dir() else [])
+        if item.name not in referenced
+    }
+    referenced |= _recent_payloads(root, (item for item, mtime in unreferenced.items() if mtime >= cutoff))
+    garbage = [item for item, mtime in unreferenced.items() if item.name not in referenced and mtime < cutoff]
+
+    objects_removed = len(garbage)
+    if not dry_run and (removed or garbage):
+        batch = trash_dir(world_path) / f"{datetime.now():%Y%m%d-%H%M%S-%f}"
+        for backup in removed:
+            _move_to_trash(batch, backup)
+        objects_removed = 0
+        for item in garbage:
+            # Checked again right before the move, in case a backup reused it meanwhile.
+            try:
+                if item.stat().st_mtime >= cutoff:
+                    continue
+            except FileNotFoundError:
+                continue
+            _move_to_trash(batch / OBJECTS_DIR, item)
+            objects_removed += 1
+    if not dry_run:
+        empty_trash_in_background(world_path)
+    return PruneResult(
+        tuple(backup.name for backup in kept),
+        tuple(backup.name for backup in removed),
+        bytes_before,
+        bytes_after,
+        objects_removed,
+    )
@@ -0,0 +1,191 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Iterable
+
+from mcworldmgr.safety.fastcopy import copy_file
+from mcworldmgr.safety.progress import ByteFn
+from mcworldmgr.world.region import (
+    HEADER_SIZE,
+    RawChunk,
+    RegionHeader,
+    build_region,
+    iter_raw_chunks,
+    read_region_header,
+)
+
+OBJECTS_DIR = ".objects"
+MANIFEST_NAME = "manifest.json"
+MANIFEST_VERSION = 1
+KIND_FILE = "file"
+KIND_REGION = "region"
+_BLOCK_SIZE = 1 << 20
+
+
+@dataclass(frozen=True)
+class FileEntry:
+    path: str
+    size: int
+    mtime_ns: int
+    digest: str
+    kind: str = KIND_FILE
+
+
+def object_path(root: Path, digest: str) -> Path:
+    return root / OBJECTS_DIR / digest[:2] / digest
+
+
+def touch_object(root: Path, digest: str) -> bool:
+    # Reusing an object refreshes its mtime, which keeps it inside prune's grace window
+    # until the manifest that references it is written. False when the object is gone.
+    try:
+        os.utime(object_path(root, digest))
+    except FileNotFoundError:
+        return False
+    return True
+
+
+def hash_file(path: Path, on_bytes: ByteFn | None = None) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as handle:
+        while block := handle.read(_BLOCK_SIZE):
+            digest.update(block)
+            if on_bytes:
+                on_bytes(len(block))
+    return digest.hexdigest()
+
+
+def store_file(root: Path, source: Path, on_bytes: ByteFn | None = None) -> str:
+    # Content already in the store is only hashed; new content is copied in the kernel
+    # (or reflinked) into a temp object and renamed into place. Progress follows the hash.
+    # The temp copy is hashed again and stored under that digest: the world may be written
+    # between the two reads, and an object must always match its name.
+    key = hash_file(source, on_bytes)
+    if touch_object(root, key):
+        return key
+    (root / OBJECTS_DIR).mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(prefix=".incoming.", dir=str(root / OBJECTS_DIR))
+    os.close(fd)
+    tmp_path = Path(tmp_name)
+    try:
+        copy_file(source, tmp_path, keep_times=False)
+        key = hash_file(tmp_path)
+        target = object_path(root, key)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(tmp_path, target)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+    return key
+
+
+def store_bytes(root: Path, data: bytes) -> str:
+    key = hashlib.sha256(data).hexdigest()
+    target = object_path(root, key)
+    if touch_object(root, key):
+        return key
+    target.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(prefix=".incoming.", dir=str(root / OBJECTS_DIR))
+    tmp_path = Path(tmp_name)
+    try:
+        with os.fdopen(fd, "wb") as handle:
+            handle.write(data)
+        os.replace(tmp_path, target)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+    return key
+
+
+def read_chunk_map(root: Path, digest: str) -> dict[int, tuple[int, int, int, str]]:
+    # index -> (timestamp, compression, length, payload digest)
+    rows = json.loads(object_path(root, digest).read_bytes())
+    return {row[0]: (row[1], row[2], row[3], row[4]) for row in rows}
+
+
+def _chunk_map(header: RegionHeader, payload_digest: Callable[[RawChunk], str]) -> bytes | None:
+    if header.file_size < HEADER_SIZE:
+        return None
+    rows: list[list[int | str]] = []
+    for raw in iter_raw_chunks(header):
+        if raw.corrupt:
+            return None
+        rows.append([raw.location.index, raw.location.timestamp, raw.compression, len(raw.data), payload_digest(raw)])
+    return json.dumps(rows, separators=(",", ":")).encode("utf-8")
+
+
+def store_region(root: Path, source: Path, on_bytes: ByteFn | None = None) -> str | None:
+    # Splits a region file into one object per compressed chunk payload plus a chunk map.
+    # Every payload is hashed: a chunk can change without its timestamp or length changing,
+    # and payloads already in the store are only touched, not written again. Returns None
+    # when the file cannot be split (truncated header, corrupt entries) so the caller stores
+    # it whole instead.
+    def payload_digest(raw: RawChunk) -> str:
+        if on_bytes:
+            on_bytes(len(raw.data))
+        return store_bytes(root, raw.data)
+
+    chunk_map = _chunk_map(read_region_header(source), payload_digest)
+    return None if chunk_map is None else store_bytes(root, chunk_map)
+
+
+def content_digest(path: Path, kind: str = KIND_FILE) -> str | None:
+    # The digest a snapshot would record for this file, computed without storing anything.
+    if kind != KIND_REGION:
+        return hash_file(path)
+    chunk_map = _chunk_map(read_region_header(path), lambda raw: hashlib.sha256(raw.data).hexdigest())
+    return None if chunk_map is None else hashlib.sha256(chunk_map).hexdigest()
+
+
+def is_snapshot(snapshot_dir: Path) -> bool:
+    return (snapshot_dir / MANIFEST_NAME).is_file()
+
+
+def write_manifest(snapshot_dir: Path, entries: Iterable[FileEntry]) -> None:
+    snapshot_dir.mkdir(parents=True, exist_ok=True)
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "files": [asdict(entry) for entry in sorted(entries, key=lambda entry: entry.path)],
+    }
+    fd, tmp_name = tempfile.mkstemp(prefix=f".{MANIFEST_NAME}.", suffix=".tmp", dir=str(snapshot_dir))
+    tmp_path = Path(tmp_name)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as handle:
+            json.dump(manifest, handle, separators=(",", ":"))
+        os.replace(tmp_path, snapshot_dir / MANIFEST_NAME)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+
+def read_manifest(snapshot_dir: Path) -> dict[str, FileEntry]:
+    with (snapshot_dir / MANIFEST_NAME).open("r", encoding="utf-8") as handle:
+        manifest = json.load(handle)
+    if manifest.get("version") != MANIFEST_VERSION:
+        raise ValueError(f"Unsupported backup manifest version in {snapshot_dir.name}")
+    return {item["path"]: FileEntry(**item) for item in manifest["files"]}
+
+
+def _read_payload(root: Path, digest: str, on_bytes: ByteFn | None) -> bytes:
+    data = object_path(root, digest).read_bytes()
+    if on_bytes:
+        on_bytes(len(data))
+    return data
+
+
+def restore_object(root: Path, entry: FileEntry, target: Path, on_bytes: ByteFn | None = None) -> None:
+    # The target's parent folder must already exist.
+    if entry.kind == KIND_REGION:
+        records = {
+            index: (timestamp, compression, _read_payload(root, digest, on_bytes))
+            for index, (timestamp, compression, _, digest) in read_chunk_map(root, entry.digest).items()
+        }
+        build_region(target, records)
+    else:
+        copy_file(object_path(root, entry.digest), target, keep_times=False, on_bytes=on_bytes)
+    # Restored files keep their snapshot mtime so the next backup's stat cache still matches them.
+    os.utime(target, ns=(entry.mtime_ns, entry.mtime_ns))
@@ -0,0 +1,180 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import lzma
+import struct
+import tarfile
+import tempfile
+import zlib
+from dataclasses import dataclass
+from functools import partial
+from pathlib import Path
+
+from mcworldmgr.safety.archive import INDEX_NAME, ArchiveEntry, is_archive, read_archive_entry, read_archive_index
+from mcworldmgr.safety.backup import BACKUPS_DIR_NAME, backup_path, backups_dir, iter_world_files
+from mcworldmgr.safety.fastcopy import run_parallel
+from mcworldmgr.safety.progress import ByteFn, ProgressMeter, TransferFn
+from mcworldmgr.safety.store import KIND_REGION, FileEntry, hash_file, is_snapshot, object_path, read_manifest
+from mcworldmgr.world.nbt_io import parse_nbt_bytes
+from mcworldmgr.world.region import (
+    CHUNKS_PER_REGION,
+    EXTERNAL_FLAG,
+    REGION_NAME_RE,
+    decompress_payload,
+    iter_raw_chunks,
+    load_chunk,
+    read_region_header,
+)
+
+
+@dataclass(frozen=True)
+class VerifyIssue:
+    path: str
+    problem: str
+
+
+@dataclass(frozen=True)
+class VerifyReport:
+    backup: str
+    files: int
+    checksummed: bool
+    issues: tuple[VerifyIssue, ...]
+
+    @property
+    def ok(self) -> bool:
+        return not self.issues
+
+
+def _chunk_problem(compression: int, data: bytes) -> str | None:
+    try:
+        parse_nbt_bytes(decompress_payload(compression, data))
+    except (OSError, EOFError, zlib.error, struct.error, ValueError) as exc:
+        return str(exc)
+    return None
+
+
+def _check_region_path(path: Path) -> list[str]:
+    # Header entries must point inside the file and every chunk must decompress and parse.
+    problems: list[str] = []
+    try:
+        header = read_region_header(path)
+        for raw in iter_raw_chunks(header):
+            try:
+                load_chunk(header, raw)
+            except ValueError as exc:
+                problems.append(str(exc))
+    except (OSError, ValueError, struct.error) as exc:
+        problems.append(f"unreadable region header: {exc}")
+    return problems
+
+
+def _check_object(root: Path, entry: FileEntry, deep: bool, on_bytes: ByteFn) -> list[VerifyIssue]:
+    stored = object_path(root, entry.digest)
+    if not stored.is_file():
+        return [VerifyIssue(entry.path, "missing from the object store")]
+    if entry.kind != KIND_REGION:
+        if stored.stat().st_size != entry.size:
+            return [VerifyIssue(entry.path, "size mismatch")]
+        if hash_file(stored, on_bytes=on_bytes) != entry.digest:
+            return [VerifyIssue(entry.path, "checksum mismatch")]
+        return []
+
+    # Region entries: the chunk map and every chunk payload are objects of their own.
+    chunk_map = stored.read_bytes()
+    if hashlib.sha256(chunk_map).hexdigest() != entry.digest:
+        return [VerifyIssue(entry.path, "chunk map checksum mismatch")]
+    try:
+        rows = _parse_rows(chunk_map)
+    except (ValueError, TypeError, IndexError):
+        return [VerifyIssue(entry.path, "chunk map could not be parsed")]
+    issues: list[VerifyIssue] = []
+    for row in rows:
+        index, _, compression, length, digest = row
+        label = f"{entry.path} chunk {index}"
+        if not 0 <= index < CHUNKS_PER_REGION:
+            issues.append(VerifyIssue(entry.path, f"chunk map has invalid index {index}"))
+            continue
+        payload_path = object_path(root, digest)
+        if not payload_path.is_file():
+            issues.append(VerifyIssue(label, "payload missing from the object store"))
+            continue
+        payload = payload_path.read_bytes()
+        if len(payload) != length or hashlib.sha256(payload).hexdigest() != digest:
+            issues.append(VerifyIssue(label, "payload checksum mismatch"))
+            continue
+        if deep and not compression & EXTERNAL_FLAG:
+            problem = _chunk_problem(compression, payload)
+            if problem is not None:
+                issues.append(VerifyIssue(label, f"could not be decoded: {problem}"))
+    return issues
+
+
+def _parse_rows(chunk_map: bytes) -> list[tuple[int, int, int, int, str]]:
+    return [(int(row[0]), int(row[1]), int(row[2]), int(row[3]), str(row[4])) for row in json.loads(chunk_map)]
+
+
+def _check_archive_entry(archive: Path, entry: ArchiveEntry, deep: bool, on_bytes: ByteFn) -> list[VerifyIssue]:
+    try:
+        data = read_archive_entry(archive, entry)
+    except (OSError, EOFError, zlib.error, lzma.LZMAError, ValueError) as exc:
+        return [VerifyIssue(entry.path, f"could not be read: {exc}")]
+    on_bytes(len(data))
+    if len(data) != entry.size:
+        return [VerifyIssue(entry.path, "size mismatch")]
+    if entry.digest and hashlib.sha256(data).hexdigest() != entry.digest:
+        return [VerifyIssue(entry.path, "checksum mismatch")]
+    if deep and REGION_NAME_RE.match(Path(entry.path).name):
+        with tempfile.TemporaryDirectory() as scratch:
+            region = Path(scratch) / Path(entry.path).name
+            region.write_bytes(data)
+            return [VerifyIssue(entry.path, problem) for problem in _check_region_path(region)]
+    return []
+
+
+def _check_copied_file(path: Path, relative: str, deep: bool, on_bytes: ByteFn) -> list[VerifyIssue]:
+    # Nothing is hashed here; the meter counts the whole file once the check returns.
+    if deep and REGION_NAME_RE.match(path.name):
+        return [VerifyIssue(relative, problem) for problem in _check_region_path(path)]
+    return []
+
+
+def verify_backup(
+    world_path: Path,
+    backup_name: str,
+    *,
+    deep: bool = False,
+    workers: int | None = None,
+    progress: TransferFn | None = None,
+) -> VerifyReport:
+    # Re-hashes every file of a backup on a thread pool against the hashes recorded when it
+    # was made. deep also checks that every region chunk decompresses and parses. Full-copy
+    # folders from earlier versions carry no hashes, so only the deep checks apply to them.
+    # Progress counts the original file sizes; the meter fills in whatever a check does not report.
+    source = backup_path(world_path, backup_name)
+    if is_archive(source):
+        try:
+            index = read_archive_index(source)
+        except (OSError, EOFError, tarfile.TarError, KeyError, ValueError) as exc:
+            # A truncated or damaged tar: nothing inside can be located without the index.
+            return VerifyReport(backup_name, 0, False, (VerifyIssue(INDEX_NAME, f"could not be read: {exc}"),))
+        checks = [
+            (entry.path, entry.size, partial(_check_archive_entry, source, entry, deep)) for entry in index.values()
+        ]
+        checksummed = all(entry.digest for entry in index.values())
+    elif is_snapshot(source):
+        root = backups_dir(world_path)
+        entries = read_manifest(source)
+        checks = [(entry.path, entry.size, partial(_check_object, root, entry, deep)) for entry in entries.values()]
+        checksummed = True
+    else:
+        files = iter_world_files(source, exclude=(BACKUPS_DIR_NAME,))
+        checks = [
+            (item.relative, item.size, partial(_check_copied_file, item.path, item.relative, deep)) for item in files
+        ]
+        checksummed = False
+    meter = ProgressMeter(progress, len(checks), sum(size for _, size, _ in checks))
+    jobs = [(label, meter.track(size, check)) for label, size, check in checks]
+    results = run_parallel(jobs, workers=workers, progress=meter.file_done)
+    issues = tuple(issue for found in results for issue in found)
+    return VerifyReport(backup_name, len(jobs), checksummed, issues)
@@ -1,26 +1,42 @@
 from mcworldmgr.services.operations import (
+    compact_regions,
+    copy_chunks,
     create_backup_for_world,
     delete_all_entity_regions,
     delete_player,
     delete_entity_region,
     delete_region,
+    get_region_details,
     get_world_inspect_info,
     kill_player,
     list_backups_for_world,
     list_entity_regions,
     list_player_uuids,
     list_region_files,
+    list_undo_entries,
     list_world_refs,
+    prune_backups_for_world,
+    prune_chunks,
     queue_command,
     queue_kill_entities,
     queue_summon_entity,
+    recompress_regions,
     reset_chunk,
     restore_backup_for_world,
+    restore_chunks_from_backup,
+    restore_file_from_backup,
     set_world_advanced,
     set_gamerule,
     set_player,
     set_world_metadata,
+    trim_world,
+    undo_operation,
+    verify_backup_for_world,
 )
+from mcworldmgr.services.block_index import BlockHit, find_blocks
+from mcworldmgr.services.entities import EntityHotspotReport, entity_hotspots, purge_entities
+from mcworldmgr.services.lag import ChunkBlockActivity, clear_scheduled_ticks, scan_block_activity
+from mcworldmgr.services.scan import ChunkSummary, scan_world
 
 __all__ = [
     "list_world_refs",
@@ -28,6 +44,12 @@ __all__ = [
     "create_backup_for_world",
     "list_backups_for_world",
     "restore_backup_for_world",
+    "restore_chunks_from_backup",
+    "restore_file_from_backup",
+    "list_undo_entries",
+    "undo_operation",
+    "verify_backup_for_world",
+    "prune_backups_for_world",
     "set_world_metadata",
     "set_world_advanced",
     "set_gamerule",
@@ -42,6 +64,22 @@ __all__ = [
     "queue_summon_entity",
     "queue_kill_entities",
     "list_region_files",
+    "get_region_details",
     "delete_region",
     "reset_chunk",
+    "prune_chunks",
+    "compact_regions",
+    "recompress_regions",
+    "trim_world",
+    "copy_chunks",
+    "ChunkSummary",
+    "scan_world",
+    "BlockHit",
+    "find_blocks",
+    "purge_entities",
+    "EntityHotspotReport",
+    "entity_hotspots",
+    "ChunkBlockActivity",
+    "scan_block_activity",
+    "clear_scheduled_ticks",
 ]
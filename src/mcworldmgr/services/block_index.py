@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+import gzip
+import json
+import os
+import tempfile
+from dataclasses import dataclass
+from functools import partial
+from pathlib import Path
+from typing import Any, Sequence
+
+import numpy as np
+
+from mcworldmgr.safety.progress import ProgressFn
+from mcworldmgr.services.scan import map_regions
+from mcworldmgr.world.discovery import dimension_dirs, resolve_world
+from mcworldmgr.world.palette import block_position, decode_block_states, palette_names
+from mcworldmgr.world.region import RegionHeader, iter_raw_chunks, list_region_paths, load_chunk, read_region_header
+
+INDEX_VERSION = 2
+# Section masks store bit (Y - base) so every legal section height maps to a bit >= 0.
+_SECTION_BIT_BASE = -128
+
+
+@dataclass(frozen=True)
+class BlockHit:
+    dimension: str
+    block_id: str
+    x: int
+    y: int
+    z: int
+
+
+def index_dir(world_path: Path) -> Path:
+    return world_path / ".mcworldmgr_index" / "blocks"
+
+
+def dimension_index_dir(world_path: Path, folder: Path) -> Path:
+    # Mirrors the world layout: region/ for the overworld, DIM-1/region/ for the Nether, ...
+    return index_dir(world_path) / folder.relative_to(world_path) / "region"
+
+
+def _empty_index(dimension: str) -> dict[str, Any]:
+    return {"version": INDEX_VERSION, "dimension": dimension, "chunks": {}, "blocks": {}}
+
+
+def _load_region_index(path: Path, dimension: str) -> dict[str, Any]:
+    try:
+        with gzip.open(path, "rt", encoding="utf-8") as handle:
+            data = json.load(handle)
+    except (OSError, ValueError):
+        return _empty_index(dimension)
+    if not isinstance(data, dict) or data.get("version") != INDEX_VERSION or data.get("dimension") != dimension:
+        return _empty_index(dimension)
+    return data
+
+
+def _save_region_index(path: Path, index: dict[str, Any]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=str(path.parent))
+    tmp_path = Path(tmp_name)
+    try:
+        with os.fdopen(fd, "wb") as raw, gzip.GzipFile(fileobj=raw, mode="wb", compresslevel=6) as handle:
+            handle.write(json.dumps(index, separators=(",", ":")).encode("utf-8"))
+        os.replace(tmp_path, path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+
+def update_region_index(
+    region_path: Path, index_path: Path, dimension: str
+) -> tuple[RegionHeader, dict[str, Any]]:
+    header = read_region_header(region_path)
+    index = _load_region_index(index_path, dimension)
+    chunks: dict[str, int] = index["chunks"]
+    blocks: dict[str, dict[str, int]] = index["blocks"]
+
+    # The header timestamp changes every time the game saves a chunk, so only
+    # chunks whose timestamp differs from the indexed one are decoded again.
+    present = {str(location.index): location.timestamp for location in header.chunks()}
+    stale = [key for key, timestamp in chunks.items() if present.get(key) != timestamp]
+    fresh = [int(key) for key, timestamp in present.items() if chunks.get(key) != timestamp]
+    if not stale and not fresh:
+        return header, index
+
+    for key in stale:
+        del chunks[key]
+    if stale:
+        for masks in blocks.values():
+            for key in stale:
+                masks.pop(key, None)
+
+    for raw in iter_raw_chunks(header, fresh):
+        key = str(raw.location.index)
+        chunks[key] = raw.location.timestamp
+        try:
+            chunk = load_chunk(header, raw)
+        except ValueError:
+            continue
+        for section in chunk.get("sections", []):
+            bit = 1 << (int(section.get("Y", 0)) - _SECTION_BIT_BASE)
+            for name in set(palette_names(section.get("block_states"))):
+                masks = blocks.setdefault(name, {})
+                masks[key] = masks.get(key, 0) | bit
+
+    index["blocks"] = {name: masks for name, masks in blocks.items() if masks}
+    _save_region_index(index_path, index)
+    return header, index
+
+
+def _search_region(
+    block_ids: tuple[str, ...], roots: dict[Path, tuple[str, Path]], region_path: Path
+) -> list[BlockHit]:
+    # roots maps each dimension's region folder to (dimension id, index folder).
+    dimension, index_root = roots[region_path.parent]
+    header, index = update_region_index(region_path, index_root / f"{region_path.name}.json.gz", dimension)
+    wanted: dict[int, int] = {}
+    for block_id in block_ids:
+        for key, mask in index["blocks"].get(block_id, {}).items():
+            wanted[int(key)] = wanted.get(int(key), 0) | mask
+    if not wanted:
+        return []
+
+    hits: list[BlockHit] = []
+    for raw in iter_raw_chunks(header, sorted(wanted)):
+        try:
+            chunk = load_chunk(header, raw)
+        except ValueError:
+            continue
+        chunk_x, chunk_z = header.chunk_coords(raw.location.index)
+        mask = wanted[raw.location.index]
+        for section in chunk.get("sections", []):
+            section_y = int(section.get("Y", 0))
+            if not mask >> (section_y - _SECTION_BIT_BASE) & 1:
+                continue
+            names, indices = decode_block_states(section)
+            for block_id in block_ids:
+                matches = [position for position, name in enumerate(names) if name == block_id]
+                if not matches:
+                    continue
+                for hit in np.flatnonzero(np.isin(indices, matches)):
+                    x, y, z = block_position(int(hit))
+                    hits.append(BlockHit(dimension, block_id, chunk_x * 16 + x, section_y * 16 + y, chunk_z * 16 + z))
+    return hits
+
+
+def find_blocks(
+    world_arg: str,
+    block_ids: Sequence[str],
+    saves_dir: str | None = None,
+    *,
+    workers: int | None = None,
+    progress: ProgressFn | None = None,
+) -> list[BlockHit]:
+    if not block_ids:
+        raise ValueError("Provide at least one block id to search for.")
+    world = resolve_world(world_arg, saves_dir)
+    roots: dict[Path, tuple[str, Path]] = {}
+    paths: list[Path] = []
+    for dimension, folder in dimension_dirs(world.path).items():
+        region_dir = folder / "region"
+        index_root = dimension_index_dir(world.path, folder)
+        region_paths = list_region_paths(region_dir)
+        if index_root.exists():
+            live = {f"{path.name}.json.gz" for path in region_paths}
+            for orphan in index_root.glob("r.*.*.mca.json.gz"):
+                if orphan.name not in live:
+                    orphan.unlink(missing_ok=True)
+        roots[region_dir] = (dimension, index_root)
+        paths.extend(region_paths)
+
+    worker = partial(_search_region, tuple(block_ids), roots)
+    hits = [hit for batch in map_regions(worker, paths, workers=workers, progress=progress) for hit in batch]
+    return sorted(hits, key=lambda hit: (hit.dimension, hit.block_id, hit.x, hit.z, hit.y))
@@ -0,0 +1,212 @@
+from __future__ import annotations
+
+import math
+from collections import Counter
+from dataclasses import dataclass
+from functools import partial
+from pathlib import Path
+from typing import Any, Sequence
+
+import nbtlib
+
+from mcworldmgr.safety.journal import record_undo
+from mcworldmgr.safety.locks import ConfirmFn, prompt_if_locked
+from mcworldmgr.safety.progress import ProgressFn
+from mcworldmgr.services.scan import map_regions
+from mcworldmgr.world.discovery import resolve_world
+from mcworldmgr.world.region import (
+    encode_chunk,
+    iter_raw_chunks,
+    list_region_paths,
+    load_chunk,
+    parse_region_name,
+    read_region_header,
+    write_chunks,
+)
+
+BoundingBox = tuple[float, float, float, float, float, float]
+
+
+@dataclass(frozen=True)
+class ChunkEntityCount:
+    region: str
+    chunk_x: int
+    chunk_z: int
+    total: int
+    types: dict[str, int]
+
+
+@dataclass(frozen=True)
+class EntityHotspotReport:
+    chunks: list[ChunkEntityCount]
+    types: dict[str, int]
+    total: int
+    chunks_with_entities: int
+
+
+@dataclass(frozen=True)
+class EntityFilter:
+    types: frozenset[str] = frozenset()
+    bbox: BoundingBox | None = None
+
+    @classmethod
+    def create(cls, types: Sequence[str] | None = None, bbox: Sequence[float] | None = None) -> EntityFilter:
+        if not types and bbox is None:
+            raise ValueError("Provide at least one filter: entity type or bounding box")
+        if bbox is not None:
+            if len(bbox) != 6:
+                raise ValueError("Bounding box needs six values: x1 y1 z1 x2 y2 z2")
+            x1, y1, z1, x2, y2, z2 = (float(value) for value in bbox)
+            bbox = (min(x1, x2), min(y1, y2), min(z1, z2), max(x1, x2), max(y1, y2), max(z1, z2))
+        return cls(frozenset(types or ()), bbox)
+
+    def _chunk_range(self) -> tuple[int, int, int, int] | None:
+        if self.bbox is None:
+            return None
+        min_x, _, min_z, max_x, _, max_z = self.bbox
+        return math.floor(min_x) >> 4, math.floor(min_z) >> 4, math.floor(max_x) >> 4, math.floor(max_z) >> 4
+
+    def region_may_match(self, region_x: int, region_z: int) -> bool:
+        bounds = self._chunk_range()
+        if bounds is None:
+            return True
+        min_x, min_z, max_x, max_z = bounds
+        return min_x >> 5 <= region_x <= max_x >> 5 and min_z >> 5 <= region_z <= max_z >> 5
+
+    def chunk_may_match(self, chunk_x: int, chunk_z: int) -> bool:
+        bounds = self._chunk_range()
+        if bounds is None:
+            return True
+        min_x, min_z, max_x, max_z = bounds
+        return min_x <= chunk_x <= max_x and min_z <= chunk_z <= max_z
+
+    def matches(self, entity: Any) -> bool:
+        if self.types and str(entity.get("id", "")) not in self.types:
+            return False
+        if self.bbox is None:
+            return True
+        pos = entity.get("Pos")
+        if pos is None or len(pos) < 3:
+            return False
+        min_x, min_y, min_z, max_x, max_y, max_z = self.bbox
+        return min_x <= float(pos[0]) <= max_x and min_y <= float(pos[1]) <= max_y and min_z <= float(pos[2]) <= max_z
+
+
+def _purge_region(entity_filter: EntityFilter, dry_run: bool, path: Path) -> tuple[int, int]:
+    header = read_region_header(path)
+    if not entity_filter.region_may_match(header.region_x, header.region_z):
+        return 0, 0
+    indices = [
+        location.index
+        for location in header.chunks()
+        if entity_filter.chunk_may_match(*header.chunk_coords(location.index))
+    ]
+
+    removed = 0
+    changed = 0
+    payloads: dict[int, tuple[int, bytes]] = {}
+    for raw in iter_raw_chunks(header, indices):
+        try:
+            chunk = load_chunk(header, raw)
+        except ValueError:
+            continue
+        entities = chunk.get("Entities")
+        if not entities:
+            continue
+        kept = [entity for entity in entities if not entity_filter.matches(entity)]
+        if len(kept) == len(entities):
+            continue
+        removed += len(entities) - len(kept)
+        changed += 1
+        if not dry_run:
+            chunk["Entities"] = nbtlib.List[nbtlib.Compound](kept)
+            payloads[raw.location.index] = encode_chunk(chunk, raw.compression)
+
+    write_chunks(path, payloads)
+    return removed, changed
+
+
+def purge_entities(
+    world_arg: str,
+    saves_dir: str | None = None,
+    *,
+    types: Sequence[str] | None = None,
+    bbox: Sequence[float] | None = None,
+    dry_run: bool = False,
+    workers: int | None = None,
+    confirm: ConfirmFn | None = None,
+    backup_before_write: bool = False,
+    progress: ProgressFn | None = None,
+) -> dict[str, int]:
+    entity_filter = EntityFilter.create(types, bbox)
+    world = resolve_world(world_arg, saves_dir)
+    # Regions outside the bounding box are neither read nor journaled.
+    paths = [
+        path
+        for path in list_region_paths(world.path / "entities")
+        if entity_filter.region_may_match(*parse_region_name(path.name))
+    ]
+    if not dry_run:
+        prompt_if_locked(world.path, confirm=confirm)
+        if backup_before_write:
+            record_undo(world.path, "purge-entities", paths)
+
+    worker = partial(_purge_region, entity_filter, dry_run)
+    result = {"entities": 0, "chunks": 0, "regions": 0}
+    for removed, chunks in map_regions(worker, paths, workers=workers, progress=progress):
+        if removed:
+            result["entities"] += removed
+            result["chunks"] += chunks
+            result["regions"] += 1
+    return result
+
+
+def _count_entities(entities: Any, counts: Counter[str]) -> None:
+    # Riders are stored inside their vehicle's Passengers list but tick like any other entity.
+    for entity in entities:
+        counts[str(entity.get("id", ""))] += 1
+        passengers = entity.get("Passengers")
+        if passengers:
+            _count_entities(passengers, counts)
+
+
+def _count_region_entities(path: Path) -> list[ChunkEntityCount]:
+    header = read_region_header(path)
+    counts: list[ChunkEntityCount] = []
+    for raw in iter_raw_chunks(header):
+        try:
+            chunk = load_chunk(header, raw)
+        except ValueError:
+            continue
+        types: Counter[str] = Counter()
+        _count_entities(chunk.get("Entities", []), types)
+        if types:
+            chunk_x, chunk_z = header.chunk_coords(raw.location.index)
+            counts.append(ChunkEntityCount(path.name, chunk_x, chunk_z, sum(types.values()), dict(types.most_common())))
+    return counts
+
+
+def entity_hotspots(
+    world_arg: str,
+    saves_dir: str | None = None,
+    *,
+    top: int = 50,
+    workers: int | None = None,
+    progress: ProgressFn | None = None,
+) -> EntityHotspotReport:
+    world = resolve_world(world_arg, saves_dir)
+    paths = list_region_paths(world.path / "entities")
+    types: Counter[str] = Counter()
+    ranked: list[ChunkEntityCount] = []
+    for counts in map_regions(_count_region_entities, paths, workers=workers, progress=progress):
+        for item in counts:
+            types.update(item.types)
+        ranked.extend(counts)
+
+    ranked.sort(key=lambda item: (-item.total, item.chunk_x, item.chunk_z))
+    return EntityHotspotReport(
+        chunks=ranked if top <= 0 else ranked[:top],
+        types=dict(types.most_common()),
+        total=sum(types.values()),
+        chunks_with_entities=len(ranked),
+    )
@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+from collections import Counter
+from dataclasses import dataclass
+from functools import partial
+from pathlib import Path
+from typing import Any, Iterator
+
+import nbtlib
+
+from mcworldmgr.safety.journal import record_undo
+from mcworldmgr.safety.locks import ConfirmFn, prompt_if_locked
+from mcworldmgr.safety.progress import ProgressFn
+from mcworldmgr.services.scan import map_regions
+from mcworldmgr.world.discovery import dimension_dirs, resolve_world
+from mcworldmgr.world.region import (
+    encode_chunk,
+    iter_raw_chunks,
+    list_region_paths,
+    load_chunk,
+    read_region_header,
+    write_chunks,
+)
+
+TICK_LISTS = ("block_ticks", "fluid_ticks")
+
+
+@dataclass(frozen=True)
+class ChunkBlockActivity:
+    dimension: str
+    chunk_x: int
+    chunk_z: int
+    block_entities: dict[str, int]
+    block_ticks: int
+    fluid_ticks: int
+
+    @property
+    def block_entity_count(self) -> int:
+        return sum(self.block_entities.values())
+
+    @property
+    def scheduled_ticks(self) -> int:
+        return self.block_ticks + self.fluid_ticks
+
+
+def _region_activity(dimension: str, path: Path) -> list[ChunkBlockActivity]:
+    header = read_region_header(path)
+    activity: list[ChunkBlockActivity] = []
+    for raw in iter_raw_chunks(header):
+        try:
+            chunk = load_chunk(header, raw)
+        except ValueError:
+            continue
+        types = Counter(str(entity.get("id", "")) for entity in chunk.get("block_entities", []))
+        block_ticks = len(chunk.get("block_ticks", []))
+        fluid_ticks = len(chunk.get("fluid_ticks", []))
+        if types or block_ticks or fluid_ticks:
+            chunk_x, chunk_z = header.chunk_coords(raw.location.index)
+            activity.append(
+                ChunkBlockActivity(dimension, chunk_x, chunk_z, dict(types.most_common()), block_ticks, fluid_ticks)
+            )
+    return activity
+
+
+def scan_block_activity(
+    world_arg: str,
+    saves_dir: str | None = None,
+    *,
+    workers: int | None = None,
+    progress: ProgressFn | None = None,
+) -> Iterator[ChunkBlockActivity]:
+    # Only chunks with at least one block entity or scheduled tick are yielded,
+    # region by region as the workers finish.
+    world = resolve_world(world_arg, saves_dir)
+    for dimension, folder in dimension_dirs(world.path).items():
+        paths = list_region_paths(folder / "region")
+        worker = partial(_region_activity, dimension)
+        for activity in map_regions(worker, paths, workers=workers, progress=progress):
+            yield from activity
+
+
+def _tick_order(tick: Any) -> tuple[int, int]:
+    return int(tick.get("t", 0)), int(tick.get("p", 0))
+
+
+def _clear_region_ticks(max_ticks: int, truncate: bool, dry_run: bool, path: Path) -> tuple[int, int]:
+    header = read_region_header(path)
+    removed = 0
+    changed = 0
+    payloads: dict[int, tuple[int, bytes]] = {}
+    for raw in iter_raw_chunks(header):
+        try:
+            chunk = load_chunk(header, raw)
+        except ValueError:
+            continue
+        chunk_removed = 0
+        for name in TICK_LISTS:
+            ticks = chunk.get(name)
+            if ticks is None or len(ticks) <= max_ticks:
+                continue
+            # Truncating keeps the ticks due soonest, the ones the game would run first.
+            kept = sorted(ticks, key=_tick_order)[:max_ticks] if truncate else []
+            chunk_removed += len(ticks) - len(kept)
+            chunk[name] = nbtlib.List[nbtlib.Compound](kept)
+        if not chunk_removed:
+            continue
+        removed += chunk_removed
+        changed += 1
+        if not dry_run:
+            payloads[raw.location.index] = encode_chunk(chunk, raw.compression)
+
+    write_chunks(path, payloads)
+    return removed, changed
+
+
+def _backlogged_region(max_ticks: int, truncate: bool, path: Path) -> Path | None:
+    removed, _ = _clear_region_ticks(max_ticks, truncate, True, path)
+    return path if removed else None
+
+
+def clear_scheduled_ticks(
+    world_arg: str,
+    max_ticks: int,
+    saves_dir: str | None = None,
+    *,
+    truncate: bool = False,
+    dry_run: bool = False,
+    workers: int | None = None,
+    confirm: ConfirmFn | None = None,
+    backup_before_write: bool = False,
+    progress: ProgressFn | None = None,
+) -> dict[str, int]:
+    if max_ticks < 0:
+        raise ValueError("max_ticks must be zero or positive")
+
+    world = resolve_world(world_arg, saves_dir)
+    paths = [path for folder in dimension_dirs(world.path).values() for path in list_region_paths(folder / "region")]
+    if not dry_run:
+        prompt_if_locked(world.path, confirm=confirm)
+        if backup_before_write:
+            # There is no area to narrow by, so a read-only pass finds the regions that
+            # would change; only those are journaled and rewritten.
+            check = partial(_backlogged_region, max_ticks, truncate)
+            paths = sorted(path for path in map_regions(check, paths, workers=workers) if path is not None)
+            record_undo(world.path, "clear-ticks", paths)
+
+    worker = partial(_clear_region_ticks, max_ticks, truncate, dry_run)
+    result = {"ticks": 0, "chunks": 0, "regions": 0}
+    for removed, chunks in map_regions(worker, paths, workers=workers, progress=progress):
+        if removed:
+            result["ticks"] += removed
+            result["chunks"] += chunks
+            result["regions"] += 1
+    return result
@@ -1,24 +1,60 @@
 from __future__ import annotations
 
+import shutil
+import tempfile
+from functools import partial
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterable
 
 import nbtlib
 
-from mcworldmgr.safety.backup import ProgressFn, create_backup, list_backups, restore_backup
+from mcworldmgr.safety.backup import (
+    backup_path,
+    backups_dir,
+    check_relative_path,
+    create_archive_backup,
+    create_backup,
+    export_backup_files,
+    list_backups,
+    restore_backup,
+    restore_file,
+)
+from mcworldmgr.safety.journal import JournalEntry, list_journal, record_undo, undo
 from mcworldmgr.safety.locks import ConfirmFn, prompt_if_locked
-from mcworldmgr.world.discovery import WorldRef, list_worlds, resolve_world
+from mcworldmgr.safety.progress import ProgressFn, TransferFn
+from mcworldmgr.safety.retention import PruneResult, prune_backups
+from mcworldmgr.safety.verify import VerifyReport, verify_backup
+from mcworldmgr.services.scan import map_regions
+from mcworldmgr.world.area import Area, CircleArea, chunk_overlaps, load_polygon, region_overlaps
+from mcworldmgr.world.discovery import OVERWORLD, WorldRef, dimension_dirs, list_worlds, resolve_world
 from mcworldmgr.world.nbt_io import read_nbt, write_nbt_atomic
-from mcworldmgr.world.versioning import assert_supported_data_version
+from mcworldmgr.world.region import (
+    COMPRESSION_LZ4,
+    COMPRESSION_NAMES,
+    HEADER_SIZE,
+    SECTOR_SIZE,
+    RawChunk,
+    RegionHeader,
+    check_compression_level,
+    chunk_index,
+    clear_chunks,
+    compress_payload,
+    delete_region_file,
+    iter_raw_chunks,
+    list_region_paths,
+    load_chunk,
+    read_chunk_payload,
+    read_compressed_payload,
+    read_region_header,
+    region_name_for_chunk,
+    rewrite_region,
+    write_chunks,
+)
+from mcworldmgr.world.versioning import assert_lz4_supported, assert_supported_data_version
 
 DIFFICULTY_MAP = {"peaceful": 0, "easy": 1, "normal": 2, "hard": 3}
 GAMEMODE_MAP = {"survival": 0, "creative": 1, "adventure": 2, "spectator": 3}
-
-
-def _region_name_for_chunk(chunk_x: int, chunk_z: int) -> str:
-    rx = chunk_x // 32
-    rz = chunk_z // 32
-    return f"r.{rx}.{rz}.mca"
+CHUNK_DATA_DIRS = ("region", "entities", "poi")
 
 
 def list_world_refs(saves_dir: str | None = None) -> list[WorldRef]:
@@ -39,6 +75,8 @@ def get_world_inspect_info(world_arg: str, saves_dir: str | None = None) -> dict
     entities_dir = world.path / "entities"
     entity_regions = list(entities_dir.glob("r.*.*.mca")) if entities_dir.exists() else []
 
+    chunks_count = sum(read_region_header(path).chunk_count for path in list_region_paths(region_dir))
+
     return {
         "world_name": world.name,
         "path": str(world.path),
@@ -51,6 +89,7 @@ def get_world_inspect_info(world_arg: str, saves_dir: str | None = None) -> dict
         "players_count": len(players),
         "regions_count": len(regions),
         "entity_regions_count": len(entity_regions),
+        "chunks_count": chunks_count,
     }
 
 
@@ -58,10 +97,14 @@ def create_backup_for_world(
     world_arg: str,
     saves_dir: str | None = None,
     confirm: ConfirmFn | None = None,
-    progress: ProgressFn | None = None,
+    progress: TransferFn | None = None,
+    *,
+    archive_codec: str | None = None,
 ) -> Path:
     world = resolve_world(world_arg, saves_dir)
     prompt_if_locked(world.path, confirm=confirm)
+    if archive_codec is not None:
+        return create_archive_backup(world.path, progress=progress, codec=archive_codec)
     return create_backup(world.path, progress=progress)
 
 
@@ -75,16 +118,127 @@ def restore_backup_for_world(
     backup_name: str,
     saves_dir: str | None = None,
     confirm: ConfirmFn | None = None,
-    progress: ProgressFn | None = None,
-) -> None:
+    progress: TransferFn | None = None,
+    *,
+    swap: bool = False,
+) -> dict[str, int]:
+    world = resolve_world(world_arg, saves_dir)
+    prompt_if_locked(world.path, confirm=confirm)
+    return restore_backup(world.path, backup_name, progress=progress, swap=swap)
+
+
+def restore_chunks_from_backup(
+    world_arg: str,
+    backup_name: str,
+    from_chunk: tuple[int, int],
+    to_chunk: tuple[int, int],
+    saves_dir: str | None = None,
+    *,
+    dimension: str = OVERWORLD,
+    confirm: ConfirmFn | None = None,
+    backup_before_write: bool = False,
+) -> dict[str, int]:
+    world = resolve_world(world_arg, saves_dir)
+    dimension_root = dimension_dirs(world.path).get(dimension)
+    if dimension_root is None:
+        raise FileNotFoundError(f"Dimension {dimension} not found in {world.name}")
+    prefix = dimension_root.relative_to(world.path)
+    needed = ["level.dat"] + [
+        (prefix / folder / region_name).as_posix()
+        for region_name in _chunks_by_region(from_chunk, to_chunk)
+        for folder in CHUNK_DATA_DIRS
+    ]
+
+    # Only the few region files under the rectangle are pulled out of the snapshot into a
+    # scratch world next to the store; copy_chunks then moves the raw payloads from there.
+    backups_dir(world.path).mkdir(parents=True, exist_ok=True)
+    staging = Path(tempfile.mkdtemp(prefix=".restore-", dir=str(backups_dir(world.path))))
+    try:
+        export_backup_files(world.path, backup_name, needed, staging)
+        (staging / prefix).mkdir(parents=True, exist_ok=True)
+        (staging / "level.dat").touch(exist_ok=True)
+        return copy_chunks(
+            str(staging),
+            str(world.path),
+            from_chunk,
+            to_chunk,
+            dimension=dimension,
+            confirm=confirm,
+            backup_before_write=backup_before_write,
+        )
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+
+
+def restore_file_from_backup(
+    world_arg: str,
+    backup_name: str,
+    relative_path: str,
+    saves_dir: str | None = None,
+    *,
+    confirm: ConfirmFn | None = None,
+    backup_before_write: bool = False,
+) -> Path:
+    world = resolve_world(world_arg, saves_dir)
+    backup_path(world.path, backup_name)
+    relative = check_relative_path(relative_path)
+    prompt_if_locked(world.path, confirm=confirm)
+    _maybe_backup(world.path, backup_before_write, "restore-file", [world.path / relative])
+    return restore_file(world.path, backup_name, relative_path)
+
+
+def verify_backup_for_world(
+    world_arg: str,
+    backup_name: str,
+    saves_dir: str | None = None,
+    *,
+    deep: bool = False,
+    workers: int | None = None,
+    progress: TransferFn | None = None,
+) -> VerifyReport:
+    world = resolve_world(world_arg, saves_dir)
+    return verify_backup(world.path, backup_name, deep=deep, workers=workers, progress=progress)
+
+
+def prune_backups_for_world(
+    world_arg: str,
+    saves_dir: str | None = None,
+    *,
+    hourly: int = 0,
+    daily: int = 0,
+    weekly: int = 0,
+    max_bytes: int | None = None,
+    dry_run: bool = False,
+) -> PruneResult:
+    world = resolve_world(world_arg, saves_dir)
+    return prune_backups(
+        world.path, hourly=hourly, daily=daily, weekly=weekly, max_bytes=max_bytes, dry_run=dry_run
+    )
+
+
+def list_undo_entries(world_arg: str, saves_dir: str | None = None) -> list[JournalEntry]:
+    world = resolve_world(world_arg, saves_dir)
+    return list_journal(world.path)
+
+
+def undo_operation(
+    world_arg: str,
+    saves_dir: str | None = None,
+    *,
+    name: str | None = None,
+    confirm: ConfirmFn | None = None,
+) -> JournalEntry:
     world = resolve_world(world_arg, saves_dir)
     prompt_if_locked(world.path, confirm=confirm)
-    restore_backup(world.path, backup_name, progress=progress)
+    return undo(world.path, name)
 
 
-def _maybe_backup(world_path: Path, backup_before_write: bool, progress: ProgressFn | None = None) -> Path | None:
+def _maybe_backup(
+    world_path: Path, backup_before_write: bool, operation: str, scope: Iterable[Path]
+) -> Path | None:
+    # Every write declares the files it may touch; only those go into the undo journal.
     if backup_before_write:
-        return create_backup(world_path, progress=progress)
+        return record_undo(world_path, operation, scope)
     return None
 
 
@@ -103,9 +257,8 @@ def set_world_metadata(
 
     world = resolve_world(world_arg, saves_dir)
     prompt_if_locked(world.path, confirm=confirm)
-    _maybe_backup(world.path, backup_before_write)
-
     level_path = world.path / "level.dat"
+    _maybe_backup(world.path, backup_before_write, "edit-world", [level_path])
     level = read_nbt(level_path)
     data = level["Data"]
     assert_supported_data_version(int(data.get("DataVersion", 0)))
@@ -160,9 +313,8 @@ def set_world_advanced(
 
     world = resolve_world(world_arg, saves_dir)
     prompt_if_locked(world.path, confirm=confirm)
-    _maybe_backup(world.path, backup_before_write)
-
     level_path = world.path / "level.dat"
+    _maybe_backup(world.path, backup_before_write, "edit-world", [level_path])
     level = read_nbt(level_path)
     data = level["Data"]
     assert_supported_data_version(int(data.get("DataVersion", 0)))
@@ -235,9 +387,8 @@ def set_gamerule(
 ) -> None:
     world = resolve_world(world_arg, saves_dir)
     prompt_if_locked(world.path, confirm=confirm)
-    _maybe_backup(world.path, backup_before_write)
-
     level_path = world.path / "level.dat"
+    _maybe_backup(world.path, backup_before_write, "edit-world", [level_path])
     level = read_nbt(level_path)
     data = level["Data"]
     assert_supported_data_version(int(data.get("DataVersion", 0)))
@@ -279,7 +430,7 @@ def set_player(
         raise FileNotFoundError(f"Player file not found: {target}")
 
     prompt_if_locked(world.path, confirm=confirm)
-    _maybe_backup(world.path, backup_before_write)
+    _maybe_backup(world.path, backup_before_write, "edit-player", [target])
 
     player = read_nbt(target)
     changed = False
@@ -344,7 +495,7 @@ def delete_player(
         raise FileNotFoundError(f"Player file not found: {target}")
 
     prompt_if_locked(world.path, confirm=confirm)
-    _maybe_backup(world.path, backup_before_write)
+    _maybe_backup(world.path, backup_before_write, "delete-player", [target])
     target.unlink()
 
 
@@ -370,7 +521,7 @@ def delete_entity_region(
         raise FileNotFoundError(f"Entity region file not found: {region_name}")
 
     prompt_if_locked(world.path, confirm=confirm)
-    _maybe_backup(world.path, backup_before_write)
+    _maybe_backup(world.path, backup_before_write, "delete-entity-region", [target])
     target.unlink()
 
 
@@ -391,7 +542,7 @@ def delete_all_entity_regions(
         return 0
 
     prompt_if_locked(world.path, confirm=confirm)
-    _maybe_backup(world.path, backup_before_write)
+    _maybe_backup(world.path, backup_before_write, "delete-entity-regions", files)
     for file in files:
         file.unlink()
     return len(files)
@@ -407,11 +558,10 @@ def queue_command(
 ) -> Path:
     world = resolve_world(world_arg, saves_dir)
     prompt_if_locked(world.path, confirm=confirm)
-    _maybe_backup(world.path, backup_before_write)
-
     command_dir = world.path / "mcworldmgr_commands"
-    command_dir.mkdir(parents=True, exist_ok=True)
     command_file = command_dir / "queued_commands.mcfunction"
+    _maybe_backup(world.path, backup_before_write, "queue-command", [command_file])
+    command_dir.mkdir(parents=True, exist_ok=True)
     with command_file.open("a", encoding="utf-8") as handle:
         handle.write(command.strip())
         handle.write("\n")
@@ -467,6 +617,26 @@ def list_region_files(world_arg: str, saves_dir: str | None = None) -> list[str]
     return [file.name for file in sorted(region_dir.glob("r.*.*.mca"))]
 
 
+def get_region_details(world_arg: str, saves_dir: str | None = None) -> list[dict[str, Any]]:
+    world = resolve_world(world_arg, saves_dir)
+    details: list[dict[str, Any]] = []
+    for path in list_region_paths(world.path / "region"):
+        header = read_region_header(path)
+        details.append(
+            {
+                "name": path.name,
+                "region_x": header.region_x,
+                "region_z": header.region_z,
+                "size_bytes": header.file_size,
+                "chunk_count": header.chunk_count,
+                "used_sectors": header.used_sectors,
+                "file_sectors": header.file_sectors,
+                "last_modified": header.last_modified,
+            }
+        )
+    return details
+
+
 def delete_region(
     world_arg: str,
     region_name: str,
@@ -481,10 +651,88 @@ def delete_region(
         raise FileNotFoundError(f"Region not found: {region_name}")
 
     prompt_if_locked(world.path, confirm=confirm)
-    _maybe_backup(world.path, backup_before_write)
+    _maybe_backup(world.path, backup_before_write, "delete-region", [target])
     target.unlink()
 
 
+def _chunks_by_region(from_chunk: tuple[int, int], to_chunk: tuple[int, int]) -> dict[str, list[int]]:
+    min_x, max_x = sorted((from_chunk[0], to_chunk[0]))
+    min_z, max_z = sorted((from_chunk[1], to_chunk[1]))
+    grouped: dict[str, list[int]] = {}
+    for chunk_z in range(min_z, max_z + 1):
+        for chunk_x in range(min_x, max_x + 1):
+            grouped.setdefault(region_name_for_chunk(chunk_x, chunk_z), []).append(chunk_index(chunk_x, chunk_z))
+    return grouped
+
+
+def _copy_region_chunks(source: Path, target: Path, indices: list[int]) -> tuple[int, int, int]:
+    payloads: dict[int, tuple[int, bytes]] = {}
+    present: set[int] = set()
+    if source.exists():
+        header = read_region_header(source)
+        present = {index for index in indices if header.chunk(index) is not None}
+        for raw in iter_raw_chunks(header, indices):
+            try:
+                payloads[raw.location.index] = read_compressed_payload(header, raw)
+            except ValueError:
+                continue
+    # Chunks the source does not have are cleared too, so the target area ends up
+    # exactly like the source and the game regenerates whatever was missing there.
+    # Chunks the source has but cannot read are left alone in the target and reported.
+    missing = [index for index in indices if index not in present]
+    cleared = 0
+    if target.exists():
+        before = read_region_header(target).chunk_count
+        cleared = before - clear_chunks(target, missing).chunk_count
+    if payloads:
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.touch(exist_ok=True)
+        write_chunks(target, payloads)
+    return len(payloads), cleared, len(present) - len(payloads)
+
+
+def copy_chunks(
+    source_world_arg: str,
+    target_world_arg: str,
+    from_chunk: tuple[int, int],
+    to_chunk: tuple[int, int],
+    saves_dir: str | None = None,
+    *,
+    dimension: str = OVERWORLD,
+    confirm: ConfirmFn | None = None,
+    backup_before_write: bool = False,
+) -> dict[str, int]:
+    source = resolve_world(source_world_arg, saves_dir)
+    target = resolve_world(target_world_arg, saves_dir)
+    if source.path == target.path:
+        raise ValueError("Source and target world are the same")
+    source_dims = dimension_dirs(source.path)
+    if dimension not in source_dims:
+        raise FileNotFoundError(f"Dimension {dimension} not found in {source.name}")
+    target_root = dimension_dirs(target.path).get(dimension)
+    if target_root is None:
+        raise FileNotFoundError(f"Dimension {dimension} not found in {target.name}")
+
+    regions = sorted(_chunks_by_region(from_chunk, to_chunk).items())
+    prompt_if_locked(target.path, confirm=confirm)
+    scope = [target_root / folder / region_name for region_name, _ in regions for folder in CHUNK_DATA_DIRS]
+    _maybe_backup(target.path, backup_before_write, "copy-chunks", scope)
+
+    # Payloads move as stored compressed bytes; nothing is decompressed or re-parsed.
+    result = {"chunks": 0, "cleared": 0, "unreadable": 0, "files": 0}
+    for region_name, indices in regions:
+        for folder in CHUNK_DATA_DIRS:
+            copied, cleared, unreadable = _copy_region_chunks(
+                source_dims[dimension] / folder / region_name, target_root / folder / region_name, indices
+            )
+            result["chunks"] += copied
+            result["cleared"] += cleared
+            result["unreadable"] += unreadable
+            if copied or cleared:
+                result["files"] += 1
+    return result
+
+
 def reset_chunk(
     world_arg: str,
     chunk_x: int,
@@ -495,12 +743,285 @@ def reset_chunk(
     backup_before_write: bool = False,
 ) -> str:
     world = resolve_world(world_arg, saves_dir)
-    region_name = _region_name_for_chunk(chunk_x, chunk_z)
-    target = world.path / "region" / region_name
-    if not target.exists():
-        raise FileNotFoundError(f"Chunk parent region does not exist: {region_name}. Nothing to reset.")
+    region_name = region_name_for_chunk(chunk_x, chunk_z)
+    index = chunk_index(chunk_x, chunk_z)
+    targets = [
+        path
+        for path in (world.path / folder / region_name for folder in CHUNK_DATA_DIRS)
+        if path.exists() and read_region_header(path).chunk(index) is not None
+    ]
+    if not targets:
+        raise FileNotFoundError(f"Chunk {chunk_x},{chunk_z} is not stored in {region_name}. Nothing to reset.")
 
     prompt_if_locked(world.path, confirm=confirm)
-    _maybe_backup(world.path, backup_before_write)
-    target.unlink()
+    _maybe_backup(world.path, backup_before_write, "reset-chunk", targets)
+    for path in targets:
+        clear_chunks(path, [index])
     return region_name
+
+
+def _find_low_inhabited_chunks(max_inhabited_ticks: int, path: Path) -> tuple[Path, list[int]]:
+    header = read_region_header(path)
+    indices: list[int] = []
+    for raw in iter_raw_chunks(header):
+        try:
+            chunk = load_chunk(header, raw)
+        except ValueError:
+            continue
+        if int(chunk.get("InhabitedTime", 0)) <= max_inhabited_ticks:
+            indices.append(raw.location.index)
+    return path, indices
+
+
+def _clear_chunks_everywhere(
+    world_path: Path, region_name: str, indices: list[int], dry_run: bool
+) -> tuple[int, int, int]:
+    # (files deleted, bytes of those files, sectors freed inside files that stay) over the
+    # region/, entities/ and poi/ files of one region.
+    wanted = set(indices)
+    deleted = released = unused = 0
+    for folder in CHUNK_DATA_DIRS:
+        target = world_path / folder / region_name
+        if not target.exists():
+            continue
+        header = read_region_header(target)
+        cleared = [location for location in header.chunks() if location.index in wanted]
+        if not cleared:
+            continue
+        if len(cleared) == header.chunk_count:
+            if not dry_run:
+                delete_region_file(target)
+            deleted += 1
+            released += header.file_size
+        else:
+            if not dry_run:
+                clear_chunks(target, [location.index for location in cleared])
+            unused += sum(location.byte_length for location in cleared)
+    return deleted, released, unused
+
+
+def prune_chunks(
+    world_arg: str,
+    max_inhabited_ticks: int,
+    saves_dir: str | None = None,
+    *,
+    dry_run: bool = False,
+    workers: int | None = None,
+    confirm: ConfirmFn | None = None,
+    backup_before_write: bool = False,
+    progress: ProgressFn | None = None,
+) -> dict[str, int]:
+    if max_inhabited_ticks < 0:
+        raise ValueError("max_inhabited_ticks must be zero or positive")
+
+    world = resolve_world(world_arg, saves_dir)
+    if not dry_run:
+        prompt_if_locked(world.path, confirm=confirm)
+
+    paths = list_region_paths(world.path / "region")
+    worker = partial(_find_low_inhabited_chunks, max_inhabited_ticks)
+    found = [item for item in map_regions(worker, paths, workers=workers, progress=progress) if item[1]]
+    # Clearing chunks only empties header entries, so bytes inside files that stay on disk
+    # are reported apart from the files actually deleted; compact_regions releases them.
+    result = {
+        "chunks": sum(len(indices) for _, indices in found),
+        "bytes": 0,
+        "bytes_unused": 0,
+        "regions": len(found),
+        "files_deleted": 0,
+    }
+    if not dry_run and found:
+        scope = [world.path / folder / path.name for path, _ in found for folder in CHUNK_DATA_DIRS]
+        _maybe_backup(world.path, backup_before_write, "prune-chunks", scope)
+    for path, indices in found:
+        deleted, released, unused = _clear_chunks_everywhere(world.path, path.name, indices, dry_run)
+        result["files_deleted"] += deleted
+        result["bytes"] += released
+        result["bytes_unused"] += unused
+    return result
+
+
+def _world_region_paths(world_path: Path) -> list[Path]:
+    return [
+        path
+        for folder in dimension_dirs(world_path).values()
+        for data_dir in CHUNK_DATA_DIRS
+        for path in list_region_paths(folder / data_dir)
+    ]
+
+
+def _compact_region(dry_run: bool, path: Path) -> tuple[int, int]:
+    header = read_region_header(path)
+    if header.file_size < HEADER_SIZE:
+        return header.file_size, header.file_size
+    compact_size = HEADER_SIZE + header.used_sectors * SECTOR_SIZE
+    if header.file_size == compact_size:
+        return header.file_size, header.file_size
+    if dry_run:
+        return header.file_size, compact_size
+    return header.file_size, rewrite_region(path).file_size
+
+
+def _compact_pending(path: Path) -> bool:
+    before, after = _compact_region(True, path)
+    return before != after
+
+
+def compact_regions(
+    world_arg: str,
+    saves_dir: str | None = None,
+    *,
+    dry_run: bool = False,
+    workers: int | None = None,
+    confirm: ConfirmFn | None = None,
+    backup_before_write: bool = False,
+    progress: ProgressFn | None = None,
+) -> dict[str, int]:
+    world = resolve_world(world_arg, saves_dir)
+    paths = _world_region_paths(world.path)
+    if not dry_run:
+        prompt_if_locked(world.path, confirm=confirm)
+        # Only files with holes are journaled; the checks read headers only.
+        _maybe_backup(world.path, backup_before_write, "compact", (path for path in paths if _compact_pending(path)))
+
+    worker = partial(_compact_region, dry_run)
+    result = {"files": len(paths), "compacted": 0, "bytes_before": 0, "bytes_after": 0}
+    for before, after in map_regions(worker, paths, workers=workers, progress=progress):
+        result["bytes_before"] += before
+        result["bytes_after"] += after
+        if after != before:
+            result["compacted"] += 1
+    return result
+
+
+def _has_chunks(path: Path) -> bool:
+    return read_region_header(path).chunk_count > 0
+
+
+def _recompress_region(compression: int, level: int | None, path: Path) -> tuple[int, int, int]:
+    chunks = 0
+
+    def transform(header: RegionHeader, raw: RawChunk) -> tuple[int, bytes] | None:
+        nonlocal chunks
+        try:
+            data = read_chunk_payload(header, raw)
+        except ValueError:
+            return None
+        chunks += 1
+        return compression, compress_payload(compression, data, level)
+
+    before = path.stat().st_size
+    if not _has_chunks(path):
+        return before, before, 0
+    after = rewrite_region(path, transform).file_size
+    return before, after, chunks
+
+
+def recompress_regions(
+    world_arg: str,
+    codec: str,
+    saves_dir: str | None = None,
+    *,
+    level: int | None = None,
+    workers: int | None = None,
+    confirm: ConfirmFn | None = None,
+    backup_before_write: bool = False,
+    progress: ProgressFn | None = None,
+) -> dict[str, int]:
+    if codec not in COMPRESSION_NAMES:
+        raise ValueError(f"codec must be one of: {', '.join(COMPRESSION_NAMES)}")
+    compression = COMPRESSION_NAMES[codec]
+    # Checked here: a bad level would otherwise fail inside a worker after other files were rewritten.
+    check_compression_level(compression, level)
+
+    world = resolve_world(world_arg, saves_dir)
+    if compression == COMPRESSION_LZ4:
+        data = read_nbt(world.path / "level.dat")["Data"]
+        assert_lz4_supported(int(data.get("DataVersion", 0)))
+    prompt_if_locked(world.path, confirm=confirm)
+    paths = _world_region_paths(world.path)
+    # Files without chunks are left alone, so they are not journaled either.
+    _maybe_backup(world.path, backup_before_write, "recompress", (path for path in paths if _has_chunks(path)))
+
+    worker = partial(_recompress_region, compression, level)
+    result = {"files": len(paths), "chunks": 0, "bytes_before": 0, "bytes_after": 0}
+    for before, after, chunks in map_regions(worker, paths, workers=workers, progress=progress):
+        result["bytes_before"] += before
+        result["bytes_after"] += after
+        result["chunks"] += chunks
+    return result
+
+
+def _trim_region(area: Area, dry_run: bool, path: Path) -> tuple[int, int, bool]:
+    header = read_region_header(path)
+    if not region_overlaps(area, header.region_x, header.region_z):
+        if not dry_run:
+            delete_region_file(path)
+        return header.chunk_count, header.file_size, True
+
+    outside = [
+        location
+        for location in header.chunks()
+        if not chunk_overlaps(area, *header.chunk_coords(location.index))
+    ]
+    if not outside:
+        return 0, 0, False
+    if len(outside) == header.chunk_count:
+        if not dry_run:
+            delete_region_file(path)
+        return len(outside), header.file_size, True
+    if not dry_run:
+        clear_chunks(path, [location.index for location in outside])
+    return len(outside), sum(location.byte_length for location in outside), False
+
+
+def _trim_pending(area: Area, path: Path) -> bool:
+    chunks, _, deleted = _trim_region(area, True, path)
+    return bool(chunks) or deleted
+
+
+def trim_world(
+    world_arg: str,
+    saves_dir: str | None = None,
+    *,
+    center: tuple[float, float] | None = None,
+    radius: float | None = None,
+    polygon_file: str | None = None,
+    dry_run: bool = False,
+    workers: int | None = None,
+    confirm: ConfirmFn | None = None,
+    backup_before_write: bool = False,
+    progress: ProgressFn | None = None,
+) -> dict[str, int]:
+    if polygon_file is not None:
+        if center is not None or radius is not None:
+            raise ValueError("Use either a center and radius or a polygon file, not both")
+        area: Area = load_polygon(Path(polygon_file).expanduser())
+    elif center is not None and radius is not None:
+        if radius < 0:
+            raise ValueError("radius must be zero or positive")
+        area = CircleArea(center[0], center[1], radius)
+    else:
+        raise ValueError("Provide a center and radius, or a polygon file")
+
+    world = resolve_world(world_arg, saves_dir)
+    # The same block coordinates apply in every dimension; region/, entities/ and
+    # poi/ files are trimmed independently so each keeps exactly its in-area chunks.
+    paths = _world_region_paths(world.path)
+    if not dry_run:
+        prompt_if_locked(world.path, confirm=confirm)
+        # Only files that lose chunks or are deleted are journaled; the checks read headers only.
+        _maybe_backup(world.path, backup_before_write, "trim", (path for path in paths if _trim_pending(area, path)))
+    worker = partial(_trim_region, area, dry_run)
+    # Only deleted files release space; chunks cleared from files that stay on disk leave
+    # unused sectors behind until compact_regions rewrites them.
+    result = {"chunks": 0, "bytes": 0, "bytes_unused": 0, "files_trimmed": 0, "files_deleted": 0}
+    for chunks, size, deleted in map_regions(worker, paths, workers=workers, progress=progress):
+        result["chunks"] += chunks
+        if deleted:
+            result["bytes"] += size
+            result["files_deleted"] += 1
+        elif chunks:
+            result["bytes_unused"] += size
+            result["files_trimmed"] += 1
+    return result
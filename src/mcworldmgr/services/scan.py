@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Iterator, Sequence, TypeVar
+
+from mcworldmgr.safety.progress import ProgressFn
+from mcworldmgr.world.discovery import resolve_world
+from mcworldmgr.world.region import iter_raw_chunks, list_region_paths, load_chunk, read_region_header
+
+T = TypeVar("T")
+
+CORRUPT_STATUS = "corrupt"
+
+
+@dataclass(frozen=True)
+class ChunkSummary:
+    region: str
+    chunk_x: int
+    chunk_z: int
+    status: str
+    data_version: int
+    inhabited_time: int
+    last_update: int
+    byte_size: int
+    timestamp: int
+
+
+def default_workers() -> int:
+    return os.cpu_count() or 1
+
+
+def map_regions(
+    worker: Callable[[Path], T],
+    paths: Sequence[Path],
+    *,
+    workers: int | None = None,
+    progress: ProgressFn | None = None,
+) -> Iterator[T]:
+    # Results are yielded as soon as each region finishes, not in input order.
+    total = len(paths)
+    workers = min(workers or default_workers(), total)
+    if workers <= 1:
+        for done, path in enumerate(paths, start=1):
+            result = worker(path)
+            if progress:
+                progress(done, total, path.name)
+            yield result
+        return
+
+    # Largest files first keeps every core busy until the end instead of leaving
+    # one worker chewing on a big region while the others sit idle.
+    ordered = sorted(paths, key=lambda path: path.stat().st_size, reverse=True)
+    pool = ProcessPoolExecutor(max_workers=workers)
+    try:
+        futures = {pool.submit(worker, path): path for path in ordered}
+        for done, future in enumerate(as_completed(futures), start=1):
+            result = future.result()
+            if progress:
+                progress(done, total, futures[future].name)
+            yield result
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def summarize_region(path: Path) -> list[ChunkSummary]:
+    header = read_region_header(path)
+    summaries: list[ChunkSummary] = []
+    for raw in iter_raw_chunks(header):
+        chunk_x, chunk_z = header.chunk_coords(raw.location.index)
+        try:
+            chunk = load_chunk(header, raw)
+        except ValueError:
+            summaries.append(
+                ChunkSummary(path.name, chunk_x, chunk_z, CORRUPT_STATUS, 0, 0, 0, raw.size, raw.location.timestamp)
+            )
+            continue
+        summaries.append(
+            ChunkSummary(
+                region=path.name,
+                chunk_x=chunk_x,
+                chunk_z=chunk_z,
+                status=str(chunk.get("Status", "")),
+                data_version=int(chunk.get("DataVersion", 0)),
+                inhabited_time=int(chunk.get("InhabitedTime", 0)),
+                last_update=int(chunk.get("LastUpdate", 0)),
+                byte_size=raw.size,
+                timestamp=raw.location.timestamp,
+            )
+        )
+    return summaries
+
+
+def scan_world(
+    world_arg: str,
+    saves_dir: str | None = None,
+    *,
+    workers: int | None = None,
+    progress: ProgressFn | None = None,
+) -> Iterator[ChunkSummary]:
+    world = resolve_world(world_arg, saves_dir)
+    paths = list_region_paths(world.path / "region")
+    for summaries in map_regions(summarize_region, paths, workers=workers, progress=progress):
+        yield from summaries
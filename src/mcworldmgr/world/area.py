@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from pathlib import Path
+
+Point = tuple[float, float]
+
+
+@dataclass(frozen=True)
+class CircleArea:
+    center_x: float
+    center_z: float
+    radius: float
+
+    def overlaps_box(self, min_x: float, min_z: float, max_x: float, max_z: float) -> bool:
+        nearest_x = min(max(self.center_x, min_x), max_x)
+        nearest_z = min(max(self.center_z, min_z), max_z)
+        return math.hypot(nearest_x - self.center_x, nearest_z - self.center_z) <= self.radius
+
+
+def _point_in_polygon(x: float, z: float, points: tuple[Point, ...]) -> bool:
+    inside = False
+    previous_x, previous_z = points[-1]
+    for current_x, current_z in points:
+        if (current_z > z) != (previous_z > z):
+            crossing = current_x + (z - current_z) * (previous_x - current_x) / (previous_z - current_z)
+            if x < crossing:
+                inside = not inside
+        previous_x, previous_z = current_x, current_z
+    return inside
+
+
+def _segments_cross(a: Point, b: Point, c: Point, d: Point) -> bool:
+    def orientation(p: Point, q: Point, r: Point) -> float:
+        return (q[0] - p[0]) * (r[1] - p[1]) - (q[1] - p[1]) * (r[0] - p[0])
+
+    return orientation(a, b, c) * orientation(a, b, d) <= 0 and orientation(c, d, a) * orientation(c, d, b) <= 0
+
+
+@dataclass(frozen=True)
+class PolygonArea:
+    points: tuple[Point, ...]
+
+    def overlaps_box(self, min_x: float, min_z: float, max_x: float, max_z: float) -> bool:
+        xs = [x for x, _ in self.points]
+        zs = [z for _, z in self.points]
+        if max(xs) < min_x or min(xs) > max_x or max(zs) < min_z or min(zs) > max_z:
+            return False
+        corners = ((min_x, min_z), (max_x, min_z), (max_x, max_z), (min_x, max_z))
+        if any(_point_in_polygon(x, z, self.points) for x, z in corners):
+            return True
+        if any(min_x <= x <= max_x and min_z <= z <= max_z for x, z in self.points):
+            return True
+        edges = list(zip(self.points, self.points[1:] + self.points[:1]))
+        sides = list(zip(corners, corners[1:] + corners[:1]))
+        return any(_segments_cross(a, b, c, d) for a, b in edges for c, d in sides)
+
+
+Area = CircleArea | PolygonArea
+
+
+def load_polygon(path: Path) -> PolygonArea:
+    # One "x,z" or "x z" block coordinate per line; blank lines and # comments are ignored.
+    points: list[Point] = []
+    for number, line in enumerate(path.read_text(encoding="utf-8").splitlines(), start=1):
+        text = line.split("#", 1)[0].strip()
+        if not text:
+            continue
+        parts = text.replace(",", " ").split()
+        if len(parts) != 2:
+            raise ValueError(f"{path.name}:{number}: expected 'x,z', got {line.strip()!r}")
+        points.append((float(parts[0]), float(parts[1])))
+    if len(points) < 3:
+        raise ValueError(f"Polygon in {path.name} needs at least three points")
+    return PolygonArea(tuple(points))
+
+
+def chunk_overlaps(area: Area, chunk_x: int, chunk_z: int) -> bool:
+    return area.overlaps_box(chunk_x * 16, chunk_z * 16, chunk_x * 16 + 16, chunk_z * 16 + 16)
+
+
+def region_overlaps(area: Area, region_x: int, region_z: int) -> bool:
+    return area.overlaps_box(region_x * 512, region_z * 512, region_x * 512 + 512, region_z * 512 + 512)
@@ -36,3 +36,22 @@ def resolve_world(world_arg: str, saves_dir_override: str | None = None) -> Worl
         return WorldRef(name=world_path.name, path=world_path)
 
     raise FileNotFoundError(f"World not found: {world_arg}")
+
+
+OVERWORLD = "minecraft:overworld"
+_LEGACY_DIMENSIONS = {"DIM-1": "minecraft:the_nether", "DIM1": "minecraft:the_end"}
+
+
+def dimension_dirs(world_path: Path) -> dict[str, Path]:
+    # Vanilla keeps the Nether and End in DIM-1/DIM1; datapack dimensions live
+    # under dimensions/<namespace>/<name>. Each folder has its own region/, entities/, poi/.
+    found = {OVERWORLD: world_path}
+    for folder, dimension in _LEGACY_DIMENSIONS.items():
+        if (world_path / folder).is_dir():
+            found[dimension] = world_path / folder
+    custom_root = world_path / "dimensions"
+    if custom_root.is_dir():
+        for path in sorted(custom_root.glob("*/*")):
+            if path.is_dir() and (path / "region").is_dir():
+                found[f"{path.parent.name}:{path.name}"] = path
+    return found
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import io
 import os
 import tempfile
 from pathlib import Path
@@ -11,6 +12,16 @@ def read_nbt(path: Path) -> nbtlib.File:
     return nbtlib.load(path)
 
 
+def parse_nbt_bytes(data: bytes) -> nbtlib.File:
+    return nbtlib.File.parse(io.BytesIO(data))
+
+
+def serialize_nbt_bytes(nbt_file: nbtlib.File) -> bytes:
+    buffer = io.BytesIO()
+    nbt_file.write(buffer)
+    return buffer.getvalue()
+
+
 def write_nbt_atomic(path: Path, nbt_file: nbtlib.File) -> None:
     path = path.resolve()
     parent = path.parent
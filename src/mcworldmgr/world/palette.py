@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import Any
+
+import numpy as np
+
+SECTION_VOLUME = 4096
+BIOME_VOLUME = 64
+MIN_BLOCK_BITS = 4
+
+
+def bits_per_entry(palette_size: int, minimum: int = MIN_BLOCK_BITS) -> int:
+    return max(minimum, (palette_size - 1).bit_length())
+
+
+@lru_cache(maxsize=None)
+def _shift_table(bits: int) -> np.ndarray:
+    return (np.arange(64 // bits, dtype=np.uint64) * np.uint64(bits))[:, np.newaxis]
+
+
+def unpack_indices(data: Any, bits: int, count: int = SECTION_VOLUME) -> np.ndarray:
+    # 1.16+ packing: each long holds floor(64 / bits) entries and the leftover high
+    # bits are padding, so entries never straddle two longs and a 2-D shift works.
+    per_long = 64 // bits
+    needed = -(-count // per_long)
+    longs = np.asarray(data).astype("<i8", copy=False)
+    if longs.size < needed:
+        raise ValueError(f"Packed array has {longs.size} longs, expected {needed} for {bits}-bit entries")
+    longs = longs[:needed]
+
+    if bits == 4:
+        raw = longs.view(np.uint8)
+        values = np.empty(raw.size * 2, dtype=np.uint16)
+        values[0::2] = raw & 0x0F
+        values[1::2] = raw >> 4
+        return values[:count]
+    if bits == 8:
+        return longs.view(np.uint8)[:count].astype(np.uint16)
+    if bits == 16:
+        return longs.view("<u2")[:count].astype(np.uint16)
+
+    # Shifting the whole array once per slot keeps the inner numpy loop long;
+    # the transpose then restores the entry order.
+    values = (longs.view(np.uint64)[np.newaxis, :] >> _shift_table(bits)).astype(np.uint16)
+    values &= np.uint16((1 << bits) - 1)
+    return values.T.reshape(-1)[:count]
+
+
+def pack_indices(indices: np.ndarray, bits: int) -> np.ndarray:
+    per_long = 64 // bits
+    padded = np.zeros(-(-indices.size // per_long) * per_long, dtype=np.uint64)
+    padded[: indices.size] = indices
+    longs = np.bitwise_or.reduce(padded.reshape(-1, per_long) << _shift_table(bits).ravel(), axis=1)
+    return longs.view(np.int64)
+
+
+def palette_names(container: Any) -> list[str]:
+    if container is None:
+        return []
+    palette = container.get("palette", [])
+    return [str(entry.get("Name", "")) if hasattr(entry, "get") else str(entry) for entry in palette]
+
+
+def _decode_container(container: Any, count: int, minimum_bits: int) -> tuple[list[str], np.ndarray]:
+    names = palette_names(container)
+    data = None if container is None else container.get("data")
+    if data is None or len(names) <= 1:
+        return names, np.zeros(count, dtype=np.uint16)
+    return names, unpack_indices(data, bits_per_entry(len(names), minimum_bits), count)
+
+
+def decode_block_states(section: Any) -> tuple[list[str], np.ndarray]:
+    return _decode_container(section.get("block_states"), SECTION_VOLUME, MIN_BLOCK_BITS)
+
+
+def decode_biomes(section: Any) -> tuple[list[str], np.ndarray]:
+    return _decode_container(section.get("biomes"), BIOME_VOLUME, 1)
+
+
+def block_position(index: int) -> tuple[int, int, int]:
+    return index & 15, index >> 8, (index >> 4) & 15
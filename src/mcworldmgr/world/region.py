@@ -0,0 +1,536 @@
+from __future__ import annotations
+
+import gzip
+import mmap
+import os
+import re
+import struct
+import tempfile
+import time
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, Mapping
+
+import nbtlib
+
+from mcworldmgr.world.nbt_io import parse_nbt_bytes, serialize_nbt_bytes
+
+SECTOR_SIZE = 4096
+HEADER_SIZE = 2 * SECTOR_SIZE
+CHUNKS_PER_REGION = 1024
+
+COMPRESSION_GZIP = 1
+COMPRESSION_ZLIB = 2
+COMPRESSION_NONE = 3
+COMPRESSION_LZ4 = 4
+EXTERNAL_FLAG = 0x80
+MAX_INLINE_SECTORS = 255
+DEFAULT_COMPRESSION_LEVEL = 6
+COMPRESSION_NAMES = {
+    "gzip": COMPRESSION_GZIP,
+    "zlib": COMPRESSION_ZLIB,
+    "none": COMPRESSION_NONE,
+    "lz4": COMPRESSION_LZ4,
+}
+# Inclusive level range each codec accepts; uncompressed chunks take no level.
+COMPRESSION_LEVELS = {
+    COMPRESSION_ZLIB: (-1, 9),
+    COMPRESSION_GZIP: (0, 9),
+    COMPRESSION_LZ4: (1, 12),
+}
+
+REGION_NAME_RE = re.compile(r"^r\.(-?\d+)\.(-?\d+)\.mca$")
+
+_TABLE = struct.Struct(">1024I")
+_EMPTY_TABLE = (0,) * CHUNKS_PER_REGION
+_PAYLOAD_HEADER = struct.Struct(">IB")
+_LZ4_MAGIC = b"LZ4Block"
+_LZ4_BLOCK_HEADER = struct.Struct("<BIII")
+# Same framing as the game's LZ4BlockOutputStream: 64 KiB blocks, xxhash32 checksums.
+_LZ4_BLOCK_SIZE_BITS = 16
+_LZ4_METHOD_RAW = 0x10
+_LZ4_METHOD_LZ4 = 0x20
+_LZ4_CHECKSUM_SEED = 0x9747B28C
+
+
+@dataclass(frozen=True)
+class ChunkLocation:
+    index: int
+    sector_offset: int
+    sector_count: int
+    timestamp: int
+
+    @property
+    def local_x(self) -> int:
+        return self.index & 31
+
+    @property
+    def local_z(self) -> int:
+        return self.index >> 5
+
+    @property
+    def byte_offset(self) -> int:
+        return self.sector_offset * SECTOR_SIZE
+
+    @property
+    def byte_length(self) -> int:
+        return self.sector_count * SECTOR_SIZE
+
+
+@dataclass(frozen=True)
+class RawChunk:
+    location: ChunkLocation
+    compression: int
+    data: bytes
+
+    @property
+    def external(self) -> bool:
+        return bool(self.compression & EXTERNAL_FLAG)
+
+    @property
+    def corrupt(self) -> bool:
+        return self.compression == 0
+
+    @property
+    def size(self) -> int:
+        return len(self.data) + _PAYLOAD_HEADER.size
+
+
+@dataclass(frozen=True)
+class RegionHeader:
+    path: Path
+    region_x: int
+    region_z: int
+    file_size: int
+    locations: tuple[int, ...]
+    timestamps: tuple[int, ...]
+
+    def chunk(self, index: int) -> ChunkLocation | None:
+        location = self.locations[index]
+        if location == 0:
+            return None
+        return ChunkLocation(index, location >> 8, location & 0xFF, self.timestamps[index])
+
+    def chunks(self) -> list[ChunkLocation]:
+        return [
+            ChunkLocation(index, location >> 8, location & 0xFF, self.timestamps[index])
+            for index, location in enumerate(self.locations)
+            if location != 0
+        ]
+
+    def chunk_coords(self, index: int) -> tuple[int, int]:
+        return self.region_x * 32 + (index & 31), self.region_z * 32 + (index >> 5)
+
+    @property
+    def chunk_count(self) -> int:
+        return CHUNKS_PER_REGION - self.locations.count(0)
+
+    @property
+    def used_sectors(self) -> int:
+        return sum(location & 0xFF for location in self.locations if location != 0)
+
+    @property
+    def file_sectors(self) -> int:
+        return -(-self.file_size // SECTOR_SIZE)
+
+    @property
+    def last_modified(self) -> int:
+        return max(self.timestamps)
+
+
+def parse_region_name(name: str) -> tuple[int, int]:
+    match = REGION_NAME_RE.match(name)
+    if match is None:
+        raise ValueError(f"Not a region file name: {name}")
+    return int(match.group(1)), int(match.group(2))
+
+
+def region_name_for_chunk(chunk_x: int, chunk_z: int) -> str:
+    return f"r.{chunk_x >> 5}.{chunk_z >> 5}.mca"
+
+
+def chunk_index(chunk_x: int, chunk_z: int) -> int:
+    return (chunk_x & 31) + (chunk_z & 31) * 32
+
+
+def read_region_header(path: Path) -> RegionHeader:
+    region_x, region_z = parse_region_name(path.name)
+    with path.open("rb") as handle:
+        file_size = os.fstat(handle.fileno()).st_size
+        if file_size < HEADER_SIZE:
+            return RegionHeader(path, region_x, region_z, file_size, _EMPTY_TABLE, _EMPTY_TABLE)
+        with mmap.mmap(handle.fileno(), HEADER_SIZE, access=mmap.ACCESS_READ) as view:
+            locations = _TABLE.unpack_from(view, 0)
+            timestamps = _TABLE.unpack_from(view, SECTOR_SIZE)
+    return RegionHeader(path, region_x, region_z, file_size, locations, timestamps)
+
+
+def external_chunk_path(region_path: Path, chunk_x: int, chunk_z: int) -> Path:
+    return region_path.with_name(f"c.{chunk_x}.{chunk_z}.mcc")
+
+
+def write_region_header(path: Path, locations: Iterable[int], timestamps: Iterable[int]) -> None:
+    # Both tables go out in one 8 KiB write. Every entry is an aligned 4-byte word,
+    # so a torn write can only leave individual entries old or new, never garbled.
+    data = _TABLE.pack(*locations) + _TABLE.pack(*timestamps)
+    with path.open("r+b") as handle:
+        handle.write(data)
+        handle.flush()
+        os.fsync(handle.fileno())
+
+
+def clear_chunks(path: Path, indices: Iterable[int]) -> RegionHeader:
+    header = read_region_header(path)
+    targets = sorted({index for index in indices if header.locations[index] != 0})
+    if not targets:
+        return header
+
+    locations = list(header.locations)
+    timestamps = list(header.timestamps)
+    for index in targets:
+        locations[index] = 0
+        timestamps[index] = 0
+    write_region_header(path, locations, timestamps)
+
+    for index in targets:
+        external_chunk_path(path, *header.chunk_coords(index)).unlink(missing_ok=True)
+    return RegionHeader(
+        path, header.region_x, header.region_z, header.file_size, tuple(locations), tuple(timestamps)
+    )
+
+
+def delete_region_file(path: Path) -> None:
+    header = read_region_header(path)
+    path.unlink()
+    for location in header.chunks():
+        external_chunk_path(path, *header.chunk_coords(location.index)).unlink(missing_ok=True)
+
+
+def _read_raw_chunk(view: mmap.mmap, file_size: int, location: ChunkLocation) -> RawChunk:
+    # Entries pointing into the header or past the end of the file come back with
+    # compression 0 so callers can report them as corrupt instead of aborting the region.
+    start = location.byte_offset
+    if location.sector_offset < 2 or start + _PAYLOAD_HEADER.size > file_size:
+        return RawChunk(location, 0, b"")
+    length, compression = _PAYLOAD_HEADER.unpack_from(view, start)
+    end = start + 4 + length
+    if length == 0 or length + 4 > location.byte_length or end > file_size:
+        return RawChunk(location, 0, b"")
+    return RawChunk(location, compression, view[start + _PAYLOAD_HEADER.size : end])
+
+
+def iter_raw_chunks(header: RegionHeader, indices: Iterable[int] | None = None) -> Iterator[RawChunk]:
+    if header.file_size < HEADER_SIZE:
+        return
+    locations = header.chunks() if indices is None else [c for c in map(header.chunk, indices) if c]
+    if not locations:
+        return
+    with header.path.open("rb") as handle:
+        with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as view:
+            file_size = len(view)
+            for location in locations:
+                yield _read_raw_chunk(view, file_size, location)
+
+
+def _lz4_block_decompress(data: bytes) -> bytes:
+    try:
+        import lz4.block
+    except ImportError as exc:
+        raise RuntimeError("LZ4 chunks need the optional lz4 package: pip install mcworldmgr[lz4]") from exc
+
+    parts: list[bytes] = []
+    position = 0
+    while position < len(data):
+        if data[position : position + len(_LZ4_MAGIC)] != _LZ4_MAGIC:
+            raise ValueError("Invalid LZ4 block stream")
+        position += len(_LZ4_MAGIC)
+        token, compressed_length, original_length, _ = _LZ4_BLOCK_HEADER.unpack_from(data, position)
+        position += _LZ4_BLOCK_HEADER.size
+        if original_length == 0:
+            break
+        block = data[position : position + compressed_length]
+        position += compressed_length
+        if token & 0xF0 == 0x10:
+            parts.append(block)
+        else:
+            parts.append(lz4.block.decompress(block, uncompressed_size=original_length))
+    return b"".join(parts)
+
+
+def _lz4_block_compress(data: bytes, level: int | None) -> bytes:
+    try:
+        import lz4.block
+        import xxhash
+    except ImportError as exc:
+        raise RuntimeError("Writing LZ4 chunks needs the optional extra: pip install mcworldmgr[lz4]") from exc
+
+    token_level = _LZ4_BLOCK_SIZE_BITS - 10
+    block_size = 1 << _LZ4_BLOCK_SIZE_BITS
+    parts: list[bytes] = []
+    for start in range(0, len(data), block_size):
+        block = data[start : start + block_size]
+        if level:
+            packed = lz4.block.compress(block, mode="high_compression", compression=level, store_size=False)
+        else:
+            packed = lz4.block.compress(block, store_size=False)
+        method = _LZ4_METHOD_LZ4
+        if len(packed) >= len(block):
+            packed, method = block, _LZ4_METHOD_RAW
+        checksum = xxhash.xxh32_intdigest(block, seed=_LZ4_CHECKSUM_SEED) & 0x0FFFFFFF
+        parts.append(_LZ4_MAGIC + _LZ4_BLOCK_HEADER.pack(method | token_level, len(packed), len(block), checksum))
+        parts.append(packed)
+    parts.append(_LZ4_MAGIC + _LZ4_BLOCK_HEADER.pack(_LZ4_METHOD_RAW | token_level, 0, 0, 0))
+    return b"".join(parts)
+
+
+def decompress_payload(compression: int, data: bytes) -> bytes:
+    compression &= ~EXTERNAL_FLAG
+    if compression == COMPRESSION_ZLIB:
+        return zlib.decompress(data)
+    if compression == COMPRESSION_GZIP:
+        return gzip.decompress(data)
+    if compression == COMPRESSION_NONE:
+        return data
+    if compression == COMPRESSION_LZ4:
+        return _lz4_block_decompress(data)
+    raise ValueError(f"Unsupported chunk compression type: {compression}")
+
+
+def writable_compression(compression: int) -> int:
+    compression &= ~EXTERNAL_FLAG
+    if compression in COMPRESSION_NAMES.values():
+        return compression
+    return COMPRESSION_ZLIB
+
+
+def check_compression_level(compression: int, level: int | None) -> None:
+    if level is None:
+        return
+    limits = COMPRESSION_LEVELS.get(compression)
+    if limits is None:
+        raise ValueError("This codec does not take a compression level")
+    if not limits[0] <= level <= limits[1]:
+        raise ValueError(f"Compression level must be between {limits[0]} and {limits[1]} for this codec")
+
+
+def compress_payload(compression: int, data: bytes, level: int | None = None) -> bytes:
+    # level is the zlib/gzip level (default 6, like the game), or the LZ4 HC level; LZ4
+    # without a level uses the fast compressor the game itself writes with.
+    if compression == COMPRESSION_ZLIB:
+        return zlib.compress(data, DEFAULT_COMPRESSION_LEVEL if level is None else level)
+    if compression == COMPRESSION_GZIP:
+        return gzip.compress(data, compresslevel=DEFAULT_COMPRESSION_LEVEL if level is None else level)
+    if compression == COMPRESSION_NONE:
+        return data
+    if compression == COMPRESSION_LZ4:
+        return _lz4_block_compress(data, level)
+    raise ValueError(f"Unsupported chunk compression type for writing: {compression}")
+
+
+def encode_chunk(chunk: nbtlib.File, compression: int = COMPRESSION_ZLIB) -> tuple[int, bytes]:
+    compression = writable_compression(compression)
+    return compression, compress_payload(compression, serialize_nbt_bytes(chunk))
+
+
+def read_compressed_payload(header: RegionHeader, raw: RawChunk) -> tuple[int, bytes]:
+    # The stored (compression, bytes) pair with any external .mcc payload pulled in, ready for write_chunks.
+    if raw.corrupt:
+        raise ValueError(f"Chunk {raw.location.index} in {header.path.name} has an invalid location")
+    if not raw.external:
+        return raw.compression, raw.data
+    external = external_chunk_path(header.path, *header.chunk_coords(raw.location.index))
+    try:
+        return raw.compression & ~EXTERNAL_FLAG, external.read_bytes()
+    except OSError as exc:
+        raise ValueError(f"Chunk {raw.location.index} in {header.path.name} could not be read: {exc}") from exc
+
+
+def read_chunk_payload(header: RegionHeader, raw: RawChunk) -> bytes:
+    if raw.corrupt:
+        raise ValueError(f"Chunk {raw.location.index} in {header.path.name} has an invalid location")
+    try:
+        data = raw.data
+        if raw.external:
+            data = external_chunk_path(header.path, *header.chunk_coords(raw.location.index)).read_bytes()
+        return decompress_payload(raw.compression, data)
+    except (OSError, EOFError, zlib.error, struct.error, ValueError) as exc:
+        raise ValueError(f"Chunk {raw.location.index} in {header.path.name} could not be decoded: {exc}") from exc
+
+
+def load_chunk(header: RegionHeader, raw: RawChunk) -> nbtlib.File:
+    data = read_chunk_payload(header, raw)
+    try:
+        return parse_nbt_bytes(data)
+    except (EOFError, struct.error, ValueError) as exc:
+        raise ValueError(f"Chunk {raw.location.index} in {header.path.name} could not be decoded: {exc}") from exc
+
+
+def _mark_sectors(used: bytearray, offset: int, count: int) -> None:
+    end = min(offset + count, len(used))
+    if offset < end:
+        used[offset:end] = b"\1" * (end - offset)
+
+
+def _allocate_sectors(used: bytearray, count: int) -> int:
+    # First fit into a gap between live chunks, otherwise grow the file. Sectors of
+    # chunks being replaced stay marked, so the old copy survives until the header flips.
+    offset = used.find(bytes(count), 2)
+    if offset < 0:
+        offset = len(used.rstrip(b"\0"))
+        used.extend(bytes(max(0, offset + count - len(used))))
+    _mark_sectors(used, offset, count)
+    return offset
+
+
+def _write_external_chunk(path: Path, data: bytes) -> None:
+    fd, tmp_name = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=str(path.parent))
+    tmp_path = Path(tmp_name)
+    try:
+        with os.fdopen(fd, "wb") as handle:
+            handle.write(data)
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.replace(tmp_path, path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+
+def _chunk_record(path: Path, chunk_x: int, chunk_z: int, compression: int, data: bytes) -> tuple[bytes, bool]:
+    # Returns the padded sector record and whether the payload went to an external .mcc file.
+    compression &= ~EXTERNAL_FLAG
+    record = _PAYLOAD_HEADER.pack(len(data) + 1, compression) + data
+    external = len(record) > MAX_INLINE_SECTORS * SECTOR_SIZE
+    if external:
+        _write_external_chunk(external_chunk_path(path, chunk_x, chunk_z), data)
+        record = _PAYLOAD_HEADER.pack(1, compression | EXTERNAL_FLAG)
+    return record + bytes(-len(record) % SECTOR_SIZE), external
+
+
+def write_chunks(
+    path: Path, payloads: Mapping[int, tuple[int, bytes]], timestamp: int | None = None
+) -> RegionHeader:
+    # New payloads only ever land in free sectors and are fsynced before the header is
+    # rewritten, so a crash leaves every chunk pointing at either its old or its new copy.
+    header = read_region_header(path)
+    if not payloads:
+        return header
+    stamp = int(time.time()) if timestamp is None else timestamp
+
+    used = bytearray(max(header.file_sectors, 2))
+    _mark_sectors(used, 0, 2)
+    for location in header.chunks():
+        _mark_sectors(used, location.sector_offset, location.sector_count)
+
+    locations = list(header.locations)
+    timestamps = list(header.timestamps)
+    inline: list[int] = []
+    with path.open("r+b") as handle:
+        if header.file_size < HEADER_SIZE:
+            handle.truncate(HEADER_SIZE)
+        for index, (compression, data) in sorted(payloads.items()):
+            record, external = _chunk_record(path, *header.chunk_coords(index), compression, data)
+            if not external:
+                inline.append(index)
+            count = len(record) // SECTOR_SIZE
+            offset = _allocate_sectors(used, count)
+            handle.seek(offset * SECTOR_SIZE)
+            handle.write(record)
+            locations[index] = (offset << 8) | count
+            timestamps[index] = stamp
+        handle.flush()
+        os.fsync(handle.fileno())
+        file_size = os.fstat(handle.fileno()).st_size
+
+    write_region_header(path, locations, timestamps)
+    for index in inline:
+        external_chunk_path(path, *header.chunk_coords(index)).unlink(missing_ok=True)
+    return RegionHeader(path, header.region_x, header.region_z, file_size, tuple(locations), tuple(timestamps))
+
+
+ChunkTransform = Callable[[RegionHeader, RawChunk], tuple[int, bytes] | None]
+
+
+def rewrite_region(path: Path, transform: ChunkTransform | None = None) -> RegionHeader:
+    # Streams every chunk into a fresh file with contiguous sectors in index order and
+    # swaps it in with os.replace. Without a transform the compressed records are copied
+    # byte for byte; a transform may return a new (compression, payload) or None to keep
+    # the original record. Entries that point outside the file are dropped.
+    header = read_region_header(path)
+    if header.file_size < HEADER_SIZE:
+        return header
+    locations = [0] * CHUNKS_PER_REGION
+    timestamps = [0] * CHUNKS_PER_REGION
+    inline: list[int] = []
+    fd, tmp_name = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=str(path.parent))
+    tmp_path = Path(tmp_name)
+    try:
+        with os.fdopen(fd, "wb") as handle:
+            handle.write(bytes(HEADER_SIZE))
+            offset = 2
+            for raw in iter_raw_chunks(header):
+                if raw.corrupt:
+                    continue
+                payload = transform(header, raw) if transform is not None else None
+                if payload is None:
+                    record = _PAYLOAD_HEADER.pack(len(raw.data) + 1, raw.compression) + raw.data
+                    record += bytes(-len(record) % SECTOR_SIZE)
+                else:
+                    record, external = _chunk_record(path, *header.chunk_coords(raw.location.index), *payload)
+                    if not external and raw.external:
+                        inline.append(raw.location.index)
+                handle.write(record)
+                count = len(record) // SECTOR_SIZE
+                locations[raw.location.index] = (offset << 8) | count
+                timestamps[raw.location.index] = raw.location.timestamp
+                offset += count
+            handle.seek(0)
+            handle.write(_TABLE.pack(*locations) + _TABLE.pack(*timestamps))
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.replace(tmp_path, path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+    for index in inline:
+        external_chunk_path(path, *header.chunk_coords(index)).unlink(missing_ok=True)
+    return RegionHeader(
+        path, header.region_x, header.region_z, offset * SECTOR_SIZE, tuple(locations), tuple(timestamps)
+    )
+
+
+def build_region(path: Path, records: Mapping[int, tuple[int, int, bytes]]) -> None:
+    # Writes a fresh region from index -> (timestamp, compression, data) records, stored
+    # byte for byte in index order. External records keep their flag; the matching .mcc
+    # files are the caller's business.
+    locations = [0] * CHUNKS_PER_REGION
+    timestamps = [0] * CHUNKS_PER_REGION
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=str(path.parent))
+    tmp_path = Path(tmp_name)
+    try:
+        with os.fdopen(fd, "wb") as handle:
+            handle.write(bytes(HEADER_SIZE))
+            offset = 2
+            for index in sorted(records):
+                timestamp, compression, data = records[index]
+                record = _PAYLOAD_HEADER.pack(len(data) + 1, compression) + data
+                record += bytes(-len(record) % SECTOR_SIZE)
+                handle.write(record)
+                count = len(record) // SECTOR_SIZE
+                locations[index] = (offset << 8) | count
+                timestamps[index] = timestamp
+                offset += count
+            handle.seek(0)
+            handle.write(_TABLE.pack(*locations) + _TABLE.pack(*timestamps))
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.replace(tmp_path, path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+
+def list_region_paths(directory: Path) -> list[Path]:
+    if not directory.exists():
+        return []
+    return [path for path in sorted(directory.glob("r.*.*.mca")) if REGION_NAME_RE.match(path.name)]
@@ -8,3 +8,13 @@ def assert_supported_data_version(data_version: int) -> None:
         raise ValueError(
             f"Unsupported world DataVersion {data_version}. This build supports 1.20+ worlds."
         )
+
+
+LZ4_MIN_DATA_VERSION = 3837
+
+
+def assert_lz4_supported(data_version: int) -> None:
+    if data_version < LZ4_MIN_DATA_VERSION:
+        raise ValueError(
+            f"World DataVersion {data_version} cannot read LZ4 chunks. LZ4 needs 1.20.5+ worlds."
+        )
@@ -0,0 +1,29 @@
+import struct
+import zlib
+from pathlib import Path
+
+import nbtlib
+
+from mcworldmgr.world.nbt_io import serialize_nbt_bytes
+from mcworldmgr.world.region import SECTOR_SIZE
+
+
+def chunk_payload(data_version: int = 3700, **tags: nbtlib.Base) -> bytes:
+    # A zlib-compressed chunk NBT with DataVersion plus whatever tags the test needs.
+    chunk = nbtlib.File({"DataVersion": nbtlib.Int(data_version), **tags})
+    return zlib.compress(serialize_nbt_bytes(chunk))
+
+
+def write_region(path: Path, chunks: dict[int, bytes], timestamps: dict[int, int] | None = None) -> None:
+    # Zlib payloads packed back to back from sector 2; timestamps default to 1000 + index.
+    locations = [0] * 1024
+    stamps = [0] * 1024
+    body = b""
+    for index, payload in chunks.items():
+        data = struct.pack(">IB", len(payload) + 1, 2) + payload
+        data += b"\0" * (-len(data) % SECTOR_SIZE)
+        locations[index] = ((2 + len(body) // SECTOR_SIZE) << 8) | (len(data) // SECTOR_SIZE)
+        stamps[index] = (timestamps or {}).get(index, 1000 + index)
+        body += data
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(struct.pack(">1024I", *locations) + struct.pack(">1024I", *stamps) + body)
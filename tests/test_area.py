@@ -0,0 +1,30 @@
+from pathlib import Path
+
+from mcworldmgr.world.area import CircleArea, chunk_overlaps, load_polygon, region_overlaps
+
+
+def test_circle_overlap() -> None:
+    area = CircleArea(0, 0, 100)
+    assert chunk_overlaps(area, 0, 0)
+    assert chunk_overlaps(area, -7, 0)
+    assert not chunk_overlaps(area, 6, 6)
+    assert region_overlaps(area, -1, -1)
+    assert not region_overlaps(area, 1, 0)
+
+
+def test_polygon_overlap(tmp_path: Path) -> None:
+    polygon_file = tmp_path / "area.txt"
+    polygon_file.write_text("# triangle\n0,0\n200 0\n0,200\n", encoding="utf-8")
+    area = load_polygon(polygon_file)
+    assert chunk_overlaps(area, 0, 0)
+    assert chunk_overlaps(area, 6, 5)
+    assert not chunk_overlaps(area, 8, 8)
+    assert not chunk_overlaps(area, -2, 0)
+    # A thin sliver crossing a chunk with no vertex or corner inside it still counts.
+    sliver = load_polygon(_write(tmp_path / "sliver.txt", "-10,20\n40,20\n40,21\n-10,21\n"))
+    assert chunk_overlaps(sliver, 0, 1)
+
+
+def _write(path: Path, text: str) -> Path:
+    path.write_text(text, encoding="utf-8")
+    return path
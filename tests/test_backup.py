@@ -0,0 +1,446 @@
+import hashlib
+import os
+import tarfile
+from datetime import datetime
+from pathlib import Path
+
+import nbtlib
+import pytest
+from helpers import chunk_payload, write_region
+
+from mcworldmgr.safety import store
+from mcworldmgr.safety.archive import read_archive_entry, read_archive_index, write_archive
+from mcworldmgr.safety.backup import (
+    backups_dir,
+    configure_backups,
+    create_archive_backup,
+    create_backup,
+    iter_world_files,
+    list_backups,
+    restore_backup,
+    store_world_files,
+)
+from mcworldmgr.safety.journal import record_undo
+from mcworldmgr.safety.progress import TransferProgress
+from mcworldmgr.safety.retention import (
+    empty_trash,
+    empty_trash_in_background,
+    parse_size,
+    prune_backups,
+    select_retained,
+    trash_dir,
+)
+from mcworldmgr.safety.store import object_path, read_chunk_map, read_manifest, store_file
+from mcworldmgr.safety.verify import verify_backup
+from mcworldmgr.services.operations import (
+    delete_player,
+    list_undo_entries,
+    queue_command,
+    reset_chunk,
+    restore_chunks_from_backup,
+    restore_file_from_backup,
+    undo_operation,
+)
+from mcworldmgr.world.region import iter_raw_chunks, load_chunk, read_region_header
+
+
+def _chunk(inhabited: int) -> bytes:
+    return chunk_payload(InhabitedTime=nbtlib.Long(inhabited))
+
+
+def _inhabited(path: Path) -> dict[int, int]:
+    header = read_region_header(path)
+    return {raw.location.index: int(load_chunk(header, raw)["InhabitedTime"]) for raw in iter_raw_chunks(header)}
+
+
+def _make_world(tmp_path: Path) -> Path:
+    world = tmp_path / "World"
+    world.mkdir()
+    (world / "level.dat").write_bytes(b"level-v1")
+    (world / "playerdata").mkdir()
+    (world / "playerdata" / "abc.dat").write_bytes(b"player-v1")
+    write_region(world / "region" / "r.0.0.mca", {0: _chunk(1), 1: _chunk(2), 2: _chunk(3)})
+    return world
+
+
+def test_restore_chunks_and_single_files(tmp_path: Path) -> None:
+    world = _make_world(tmp_path)
+    backup = create_backup(world)
+
+    write_region(world / "region" / "r.0.0.mca", {0: _chunk(10), 1: _chunk(20), 2: _chunk(30), 3: _chunk(40)})
+    (world / "level.dat").write_bytes(b"level-v2")
+    (world / "playerdata" / "abc.dat").write_bytes(b"player-v2")
+
+    result = restore_chunks_from_backup(str(world), backup.name, (1, 0), (3, 0))
+    assert result == {"chunks": 2, "cleared": 1, "unreadable": 0, "files": 1}
+    assert _inhabited(world / "region" / "r.0.0.mca") == {0: 10, 1: 2, 2: 3}
+
+    restore_file_from_backup(str(world), backup.name, "playerdata/abc.dat")
+    assert (world / "playerdata" / "abc.dat").read_bytes() == b"player-v1"
+    assert (world / "level.dat").read_bytes() == b"level-v2"
+    with pytest.raises(ValueError):
+        restore_file_from_backup(str(world), backup.name, "../outside.dat")
+    with pytest.raises(ValueError):
+        restore_file_from_backup(str(world), backup.name, "../outside.dat", backup_before_write=True)
+    assert list_undo_entries(str(world)) == []
+    with pytest.raises(ValueError):
+        record_undo(world, "edit", [world / "region" / ".." / ".." / "outside.dat"])
+    with pytest.raises(FileNotFoundError):
+        restore_file_from_backup(str(world), "../World", "level.dat")
+
+
+def test_backups_share_unchanged_objects(tmp_path: Path) -> None:
+    world = _make_world(tmp_path)
+    world_bytes = sum(path.stat().st_size for path in world.rglob("*") if path.is_file())
+    updates: list[TransferProgress] = []
+    first = create_backup(world, progress=updates.append)
+    assert (updates[-1].files_done, updates[-1].files_total) == (3, 3)
+    assert updates[-1].bytes_done == updates[-1].bytes_total == world_bytes
+    objects = world / ".mcworldmgr_backups" / ".objects"
+
+    def stored() -> int:
+        return len([p for p in objects.rglob("*") if p.is_file()])
+
+    # level.dat, abc.dat, three chunk payloads and the region's chunk map
+    assert stored() == 6
+
+    (world / "playerdata" / "abc.dat").write_bytes(b"player-v2")
+    write_region(world / "region" / "r.0.0.mca", {0: _chunk(1), 1: _chunk(2), 2: _chunk(3), 5: _chunk(6)})
+    second = create_backup(world)
+    # the new player file, the one new chunk and a new chunk map
+    assert stored() == 9
+    assert (second / "manifest.json").is_file()
+    assert list_backups(world) == [second, first]
+
+    restore_backup(world, first.name)
+    assert (world / "playerdata" / "abc.dat").read_bytes() == b"player-v1"
+    assert _inhabited(world / "region" / "r.0.0.mca") == {0: 1, 1: 2, 2: 3}
+    header = read_region_header(world / "region" / "r.0.0.mca")
+    assert header.timestamps[:3] == (1000, 1001, 1002)
+
+    restore_backup(world, second.name)
+    assert _inhabited(world / "region" / "r.0.0.mca") == {0: 1, 1: 2, 2: 3, 5: 6}
+    assert (world / ".mcworldmgr_backups" / ".objects").is_dir()
+
+
+def test_backup_stores_chunks_changed_under_the_same_timestamp(tmp_path: Path) -> None:
+    world = _make_world(tmp_path)
+    region = world / "region" / "r.0.0.mca"
+    write_region(region, {0: b"A" * 100})
+    first = create_backup(world)
+    # Same timestamp, compression and length: only the payload bytes differ.
+    write_region(region, {0: b"B" * 100})
+    stat = region.stat()
+    os.utime(region, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    changed = region.read_bytes()
+    second = create_backup(world)
+
+    restore_backup(world, first.name)
+    restore_backup(world, second.name)
+    assert region.read_bytes() == changed
+
+
+def test_backup_skips_excluded_files_and_can_live_outside_the_world(tmp_path: Path) -> None:
+    world = _make_world(tmp_path)
+    (world / "session.lock").write_bytes(b"lock")
+    (world / "data").mkdir()
+    (world / "data" / "raids.dat.tmp").write_bytes(b"partial")
+    (world / ".mcworldmgr_index" / "blocks").mkdir(parents=True)
+    (world / ".mcworldmgr_index" / "blocks" / "x.json.gz").write_bytes(b"index")
+
+    first = create_backup(world)
+    assert sorted(read_manifest(first)) == ["level.dat", "playerdata/abc.dat", "region/r.0.0.mca"]
+
+    configure_backups(tmp_path / "external", exclude=["playerdata"])
+    try:
+        outside = create_backup(world)
+        assert outside.parent == backups_dir(world)
+        assert outside.is_relative_to(tmp_path / "external")
+        assert sorted(read_manifest(outside)) == ["level.dat", "region/r.0.0.mca"]
+        assert list_backups(world) == [outside]
+    finally:
+        configure_backups()
+    assert list_backups(world) == [first]
+
+
+def test_archive_backup_restores_whole_world_and_single_files(tmp_path: Path) -> None:
+    world = _make_world(tmp_path)
+    (world / "stats").mkdir()
+    (world / "stats" / "abc.json").write_text('{"stats": {}}' * 200_000)
+    archive = create_archive_backup(world, codec="xz")
+    assert archive.name.endswith(".tar")
+    assert list_backups(world) == [archive]
+
+    index = read_archive_index(archive)
+    assert index["region/r.0.0.mca"].codec == "none"
+    assert index["stats/abc.json"].codec == "xz"
+    assert index["stats/abc.json"].stored_size < index["stats/abc.json"].size // 100
+    with tarfile.open(archive) as tar:
+        assert "stats/abc.json.xz" in tar.getnames()
+
+    (world / "playerdata" / "abc.dat").write_bytes(b"player-v2")
+    write_region(world / "region" / "r.0.0.mca", {0: _chunk(10)})
+    restore_file_from_backup(str(world), archive.name, "playerdata/abc.dat")
+    assert (world / "playerdata" / "abc.dat").read_bytes() == b"player-v1"
+    restore_chunks_from_backup(str(world), archive.name, (1, 0), (1, 0))
+    assert _inhabited(world / "region" / "r.0.0.mca") == {0: 10, 1: 2}
+
+    restore_backup(world, archive.name)
+    assert _inhabited(world / "region" / "r.0.0.mca") == {0: 1, 1: 2, 2: 3}
+    assert (world / "stats" / "abc.json").read_text() == '{"stats": {}}' * 200_000
+
+
+def test_write_archive_bounds_look_ahead_and_hashes_each_file(tmp_path: Path) -> None:
+    # One worker allows two blocks in flight; the 3 MiB files overflow that window.
+    files = []
+    for number in range(4):
+        path = tmp_path / f"data{number}.json"
+        path.write_bytes(bytes([number]) * ((3 << 20) + number))
+        files.append((path, path.name, 0))
+    raw = tmp_path / "level.dat"
+    raw.write_bytes(b"\x1f\x8b" + os.urandom(5000))
+    files.append((raw, raw.name, 0))
+
+    entries = write_archive(tmp_path / "out.tar", files, workers=1)
+    index = read_archive_index(tmp_path / "out.tar")
+    assert [entry.path for entry in entries] == [name for _, name, _ in files]
+    for path, name, _ in files:
+        data = path.read_bytes()
+        assert index[name].digest == hashlib.sha256(data).hexdigest()
+        assert read_archive_entry(tmp_path / "out.tar", index[name]) == data
+    assert index["level.dat"].codec == "none"
+
+
+def test_store_file_names_objects_after_the_bytes_it_copied(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    source = tmp_path / "level.dat"
+    source.write_bytes(b"level-v1")
+    copy_file = store.copy_file
+
+    def copy_after_a_write(*args: object, **kwargs: object) -> None:
+        # The server saves the file between the hash and the copy.
+        source.write_bytes(b"level-v2")
+        copy_file(*args, **kwargs)  # type: ignore[arg-type]
+
+    monkeypatch.setattr(store, "copy_file", copy_after_a_write)
+    digest = store_file(tmp_path / "store", source)
+    assert digest == hashlib.sha256(b"level-v2").hexdigest()
+    assert object_path(tmp_path / "store", digest).read_bytes() == b"level-v2"
+
+
+@pytest.mark.parametrize("swap", [False, True])
+def test_restore_only_touches_changed_files(tmp_path: Path, swap: bool) -> None:
+    world = _make_world(tmp_path)
+    backup = create_backup(world)
+    level_inode = (world / "level.dat").stat().st_ino
+
+    (world / "playerdata" / "abc.dat").write_bytes(b"player-v2")
+    (world / "playerdata" / "new.dat").write_bytes(b"new player")
+    (world / "DIM-1" / "region").mkdir(parents=True)
+    (world / "DIM-1" / "region" / "r.0.0.mca").write_bytes(b"")
+    (world / "session.lock").write_bytes(b"lock")
+    # Excluded files and folders are not in the backup and are left alone either way.
+    (world / ".mcworldmgr_index").mkdir()
+    (world / ".mcworldmgr_index" / "r.0.0.json").write_text("{}")
+    (world / "data").mkdir()
+    (world / "data" / "map.dat.tmp").write_bytes(b"tmp")
+    # Same chunks in a different sector layout: caught by the chunk map hash, not rewritten.
+    write_region(world / "region" / "r.0.0.mca", {2: _chunk(3), 1: _chunk(2), 0: _chunk(1)})
+    os.utime(world / "region" / "r.0.0.mca", ns=(1, 1))
+
+    result = restore_backup(world, backup.name, swap=swap)
+    assert result == {"written": 1, "unchanged": 2, "deleted": 2}
+    assert (world / "playerdata" / "abc.dat").read_bytes() == b"player-v1"
+    assert not (world / "playerdata" / "new.dat").exists()
+    assert not (world / "DIM-1").exists()
+    assert (world / "region" / "r.0.0.mca").stat().st_mtime_ns != 1
+    assert list_backups(world) == [backup]
+    assert (world / "session.lock").read_bytes() == b"lock"
+    assert (world / ".mcworldmgr_index" / "r.0.0.json").read_text() == "{}"
+    assert (world / "data" / "map.dat.tmp").read_bytes() == b"tmp"
+    if swap:
+        assert sorted(p.name for p in tmp_path.iterdir()) == ["World"]
+    else:
+        assert (world / "level.dat").stat().st_ino == level_inode
+
+
+def test_swap_restore_with_external_root_keeps_the_inner_backups_folder(tmp_path: Path) -> None:
+    world = _make_world(tmp_path)
+    inner = create_backup(world)
+    configure_backups(tmp_path / "external")
+    try:
+        outside = create_backup(world)
+        (world / "level.dat").write_bytes(b"level-v2")
+        restore_backup(world, outside.name, swap=True)
+    finally:
+        configure_backups()
+    assert (world / "level.dat").read_bytes() == b"level-v1"
+    assert list_backups(world) == [inner]
+    assert sorted(read_manifest(inner)) == ["level.dat", "playerdata/abc.dat", "region/r.0.0.mca"]
+
+
+def test_write_operations_journal_only_their_files_and_undo(tmp_path: Path) -> None:
+    world = _make_world(tmp_path)
+    write_region(world / "region" / "r.1.0.mca", {0: _chunk(7)})
+    (world / "region" / "c.0.0.mcc").write_bytes(b"external")
+    objects = world / ".mcworldmgr_backups" / ".objects"
+
+    reset_chunk(str(world), 1, 0, backup_before_write=True)
+    journaled = list_undo_entries(str(world))
+    assert [entry.operation for entry in journaled] == ["reset-chunk"]
+    assert sorted(item.path for item in journaled[0].files) == ["region/c.0.0.mcc", "region/r.0.0.mca"]
+    assert not any(p.is_file() and p.stat().st_size == len(b"player-v1") for p in objects.rglob("*"))
+
+    delete_player(str(world), "abc", backup_before_write=True)
+    queue_command(str(world), "say hi", backup_before_write=True)
+    assert [entry.operation for entry in list_undo_entries(str(world))] == [
+        "queue-command",
+        "delete-player",
+        "reset-chunk",
+    ]
+    assert list_backups(world) == []
+
+    undo_operation(str(world))
+    assert not (world / "mcworldmgr_commands" / "queued_commands.mcfunction").exists()
+    undo_operation(str(world))
+    assert (world / "playerdata" / "abc.dat").read_bytes() == b"player-v1"
+    undo_operation(str(world))
+    assert _inhabited(world / "region" / "r.0.0.mca") == {0: 1, 1: 2, 2: 3}
+    assert _inhabited(world / "region" / "r.1.0.mca") == {0: 7}
+    with pytest.raises(FileNotFoundError):
+        undo_operation(str(world))
+
+
+def test_verify_reports_damaged_and_missing_backup_data(tmp_path: Path) -> None:
+    world = _make_world(tmp_path)
+    snapshot = create_backup(world)
+    archive = create_archive_backup(world)
+    updates: list[TransferProgress] = []
+    assert verify_backup(world, snapshot.name, deep=True, progress=updates.append).ok
+    last = updates[-1]
+    assert (last.files_done, last.files_total) == (3, 3)
+    assert last.bytes_done == last.bytes_total == sum(item.size for item in read_manifest(snapshot).values())
+    assert verify_backup(world, archive.name, deep=True).ok
+
+    # A payload that hashes fine but does not decode is only caught by the deep check.
+    write_region(world / "region" / "r.0.0.mca", {0: _chunk(2)[:-4]})
+    broken = create_backup(world)
+    assert verify_backup(world, broken.name).ok
+    assert [issue.path for issue in verify_backup(world, broken.name, deep=True).issues] == ["region/r.0.0.mca chunk 0"]
+
+    root = world / ".mcworldmgr_backups"
+    manifest = read_manifest(snapshot)
+    object_path(root, manifest["playerdata/abc.dat"].digest).write_bytes(b"player-XX")
+    chunk_map = read_chunk_map(root, manifest["region/r.0.0.mca"].digest)
+    object_path(root, chunk_map[1][3]).unlink()
+    report = verify_backup(world, snapshot.name)
+    assert sorted((issue.path, issue.problem) for issue in report.issues) == [
+        ("playerdata/abc.dat", "checksum mismatch"),
+        ("region/r.0.0.mca chunk 1", "payload missing from the object store"),
+    ]
+
+
+def test_verify_reports_damaged_xz_members_and_truncated_archives(tmp_path: Path) -> None:
+    world = _make_world(tmp_path)
+    (world / "stats").mkdir()
+    (world / "stats" / "abc.json").write_text('{"stats": {}}' * 20_000)
+    archive = create_archive_backup(world, codec="xz")
+    entry = read_archive_index(archive)["stats/abc.json"]
+    with archive.open("r+b") as handle:
+        handle.seek(entry.offset + entry.stored_size // 2)
+        handle.write(b"\xff" * 16)
+    [issue] = verify_backup(world, archive.name).issues
+    assert issue.path == "stats/abc.json"
+    assert issue.problem.startswith("could not be read")
+
+    with archive.open("r+b") as handle:
+        handle.truncate(entry.offset)
+    report = verify_backup(world, archive.name)
+    assert not report.ok
+    assert [issue.path for issue in report.issues] == [".mcworldmgr-index.json"]
+
+
+def test_retention_keeps_newest_backup_per_period() -> None:
+    times = {
+        "a": datetime(2026, 3, 2, 9, 0),
+        "b": datetime(2026, 3, 2, 9, 30),
+        "c": datetime(2026, 3, 2, 10, 15),
+        "d": datetime(2026, 3, 1, 23, 0),
+        "e": datetime(2026, 2, 20, 12, 0),
+    }
+    assert select_retained(times, hourly=2) == {"c", "b"}
+    assert select_retained(times, daily=2) == {"c", "d"}
+    assert select_retained(times, weekly=3) == {"c", "d", "e"}
+    assert select_retained(times) == set(times)
+    assert parse_size("1.5G") == 3 << 29
+    assert parse_size("20 MiB") == 20 << 20
+
+
+def test_prune_counts_shared_data_once_and_trashes_unreferenced_objects(tmp_path: Path) -> None:
+    world = _make_world(tmp_path)
+    root = world / ".mcworldmgr_backups"
+    names = ("backup-20260301-100000", "backup-20260301-110000", "backup-20260302-090000")
+    for version, name in enumerate(names, start=1):
+        (world / "playerdata" / "abc.dat").write_bytes(b"player-v%d" % version)
+        create_backup(world).rename(root / name)
+    for item in (root / ".objects").rglob("*"):
+        os.utime(item, (1, 1))
+    oldest_player = read_manifest(root / names[0])["playerdata/abc.dat"].digest
+
+    # A full-copy backup from an older version: a hard-linked file is only counted once.
+    legacy = root / "backup-20250101-000000"
+    legacy.mkdir()
+    (legacy / "level.dat").write_bytes(b"x" * 100)
+    os.link(legacy / "level.dat", legacy / "level-link.dat")
+    plan = prune_backups(world, daily=2, dry_run=True)
+    assert plan.removed == (names[0], "backup-20250101-000000")
+    assert plan.bytes_before - plan.bytes_after == 100 + len(b"player-v1")
+    assert legacy.is_dir() and object_path(root, oldest_player).is_file()
+
+    result = prune_backups(world, daily=2)
+    assert result.removed == plan.removed and result.objects_removed == 1
+    assert [path.name for path in list_backups(world)] == [names[2], names[1]]
+    assert not object_path(root, oldest_player).exists()
+    assert verify_backup(world, names[1]).ok
+
+    result = prune_backups(world, max_bytes=1)
+    assert result.kept == (names[2],)
+    assert verify_backup(world, names[2]).ok
+    empty_trash(world)
+    assert list(trash_dir(world).iterdir()) == []
+
+
+def test_trash_is_emptied_by_a_detached_process(tmp_path: Path) -> None:
+    world = _make_world(tmp_path)
+    (trash_dir(world) / "batch" / ".objects").mkdir(parents=True)
+    (trash_dir(world) / "batch" / ".objects" / "ab").write_bytes(b"old")
+    (trash_dir(world) / "loose").write_bytes(b"old")
+    cleaner = empty_trash_in_background(world)
+    assert cleaner is not None
+    assert cleaner.wait(timeout=30) == 0
+    assert list(trash_dir(world).iterdir()) == []
+
+
+def test_prune_keeps_old_objects_a_running_backup_reuses(tmp_path: Path) -> None:
+    world = _make_world(tmp_path)
+    root = world / ".mcworldmgr_backups"
+    old, new = "backup-20260301-100000", "backup-20260302-100000"
+    create_backup(world).rename(root / old)
+    first = read_manifest(root / old)
+    (world / "playerdata" / "abc.dat").write_bytes(b"player-v2")
+    write_region(world / "region" / "r.0.0.mca", {0: _chunk(10)})
+    create_backup(world).rename(root / new)
+    for item in (root / ".objects").rglob("*"):
+        os.utime(item, (1, 1))
+
+    # A backup in progress has stored its files but not yet written its manifest; the old
+    # player file and region chunks it reuses are only referenced by the snapshot being pruned.
+    (world / "playerdata" / "abc.dat").write_bytes(b"player-v1")
+    write_region(world / "region" / "r.0.0.mca", {0: _chunk(1), 1: _chunk(2), 2: _chunk(3)})
+    running = store_world_files(world, iter_world_files(world))
+    result = prune_backups(world, max_bytes=1)
+    assert result.removed == (old,)
+    assert result.objects_removed == 0
+    for entry in running:
+        assert object_path(root, entry.digest).is_file()
+    chunk_map = read_chunk_map(root, first["region/r.0.0.mca"].digest)
+    assert all(object_path(root, row[3]).is_file() for row in chunk_map.values())
@@ -0,0 +1,66 @@
+from pathlib import Path
+
+import nbtlib
+import numpy as np
+from helpers import chunk_payload, write_region
+
+from mcworldmgr.services.block_index import find_blocks, index_dir
+from mcworldmgr.world.palette import pack_indices
+
+
+def _section(y: int, names: list[str], indices: np.ndarray) -> nbtlib.Compound:
+    states = nbtlib.Compound(
+        {"palette": nbtlib.List[nbtlib.Compound]([nbtlib.Compound({"Name": nbtlib.String(n)}) for n in names])}
+    )
+    if len(names) > 1:
+        states["data"] = nbtlib.LongArray(pack_indices(indices, 4))
+    return nbtlib.Compound({"Y": nbtlib.Byte(y), "block_states": states})
+
+
+def _write_chunk_region(path: Path, index: int, sections: list[nbtlib.Compound], timestamp: int) -> None:
+    write_region(path, {index: chunk_payload(sections=nbtlib.List[nbtlib.Compound](sections))}, {index: timestamp})
+
+
+def test_find_blocks_builds_and_refreshes_index(tmp_path: Path) -> None:
+    world = tmp_path / "World"
+    (world / "region").mkdir(parents=True)
+    (world / "level.dat").write_bytes(b"x")
+    indices = np.zeros(4096, dtype=np.uint16)
+    indices[(3 << 8) | (2 << 4) | 1] = 1
+    sections = [
+        _section(-1, ["minecraft:stone"], indices),
+        _section(2, ["minecraft:air", "minecraft:spawner"], indices),
+    ]
+    region = world / "region" / "r.0.0.mca"
+    _write_chunk_region(region, 33, sections, timestamp=100)
+
+    hits = find_blocks(str(world), ["minecraft:spawner"], workers=1)
+    assert [(h.x, h.y, h.z) for h in hits] == [(17, 35, 18)]
+    assert (index_dir(world) / "region" / "r.0.0.mca.json.gz").exists()
+    assert find_blocks(str(world), ["minecraft:chest"], workers=1) == []
+
+    _write_chunk_region(region, 33, sections[:1], timestamp=200)
+    assert find_blocks(str(world), ["minecraft:spawner"], workers=1) == []
+
+
+def test_find_blocks_searches_every_dimension(tmp_path: Path) -> None:
+    world = tmp_path / "World"
+    (world / "region").mkdir(parents=True)
+    (world / "DIM-1" / "region").mkdir(parents=True)
+    (world / "level.dat").write_bytes(b"x")
+    indices = np.zeros(4096, dtype=np.uint16)
+    indices[0] = 1
+    spawner = [_section(0, ["minecraft:air", "minecraft:spawner"], indices)]
+    _write_chunk_region(world / "region" / "r.0.0.mca", 0, spawner, timestamp=100)
+    _write_chunk_region(world / "DIM-1" / "region" / "r.-1.0.mca", 1023, spawner, timestamp=100)
+
+    hits = find_blocks(str(world), ["minecraft:spawner"], workers=1)
+    assert [(h.dimension, h.x, h.y, h.z) for h in hits] == [
+        ("minecraft:overworld", 0, 0, 0),
+        ("minecraft:the_nether", -16, 0, 496),
+    ]
+    assert (index_dir(world) / "DIM-1" / "region" / "r.-1.0.mca.json.gz").exists()
+
+    (world / "DIM-1" / "region" / "r.-1.0.mca").unlink()
+    assert [h.dimension for h in find_blocks(str(world), ["minecraft:spawner"], workers=1)] == ["minecraft:overworld"]
+    assert not (index_dir(world) / "DIM-1" / "region" / "r.-1.0.mca.json.gz").exists()
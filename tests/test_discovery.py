@@ -1,6 +1,6 @@
 from pathlib import Path
 
-from mcworldmgr.world.discovery import list_worlds, resolve_world
+from mcworldmgr.world.discovery import dimension_dirs, list_worlds, resolve_world
 
 
 def test_list_worlds(tmp_path: Path) -> None:
@@ -25,3 +25,17 @@ def test_resolve_world_by_name(tmp_path: Path) -> None:
 
     resolved = resolve_world("WorldB", str(saves))
     assert resolved.path == world.resolve()
+
+
+def test_dimension_dirs(tmp_path: Path) -> None:
+    world = tmp_path / "World"
+    (world / "DIM-1" / "region").mkdir(parents=True)
+    (world / "dimensions" / "mypack" / "mining" / "region").mkdir(parents=True)
+    (world / "dimensions" / "mypack" / "empty").mkdir(parents=True)
+
+    found = dimension_dirs(world)
+    assert found == {
+        "minecraft:overworld": world,
+        "minecraft:the_nether": world / "DIM-1",
+        "mypack:mining": world / "dimensions" / "mypack" / "mining",
+    }
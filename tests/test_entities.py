@@ -0,0 +1,85 @@
+from pathlib import Path
+
+import nbtlib
+from helpers import chunk_payload, write_region
+
+from mcworldmgr.safety.journal import list_journal
+from mcworldmgr.services.entities import entity_hotspots, purge_entities
+from mcworldmgr.world.region import iter_raw_chunks, load_chunk, read_region_header
+
+
+def _entity(entity_id: str, x: float, y: float, z: float) -> nbtlib.Compound:
+    return nbtlib.Compound(
+        {
+            "id": nbtlib.String(entity_id),
+            "Pos": nbtlib.List[nbtlib.Double]([nbtlib.Double(x), nbtlib.Double(y), nbtlib.Double(z)]),
+        }
+    )
+
+
+def _entity_chunk(entities: list[nbtlib.Compound]) -> bytes:
+    return chunk_payload(Entities=nbtlib.List[nbtlib.Compound](entities))
+
+
+def _entity_ids(path: Path) -> dict[int, list[str]]:
+    header = read_region_header(path)
+    return {
+        raw.location.index: [str(e["id"]) for e in load_chunk(header, raw)["Entities"]]
+        for raw in iter_raw_chunks(header)
+    }
+
+
+def test_purge_entities_by_type_and_bbox(tmp_path: Path) -> None:
+    world = tmp_path / "World"
+    (world / "entities").mkdir(parents=True)
+    (world / "level.dat").write_bytes(b"x")
+    region = world / "entities" / "r.0.0.mca"
+    write_region(
+        region,
+        {
+            0: _entity_chunk([_entity("minecraft:item", 1, 64, 1), _entity("minecraft:cow", 2, 64, 2)]),
+            1: _entity_chunk([_entity("minecraft:item", 20, 64, 3)]),
+            33: _entity_chunk([_entity("minecraft:item", 20, 64, 20)]),
+        },
+    )
+    far = world / "entities" / "r.5.5.mca"
+    write_region(far, {0: _entity_chunk([_entity("minecraft:item", 2561, 64, 2561)])})
+    far_before = far.read_bytes()
+
+    bbox = [0, 0, 0, 31, 100, 15]
+    preview = purge_entities(str(world), types=["minecraft:item"], bbox=bbox, dry_run=True, workers=1)
+    assert preview == {"entities": 2, "chunks": 2, "regions": 1}
+    assert _entity_ids(region)[0] == ["minecraft:item", "minecraft:cow"]
+
+    result = purge_entities(str(world), types=["minecraft:item"], bbox=bbox, workers=2, backup_before_write=True)
+    assert result == preview
+    assert [item.path for entry in list_journal(world) for item in entry.files] == ["entities/r.0.0.mca"]
+    assert _entity_ids(region) == {0: ["minecraft:cow"], 1: [], 33: ["minecraft:item"]}
+    header = read_region_header(region)
+    assert header.timestamps[33] == 1033
+    assert header.timestamps[0] != 1000
+    assert far.read_bytes() == far_before
+
+
+def test_entity_hotspots_ranks_chunks_and_counts_passengers(tmp_path: Path) -> None:
+    world = tmp_path / "World"
+    (world / "entities").mkdir(parents=True)
+    (world / "level.dat").write_bytes(b"x")
+    horse = _entity("minecraft:horse", 1, 64, 1)
+    horse["Passengers"] = nbtlib.List[nbtlib.Compound]([_entity("minecraft:zombie", 1, 65, 1)])
+    write_region(
+        world / "entities" / "r.0.0.mca",
+        {
+            0: _entity_chunk([horse]),
+            1: _entity_chunk([_entity("minecraft:item", 20, 64, 3)] * 3),
+            2: _entity_chunk([]),
+        },
+    )
+    write_region(world / "entities" / "r.-1.0.mca", {0: _entity_chunk([_entity("minecraft:item", -500, 64, 3)])})
+
+    report = entity_hotspots(str(world), top=2, workers=2)
+    assert report.total == 6
+    assert report.chunks_with_entities == 3
+    assert report.types == {"minecraft:item": 4, "minecraft:horse": 1, "minecraft:zombie": 1}
+    assert [(c.chunk_x, c.chunk_z, c.total) for c in report.chunks] == [(1, 0, 3), (0, 0, 2)]
+    assert report.chunks[1].types == {"minecraft:horse": 1, "minecraft:zombie": 1}
@@ -0,0 +1,92 @@
+import errno
+import os
+from pathlib import Path
+
+import pytest
+
+from mcworldmgr.safety import fastcopy
+from mcworldmgr.safety.fastcopy import copy_file, copy_files
+from mcworldmgr.safety.progress import ProgressMeter, TransferProgress, format_progress
+
+
+def test_copy_files_creates_folders_and_keeps_times(tmp_path: Path) -> None:
+    source = tmp_path / "source"
+    pairs = []
+    for index in range(20):
+        path = source / f"dir{index % 3}" / "nested" / f"f{index}.bin"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(os.urandom(1000 + index))
+        os.utime(path, ns=(1_000_000_000, 2_000_000_000 + index))
+        pairs.append((path, tmp_path / "target" / path.relative_to(source)))
+
+    seen: list[int] = []
+    copy_files(pairs, workers=4, progress=lambda done, total, name: seen.append(done))
+    assert seen == list(range(1, 21))
+    for source_path, target_path in pairs:
+        assert target_path.read_bytes() == source_path.read_bytes()
+        assert target_path.stat().st_mtime_ns == source_path.stat().st_mtime_ns
+
+
+@pytest.mark.skipif(not hasattr(os, "SEEK_HOLE"), reason="no SEEK_HOLE on this platform")
+def test_copy_file_keeps_sparse_holes(tmp_path: Path) -> None:
+    source = tmp_path / "sparse.mca"
+    with source.open("wb") as handle:
+        handle.write(b"head")
+        handle.seek(8 << 20)
+        handle.write(b"tail")
+    target = tmp_path / "copy.mca"
+    copy_file(source, target)
+    assert target.read_bytes() == source.read_bytes()
+    assert target.stat().st_blocks <= source.stat().st_blocks + 64
+
+
+def test_progress_meter_counts_bytes_within_files_and_limits_reports(tmp_path: Path) -> None:
+    source = tmp_path / "big.bin"
+    source.write_bytes(os.urandom(3 << 20))
+    blocks: list[int] = []
+    copy_file(source, tmp_path / "copy.bin", on_bytes=blocks.append)
+    assert sum(blocks) in (0, 3 << 20)  # nothing is reported for a reflink
+
+    updates: list[TransferProgress] = []
+    meter = ProgressMeter(updates.append, 2, 5000, interval=3600)
+    first = meter.track(4000, lambda on_bytes: on_bytes(1500))
+    second = meter.track(1000, lambda on_bytes: None)
+    first()
+    meter.file_done(1, 2, "a")
+    second()
+    meter.file_done(2, 2, "b")
+    # The first advance reports; the rest fall inside the interval until the last file is done.
+    assert [(item.files_done, item.bytes_done) for item in updates] == [(0, 1500), (2, 5000)]
+    assert updates[-1].fraction == 1.0 and updates[-1].eta == 0.0
+    assert "2/2 files" in format_progress(updates[-1])
+
+
+def test_copy_file_falls_back_to_a_plain_loop_without_kernel_copies(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    # As on Windows: no copy_file_range, no sendfile, no reflink ioctl, no pread/pwrite.
+    for name in ("copy_file_range", "sendfile", "pread", "pwrite"):
+        monkeypatch.delattr(os, name, raising=False)
+    monkeypatch.setattr(fastcopy, "_reflink", lambda source_fd, target_fd: False)
+    source = tmp_path / "r.0.0.mca"
+    source.write_bytes(os.urandom((3 << 20) + 123))
+    blocks: list[int] = []
+    copy_file(source, tmp_path / "copy.mca", on_bytes=blocks.append)
+    assert (tmp_path / "copy.mca").read_bytes() == source.read_bytes()
+    assert sum(blocks) == source.stat().st_size
+
+
+def test_copy_file_falls_back_when_sendfile_refuses_regular_files(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    # macOS: sendfile only writes to sockets and fails with ENOTSOCK.
+    def refuse(*args: object) -> int:
+        raise OSError(errno.ENOTSOCK, "Socket operation on non-socket")
+
+    monkeypatch.delattr(os, "copy_file_range", raising=False)
+    monkeypatch.setattr(os, "sendfile", refuse, raising=False)
+    monkeypatch.setattr(fastcopy, "_reflink", lambda source_fd, target_fd: False)
+    source = tmp_path / "level.dat"
+    source.write_bytes(os.urandom(5000))
+    copy_file(source, tmp_path / "copy.dat")
+    assert (tmp_path / "copy.dat").read_bytes() == source.read_bytes()
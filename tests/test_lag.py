@@ -0,0 +1,70 @@
+from pathlib import Path
+
+import nbtlib
+from helpers import chunk_payload, write_region
+
+from mcworldmgr.services.lag import clear_scheduled_ticks, scan_block_activity
+from mcworldmgr.world.region import read_region_header
+
+
+def _tick() -> nbtlib.Compound:
+    return nbtlib.Compound({"i": nbtlib.String("minecraft:water"), "t": nbtlib.Int(1)})
+
+
+def _chunk(block_entities: list[str], block_ticks: int = 0, fluid_ticks: int = 0) -> bytes:
+    return chunk_payload(
+        block_entities=nbtlib.List[nbtlib.Compound](
+            [nbtlib.Compound({"id": nbtlib.String(name)}) for name in block_entities]
+        ),
+        block_ticks=nbtlib.List[nbtlib.Compound]([_tick() for _ in range(block_ticks)]),
+        fluid_ticks=nbtlib.List[nbtlib.Compound]([_tick() for _ in range(fluid_ticks)]),
+    )
+
+
+def test_scan_block_activity_covers_dimensions(tmp_path: Path) -> None:
+    world = tmp_path / "World"
+    (world / "region").mkdir(parents=True)
+    (world / "DIM-1" / "region").mkdir(parents=True)
+    (world / "level.dat").write_bytes(b"x")
+    write_region(
+        world / "region" / "r.0.0.mca",
+        {
+            0: _chunk(["minecraft:hopper"] * 3 + ["minecraft:chest"]),
+            1: _chunk([]),
+            2: _chunk([], block_ticks=2, fluid_ticks=5),
+        },
+    )
+    write_region(world / "DIM-1" / "region" / "r.0.0.mca", {32: _chunk(["minecraft:furnace"])})
+
+    activity = {(a.dimension, a.chunk_x, a.chunk_z): a for a in scan_block_activity(str(world), workers=2)}
+    assert set(activity) == {
+        ("minecraft:overworld", 0, 0),
+        ("minecraft:overworld", 2, 0),
+        ("minecraft:the_nether", 0, 1),
+    }
+    hoppers = activity[("minecraft:overworld", 0, 0)]
+    assert hoppers.block_entities == {"minecraft:hopper": 3, "minecraft:chest": 1}
+    assert hoppers.block_entity_count == 4
+    assert activity[("minecraft:overworld", 2, 0)].scheduled_ticks == 7
+
+
+def test_clear_scheduled_ticks_rewrites_only_backlogged_chunks(tmp_path: Path) -> None:
+    world = tmp_path / "World"
+    (world / "region").mkdir(parents=True)
+    (world / "DIM1" / "region").mkdir(parents=True)
+    (world / "level.dat").write_bytes(b"x")
+    write_region(world / "region" / "r.0.0.mca", {0: _chunk([], block_ticks=5, fluid_ticks=2), 1: _chunk([])})
+    write_region(world / "DIM1" / "region" / "r.0.0.mca", {0: _chunk([], fluid_ticks=9)})
+
+    preview = clear_scheduled_ticks(str(world), 3, truncate=True, dry_run=True, workers=1)
+    assert preview == {"ticks": 8, "chunks": 2, "regions": 2}
+
+    result = clear_scheduled_ticks(str(world), 3, truncate=True, workers=2)
+    assert result == preview
+    header = read_region_header(world / "region" / "r.0.0.mca")
+    assert header.timestamps[1] == 1001
+    activity = {(a.dimension, a.chunk_x): a for a in scan_block_activity(str(world), workers=1)}
+    assert (activity[("minecraft:overworld", 0)].block_ticks, activity[("minecraft:overworld", 0)].fluid_ticks) == (3, 2)
+    assert activity[("minecraft:the_end", 0)].fluid_ticks == 3
+
+    assert clear_scheduled_ticks(str(world), 2, workers=1)["ticks"] == 6
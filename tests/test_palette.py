@@ -0,0 +1,48 @@
+import nbtlib
+import numpy as np
+
+from mcworldmgr.world.palette import bits_per_entry, decode_block_states, pack_indices, unpack_indices
+
+
+def _reference_unpack(longs: list[int], bits: int, count: int = 4096) -> list[int]:
+    per_long = 64 // bits
+    mask = (1 << bits) - 1
+    return [((longs[i // per_long] & 0xFFFFFFFFFFFFFFFF) >> ((i % per_long) * bits)) & mask for i in range(count)]
+
+
+def test_unpack_matches_reference_for_padded_widths() -> None:
+    rng = np.random.default_rng(1)
+    for bits in (4, 5, 6, 7, 8, 9, 12, 15, 16):
+        indices = rng.integers(0, 1 << bits, size=4096, dtype=np.uint16)
+        packed = pack_indices(indices, bits)
+        assert packed.size == -(-4096 // (64 // bits))
+        assert unpack_indices(packed, bits).tolist() == _reference_unpack(packed.tolist(), bits)
+        assert np.array_equal(unpack_indices(packed, bits), indices)
+
+
+def test_decode_block_states_from_nbt() -> None:
+    palette = [nbtlib.Compound({"Name": nbtlib.String(f"minecraft:block_{i}")}) for i in range(20)]
+    indices = (np.arange(4096) % 20).astype(np.uint16)
+    section = nbtlib.Compound(
+        {
+            "block_states": nbtlib.Compound(
+                {
+                    "palette": nbtlib.List[nbtlib.Compound](palette),
+                    "data": nbtlib.LongArray(pack_indices(indices, bits_per_entry(20))),
+                }
+            )
+        }
+    )
+    names, decoded = decode_block_states(section)
+    assert names[19] == "minecraft:block_19"
+    assert np.array_equal(decoded, indices)
+
+
+def test_single_entry_palette_has_no_data() -> None:
+    air = nbtlib.Compound({"Name": nbtlib.String("minecraft:air")})
+    section = nbtlib.Compound(
+        {"block_states": nbtlib.Compound({"palette": nbtlib.List[nbtlib.Compound]([air])})}
+    )
+    names, decoded = decode_block_states(section)
+    assert names == ["minecraft:air"]
+    assert not decoded.any()
@@ -0,0 +1,85 @@
+import struct
+from pathlib import Path
+
+from mcworldmgr.world.region import (
+    COMPRESSION_NONE,
+    SECTOR_SIZE,
+    chunk_index,
+    clear_chunks,
+    iter_raw_chunks,
+    parse_region_name,
+    read_region_header,
+    write_chunks,
+)
+
+
+def _write_region(path: Path, entries: dict[int, tuple[int, int, int]], sectors: int) -> None:
+    locations = [0] * 1024
+    timestamps = [0] * 1024
+    for index, (offset, count, timestamp) in entries.items():
+        locations[index] = (offset << 8) | count
+        timestamps[index] = timestamp
+    data = struct.pack(">1024I", *locations) + struct.pack(">1024I", *timestamps)
+    path.write_bytes(data + b"\0" * (sectors - 2) * SECTOR_SIZE)
+
+
+def test_read_region_header(tmp_path: Path) -> None:
+    path = tmp_path / "r.-1.2.mca"
+    _write_region(path, {0: (2, 1, 100), 1023: (3, 2, 250)}, sectors=5)
+
+    header = read_region_header(path)
+    assert (header.region_x, header.region_z) == (-1, 2)
+    assert header.chunk_count == 2
+    assert header.used_sectors == 3
+    assert header.file_sectors == 5
+    assert header.last_modified == 250
+    last = header.chunk(1023)
+    assert last is not None
+    assert (last.local_x, last.local_z, last.sector_offset, last.sector_count) == (31, 31, 3, 2)
+    assert header.chunk_coords(1023) == (-1, 95)
+    assert header.chunk(5) is None
+
+
+def test_read_region_header_empty_file(tmp_path: Path) -> None:
+    path = tmp_path / "r.0.0.mca"
+    path.write_bytes(b"")
+    header = read_region_header(path)
+    assert header.chunk_count == 0
+    assert header.last_modified == 0
+
+
+def test_region_coordinates() -> None:
+    assert parse_region_name("r.3.-4.mca") == (3, -4)
+    assert chunk_index(-1, -1) == 1023
+    assert chunk_index(33, 0) == 1
+
+
+def test_clear_chunks_rewrites_header_only(tmp_path: Path) -> None:
+    path = tmp_path / "r.0.0.mca"
+    _write_region(path, {0: (2, 1, 100), 1: (3, 1, 200)}, sectors=4)
+    payload_before = path.read_bytes()[2 * SECTOR_SIZE :]
+
+    header = clear_chunks(path, [1, 7])
+    assert header.chunk_count == 1
+    reread = read_region_header(path)
+    assert reread.chunk(1) is None
+    assert reread.chunk(0) is not None
+    assert path.read_bytes()[2 * SECTOR_SIZE :] == payload_before
+
+
+def test_write_chunks_uses_free_sectors_and_keeps_old_copy(tmp_path: Path) -> None:
+    path = tmp_path / "r.0.0.mca"
+    _write_region(path, {0: (2, 1, 100), 1: (4, 1, 200)}, sectors=5)
+    untouched = path.read_bytes()[2 * SECTOR_SIZE : 3 * SECTOR_SIZE]
+
+    header = write_chunks(path, {0: (COMPRESSION_NONE, b"new"), 5: (COMPRESSION_NONE, b"x" * SECTOR_SIZE)}, 300)
+    assert header.chunk(0) == read_region_header(path).chunk(0)
+    first = header.chunk(0)
+    added = header.chunk(5)
+    assert first is not None and added is not None
+    assert (first.sector_offset, first.sector_count, first.timestamp) == (3, 1, 300)
+    assert (added.sector_offset, added.sector_count) == (5, 2)
+    assert header.file_sectors == 7
+    assert path.read_bytes()[2 * SECTOR_SIZE : 3 * SECTOR_SIZE] == untouched
+    raw = next(iter_raw_chunks(header, [0]))
+    assert (raw.compression, raw.data) == (COMPRESSION_NONE, b"new")
@@ -0,0 +1,228 @@
+import struct
+from pathlib import Path
+
+import nbtlib
+import pytest
+from helpers import chunk_payload, write_region
+
+from mcworldmgr.safety.journal import list_journal
+from mcworldmgr.services.operations import (
+    compact_regions,
+    copy_chunks,
+    prune_chunks,
+    recompress_regions,
+    trim_world,
+)
+from mcworldmgr.services.scan import CORRUPT_STATUS, scan_world
+from mcworldmgr.world.region import (
+    COMPRESSION_LZ4,
+    COMPRESSION_NONE,
+    SECTOR_SIZE,
+    clear_chunks,
+    compress_payload,
+    decompress_payload,
+    iter_raw_chunks,
+    read_region_header,
+)
+
+
+def _chunk(inhabited: int) -> bytes:
+    return chunk_payload(
+        Status=nbtlib.String("minecraft:full"),
+        InhabitedTime=nbtlib.Long(inhabited),
+        LastUpdate=nbtlib.Long(55),
+    )
+
+
+def test_scan_world_in_process_pool(tmp_path: Path) -> None:
+    world = tmp_path / "World"
+    region_dir = world / "region"
+    region_dir.mkdir(parents=True)
+    (world / "level.dat").write_bytes(b"x")
+    write_region(region_dir / "r.0.0.mca", {0: _chunk(10), 33: _chunk(20)})
+    write_region(region_dir / "r.-1.0.mca", {1023: b"not zlib"})
+
+    progress: list[tuple[int, int]] = []
+    summaries = list(scan_world(str(world), workers=2, progress=lambda c, t, _: progress.append((c, t))))
+
+    by_coords = {(s.chunk_x, s.chunk_z): s for s in summaries}
+    assert by_coords[(1, 1)].inhabited_time == 20
+    assert by_coords[(0, 0)].status == "minecraft:full"
+    assert by_coords[(0, 0)].data_version == 3700
+    assert by_coords[(0, 0)].timestamp == 1000
+    assert by_coords[(-1, 31)].status == CORRUPT_STATUS
+    assert progress[-1] == (2, 2)
+
+
+def test_prune_chunks_clears_low_inhabited_chunks(tmp_path: Path) -> None:
+    world = tmp_path / "World"
+    (world / "region").mkdir(parents=True)
+    (world / "entities").mkdir()
+    (world / "level.dat").write_bytes(b"x")
+    write_region(world / "region" / "r.0.0.mca", {0: _chunk(5), 1: _chunk(5000)})
+    write_region(world / "entities" / "r.0.0.mca", {0: _chunk(0)})
+    write_region(world / "region" / "r.1.0.mca", {0: _chunk(0)})
+    external = world / "region" / "c.32.0.mcc"
+    external.write_bytes(b"x")
+
+    deleted = ("region/r.1.0.mca", "entities/r.0.0.mca")
+    deleted_size = sum((world / name).stat().st_size for name in deleted)
+    preview = prune_chunks(str(world), 100, dry_run=True, workers=1)
+    assert preview["chunks"] == 2
+    # r.1.0 and the entities file are deleted outright; r.0.0 keeps its size until it is compacted.
+    assert (preview["bytes"], preview["bytes_unused"], preview["files_deleted"]) == (deleted_size, SECTOR_SIZE, 2)
+    assert all((world / name).exists() for name in deleted)
+
+    assert prune_chunks(str(world), 100, workers=1) == preview
+    assert not any((world / name).exists() for name in deleted)
+    assert not external.exists()
+    remaining = read_region_header(world / "region" / "r.0.0.mca")
+    assert remaining.chunk(0) is None
+    assert remaining.chunk(1) is not None
+
+
+def test_compact_regions_removes_holes_and_keeps_payloads(tmp_path: Path) -> None:
+    world = tmp_path / "World"
+    (world / "region").mkdir(parents=True)
+    (world / "DIM-1" / "entities").mkdir(parents=True)
+    (world / "level.dat").write_bytes(b"x")
+    region = world / "region" / "r.0.0.mca"
+    write_region(region, {0: _chunk(1), 1: _chunk(2), 2: _chunk(3)})
+    clear_chunks(region, [1])
+    nether = world / "DIM-1" / "entities" / "r.0.0.mca"
+    write_region(nether, {5: _chunk(4)})
+    nether_before = nether.read_bytes()
+
+    preview = compact_regions(str(world), dry_run=True, workers=1)
+    assert (preview["files"], preview["compacted"]) == (2, 1)
+    assert preview["bytes_before"] - preview["bytes_after"] == SECTOR_SIZE
+    assert region.stat().st_size == 5 * SECTOR_SIZE
+
+    assert compact_regions(str(world), workers=2) == preview
+    header = read_region_header(region)
+    assert region.stat().st_size == 4 * SECTOR_SIZE
+    assert [(c.index, c.sector_offset, c.timestamp) for c in header.chunks()] == [(0, 2, 1000), (2, 3, 1002)]
+    inhabited = {s.chunk_x: s.inhabited_time for s in scan_world(str(world), workers=1)}
+    assert inhabited == {0: 1, 2: 3}
+    assert nether.read_bytes() == nether_before
+
+
+def _make_recompress_world(tmp_path: Path, data_version: int) -> Path:
+    world = tmp_path / "World"
+    (world / "region").mkdir(parents=True)
+    nbtlib.File({"Data": nbtlib.Compound({"DataVersion": nbtlib.Int(data_version)})}).save(world / "level.dat")
+    write_region(world / "region" / "r.0.0.mca", {0: _chunk(7), 1: b"not zlib"})
+    return world
+
+
+def test_recompress_regions_to_zlib_level(tmp_path: Path) -> None:
+    world = _make_recompress_world(tmp_path, 3700)
+    result = recompress_regions(str(world), "none", workers=1)
+    assert (result["files"], result["chunks"]) == (1, 1)
+    header = read_region_header(world / "region" / "r.0.0.mca")
+    assert header.chunk(1) is not None
+    assert next(iter_raw_chunks(header, [0])).compression == COMPRESSION_NONE
+    assert [s.inhabited_time for s in scan_world(str(world), workers=1) if s.chunk_x == 0] == [7]
+
+    with pytest.raises(ValueError):
+        recompress_regions(str(world), "lz4", workers=1)
+
+    # Bad levels are refused before any file is touched.
+    before = (world / "region" / "r.0.0.mca").read_bytes()
+    for codec, level in (("zlib", 15), ("gzip", -1), ("none", 3)):
+        with pytest.raises(ValueError):
+            recompress_regions(str(world), codec, level=level, workers=1)
+    assert (world / "region" / "r.0.0.mca").read_bytes() == before
+
+
+def test_recompress_regions_to_lz4(tmp_path: Path) -> None:
+    pytest.importorskip("lz4")
+    pytest.importorskip("xxhash")
+    payload = bytes(range(256)) * 600
+    assert decompress_payload(COMPRESSION_LZ4, compress_payload(COMPRESSION_LZ4, payload)) == payload
+    assert decompress_payload(COMPRESSION_LZ4, compress_payload(COMPRESSION_LZ4, payload, 9)) == payload
+
+    world = _make_recompress_world(tmp_path, 3900)
+    result = recompress_regions(str(world), "lz4", workers=2)
+    assert result["chunks"] == 1
+    header = read_region_header(world / "region" / "r.0.0.mca")
+    assert next(iter_raw_chunks(header, [0])).compression == COMPRESSION_LZ4
+    assert [s.inhabited_time for s in scan_world(str(world), workers=1) if s.chunk_x == 0] == [7]
+
+
+def test_trim_world_removes_chunks_outside_radius(tmp_path: Path) -> None:
+    world = tmp_path / "World"
+    for folder in ("region", "entities", "DIM1/region"):
+        (world / folder).mkdir(parents=True)
+    (world / "level.dat").write_bytes(b"x")
+    write_region(world / "region" / "r.0.0.mca", {0: _chunk(1), 1: _chunk(1), 31: _chunk(1)})
+    write_region(world / "region" / "r.3.0.mca", {0: _chunk(1)})
+    write_region(world / "entities" / "r.0.0.mca", {31: _chunk(0)})
+    write_region(world / "DIM1" / "region" / "r.-1.0.mca", {31: _chunk(0), 0: _chunk(0)})
+
+    deleted_size = sum((world / name).stat().st_size for name in ("region/r.3.0.mca", "entities/r.0.0.mca"))
+    preview = trim_world(str(world), center=(0, 0), radius=20, dry_run=True, workers=1)
+    assert preview["chunks"] == 4
+    assert (preview["bytes"], preview["bytes_unused"]) == (deleted_size, 2 * SECTOR_SIZE)
+    assert (preview["files_deleted"], preview["files_trimmed"]) == (2, 2)
+    assert (world / "region" / "r.3.0.mca").exists()
+
+    assert trim_world(str(world), center=(0, 0), radius=20, workers=2) == preview
+    assert not (world / "region" / "r.3.0.mca").exists()
+    assert not (world / "entities" / "r.0.0.mca").exists()
+    kept = read_region_header(world / "region" / "r.0.0.mca")
+    assert [c.index for c in kept.chunks()] == [0, 1]
+    assert [c.index for c in read_region_header(world / "DIM1" / "region" / "r.-1.0.mca").chunks()] == [31]
+
+
+def test_trim_world_journals_only_files_it_changes(tmp_path: Path) -> None:
+    world = tmp_path / "World"
+    (world / "region").mkdir(parents=True)
+    (world / "level.dat").write_bytes(b"x")
+    write_region(world / "region" / "r.0.0.mca", {0: _chunk(1), 31: _chunk(1)})
+    write_region(world / "region" / "r.3.0.mca", {0: _chunk(1)})
+    write_region(world / "region" / "r.-1.-1.mca", {1023: _chunk(1)})
+
+    trim_world(str(world), center=(0, 0), radius=20, workers=1, backup_before_write=True)
+    [entry] = list_journal(world)
+    assert sorted(item.path for item in entry.files) == ["region/r.0.0.mca", "region/r.3.0.mca"]
+
+
+def test_copy_chunks_moves_raw_payloads(tmp_path: Path) -> None:
+    source = tmp_path / "Source"
+    target = tmp_path / "Target"
+    for world in (source, target):
+        (world / "region").mkdir(parents=True)
+        (world / "level.dat").write_bytes(b"x")
+    write_region(source / "region" / "r.0.0.mca", {0: _chunk(11), 1: _chunk(12)})
+    (source / "entities").mkdir()
+    write_region(source / "entities" / "r.-1.0.mca", {31: _chunk(0)})
+    write_region(target / "region" / "r.0.0.mca", {0: _chunk(1), 32: _chunk(2), 5: _chunk(3)})
+
+    result = copy_chunks(str(source), str(target), (-1, 0), (1, 1))
+    assert result == {"chunks": 3, "cleared": 1, "unreadable": 0, "files": 2}
+    header = read_region_header(target / "region" / "r.0.0.mca")
+    assert sorted(c.index for c in header.chunks()) == [0, 1, 5]
+    source_raw = next(iter_raw_chunks(read_region_header(source / "region" / "r.0.0.mca"), [1]))
+    assert next(iter_raw_chunks(header, [1])).data == source_raw.data
+    assert read_region_header(target / "entities" / "r.-1.0.mca").chunk(31) is not None
+    inhabited = {(s.chunk_x, s.chunk_z): s.inhabited_time for s in scan_world(str(target), workers=1)}
+    assert inhabited == {(0, 0): 11, (1, 0): 12, (5, 0): 3}
+
+
+def test_copy_chunks_keeps_target_chunks_the_source_cannot_read(tmp_path: Path) -> None:
+    source = tmp_path / "Source"
+    target = tmp_path / "Target"
+    write_region(source / "region" / "r.0.0.mca", {0: _chunk(11), 1: _chunk(12)})
+    write_region(target / "region" / "r.0.0.mca", {0: _chunk(1), 1: _chunk(2), 2: _chunk(3)})
+    (source / "level.dat").write_bytes(b"x")
+    (target / "level.dat").write_bytes(b"x")
+    # Chunk 1 of the source points past the end of its file.
+    with (source / "region" / "r.0.0.mca").open("r+b") as handle:
+        handle.seek(4)
+        handle.write(struct.pack(">I", (500 << 8) | 1))
+
+    result = copy_chunks(str(source), str(target), (0, 0), (2, 0))
+    assert result == {"chunks": 1, "cleared": 1, "unreadable": 1, "files": 1}
+    inhabited = {s.chunk_x: s.inhabited_time for s in scan_world(str(target), workers=1)}
+    assert inhabited == {0: 11, 1: 2}
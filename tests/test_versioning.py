@@ -1,4 +1,4 @@
-from mcworldmgr.world.versioning import assert_supported_data_version
+from mcworldmgr.world.versioning import assert_lz4_supported, assert_supported_data_version
 
 
 def test_version_supported() -> None:
@@ -11,3 +11,12 @@ def test_version_unsupported() -> None:
     except ValueError:
         return
     raise AssertionError("Expected ValueError for unsupported version")
+
+
+def test_lz4_requires_1_20_5() -> None:
+    assert_lz4_supported(3837)
+    try:
+        assert_lz4_supported(3700)
+    except ValueError:
+        return
+    raise AssertionError("Expected ValueError for pre-1.20.5 world")